@@ -0,0 +1,122 @@
+"""Нагрузочный тест AsyncCinemaService с имитацией клиентов.
+
+Каждый клиент - корутина, которая несколько раз ищет сеансы фильма, читает
+свободные места, бронирует случайное свободное место и иногда отменяет бронь,
+делая паузы между запросами. Все клиенты работают в одном цикле событий.
+Отдельная корутина каждые 10 мс измеряет задержку цикла событий.
+
+Каждый прогон выполняется дважды: с записью на диск в пуле потоков (как в
+AsyncCinemaService по умолчанию) и с записью прямо в цикле событий. Во втором
+случае задержка цикла вырастает до времени записи снимка.
+
+Запуск: python -m benchmarks.bench_async_clients [--clients 100 1000 5000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import Executor, Future
+
+from benchmarks.synthetic import make_cinema
+from cinema_system.models import BookingError
+from cinema_system.services import AsyncCinemaService
+
+SESSIONS = 200
+TICK = 0.01
+
+
+class InlineExecutor(Executor):
+    """Executor, который выполняет задачу сразу в вызывающем потоке"""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+async def client(service: AsyncCinemaService, user_id: int, requests: int, think: float,
+                 rng: random.Random, latencies: list) -> None:
+    for _ in range(requests):
+        await asyncio.sleep(rng.uniform(0, 2 * think))
+        started = time.perf_counter()
+        sessions = await service.find_sessions(f"Фильм {rng.randint(1, 50)}")
+        if sessions:
+            session = rng.choice(sessions)
+            seats = await service.get_available_seats(session.session_id)
+            if seats:
+                row, seat = rng.choice(seats)
+                try:
+                    booking = await service.create_booking(user_id, session.session_id, row, seat)
+                    if rng.random() < 0.2:
+                        await service.cancel_booking(user_id, booking.booking_id)
+                except BookingError:
+                    pass
+        latencies.append(time.perf_counter() - started)
+
+
+async def measure_lag(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def run(clients: int, requests: int, think: float, data_file: str, inline_write: bool = False,
+              seed: int = 1) -> dict:
+    cinema = make_cinema(users=clients, sessions=SESSIONS)
+    service = AsyncCinemaService(cinema, data_file=data_file, save_delay=0.1,
+                                 executor=InlineExecutor() if inline_write else None)
+    rng = random.Random(seed)
+    latencies, lags = [], []
+    stop = asyncio.Event()
+
+    lag_task = asyncio.create_task(measure_lag(stop, lags))
+    started = time.perf_counter()
+    await asyncio.gather(*(client(service, user_id, requests, think, random.Random(rng.random()), latencies)
+                           for user_id in range(1, clients + 1)))
+    elapsed = time.perf_counter() - started
+    await service.flush()
+    stop.set()
+    await lag_task
+
+    return {
+        'clients': clients,
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1e3,
+        'p99_ms': sorted(latencies)[int(len(latencies) * 0.99)] * 1e3,
+        'p99_lag_ms': sorted(lags)[int(len(lags) * 0.99)] * 1e3,
+        'max_lag_ms': max(lags) * 1e3,
+        'bookings': len(cinema.bookings),
+        'saves': service.saves_count,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--requests', type=int, default=5, help="запросов на клиента")
+    parser.add_argument('--think', type=float, default=1.0, help="средняя пауза клиента между запросами, с")
+    args = parser.parse_args()
+
+    print(f"{'клиентов':>9} {'запись':>7} {'запросов/с':>11} {'p50, мс':>8} {'p99, мс':>8} "
+          f"{'задержка цикла p99, мс':>23} {'макс., мс':>10} {'броней':>7} {'записей':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for clients in args.clients:
+            for inline_write in (False, True):
+                result = asyncio.run(run(clients, args.requests, args.think,
+                                         os.path.join(directory, f"cinema_{clients}.json"), inline_write))
+                print(f"{result['clients']:>9} {'цикл' if inline_write else 'пул':>7} {result['rps']:>11.0f} "
+                      f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['p99_lag_ms']:>23.1f} "
+                      f"{result['max_lag_ms']:>10.1f} {result['bookings']:>7} {result['saves']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Загрузка бинарного снимка против JSON.
+
+Одни и те же данные сохраняются в JSON (JSONFileService) и в бинарный
+снимок (BinaryFileService). Для каждого формата замеряется:
+- открытие файла: json.load для JSON, mmap и чтение заголовка для снимка;
+- полная загрузка: открытие и DataSerializer.deserialize_cinema_data;
+- поиск одной брони по ID сразу после открытия (для JSON - перебором
+  загруженного списка, для снимка - двоичным поиском в mmap).
+
+Запуск: python -m benchmarks.bench_binary_snapshot [--bookings 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_cinema_data
+from cinema_system.services import BinaryFileService, DataSerializer, JSONFileService
+
+
+def timed(action):
+    started = time.perf_counter()
+    result = action()
+    return result, time.perf_counter() - started
+
+
+def run(bookings: int, directory: str) -> dict:
+    data = make_cinema_data(users=max(bookings // 4, 1), sessions=max(bookings // 200, 1), bookings=bookings)
+    json_file = os.path.join(directory, "cinema.json")
+    binary_file = os.path.join(directory, "cinema.bin")
+    JSONFileService.save_to_json(data, json_file)
+    BinaryFileService.save_to_binary(data, binary_file)
+    target = bookings // 2 + 1
+
+    json_data, json_open = timed(lambda: JSONFileService.load_from_json(json_file))
+    _, json_lookup = timed(lambda: next(b for b in json_data['bookings'] if b['booking_id'] == target))
+    restored, json_deserialize = timed(lambda: DataSerializer.deserialize_cinema_data(json_data))
+    assert len(restored['bookings']) == bookings
+    del json_data, restored
+
+    snapshot, binary_open = timed(lambda: BinaryFileService.load_from_binary(binary_file))
+    _, binary_lookup = timed(lambda: snapshot['bookings'].find(target))
+    restored, binary_deserialize = timed(lambda: DataSerializer.deserialize_cinema_data(snapshot))
+    assert len(restored['bookings']) == bookings
+    del restored
+    snapshot.close()
+
+    return {
+        'bookings': bookings,
+        'json_mb': os.path.getsize(json_file) / 2 ** 20,
+        'binary_mb': os.path.getsize(binary_file) / 2 ** 20,
+        'json_open_s': json_open,
+        'binary_open_s': binary_open,
+        'json_load_s': json_open + json_deserialize,
+        'binary_load_s': binary_open + binary_deserialize,
+        'json_lookup_ms': (json_open + json_lookup) * 1e3,
+        'binary_lookup_ms': (binary_open + binary_lookup) * 1e3,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bookings', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'броней':>9} {'JSON, МБ':>9} {'снимок, МБ':>11} {'открытие JSON, с':>17} {'снимка, с':>10} "
+          f"{'загрузка JSON, с':>17} {'снимка, с':>10} {'1 бронь JSON, мс':>17} {'снимок, мс':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for bookings in args.bookings:
+            r = run(bookings, directory)
+            print(f"{r['bookings']:>9} {r['json_mb']:>9.1f} {r['binary_mb']:>11.1f} {r['json_open_s']:>17.3f} "
+                  f"{r['binary_open_s']:>10.5f} {r['json_load_s']:>17.2f} {r['binary_load_s']:>10.2f} "
+                  f"{r['json_lookup_ms']:>17.1f} {r['binary_lookup_ms']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Время десериализации в зависимости от числа броней.
+
+DataSerializer разрешает ссылки сеансов и броней через словари id -> объект,
+поэтому время загрузки растет линейно, а время на одну бронь не меняется.
+Для сравнения оценивается прежний способ - поиск пользователя и сеанса
+каждой брони перебором списков (замеряется на выборке и умножается на
+число броней).
+
+Запуск: python -m benchmarks.bench_deserialize [--bookings 10000 100000 1000000]
+"""
+
+import argparse
+import time
+
+from benchmarks.synthetic import make_cinema_data
+from cinema_system.services import DataSerializer
+
+SAMPLE = 200
+
+
+def run(bookings: int) -> dict:
+    data = make_cinema_data(users=max(bookings // 4, 1), sessions=max(bookings // 200, 1), bookings=bookings)
+
+    started = time.perf_counter()
+    restored = DataSerializer.deserialize_cinema_data(data)
+    elapsed = time.perf_counter() - started
+    assert len(restored['bookings']) == bookings
+
+    users, sessions = restored['users'], restored['sessions']
+    sample = data['bookings'][-SAMPLE:]
+    started = time.perf_counter()
+    for booking in sample:
+        next(user for user in users if user.user_id == booking['user_id'])
+        next(session for session in sessions if session.session_id == booking['session_id'])
+    scan_estimate = (time.perf_counter() - started) / len(sample) * bookings
+
+    return {
+        'bookings': bookings,
+        'users': len(users),
+        'sessions': len(sessions),
+        'load_s': elapsed,
+        'per_booking_us': elapsed / bookings * 1e6,
+        'scan_estimate_s': scan_estimate,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bookings', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'броней':>9} {'пользователей':>14} {'сеансов':>8} {'загрузка, с':>12} "
+          f"{'мкс на бронь':>13} {'перебором, с (оценка)':>22}")
+    for bookings in args.bookings:
+        result = run(bookings)
+        print(f"{result['bookings']:>9} {result['users']:>14} {result['sessions']:>8} {result['load_s']:>12.2f} "
+              f"{result['per_booking_us']:>13.2f} {result['scan_estimate_s']:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Групповое бронирование против N одиночных бронирований.
+
+Для каждого размера группы места бронируются двумя способами: одним вызовом
+create_group_booking с одной записью в журнал (append_many, один fsync) и N
+вызовами create_booking, каждый со своей записью в журнал, как это делал
+CLI до группового API. Отдельно замеряется время без журнала - только
+бронирование в памяти.
+
+Запуск: python -m benchmarks.bench_group_booking [--sizes 2 5 10 20] [--orders 200]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_cinema
+from cinema_system.services import JournalService
+
+
+def book_group(cinema, journal, user_id: int, session_id: int, seats) -> None:
+    bookings = cinema.booking_service.create_group_booking(user_id, session_id, seats)
+    if journal is not None:
+        journal.log_bookings_created(bookings)
+
+
+def book_singles(cinema, journal, user_id: int, session_id: int, seats) -> None:
+    for row, seat in seats:
+        booking = cinema.booking_service.create_booking(user_id, session_id, row, seat)
+        if journal is not None:
+            journal.log_booking_created(booking)
+
+
+def run(book, size: int, orders: int, journal_file) -> float:
+    cinema = make_cinema(users=100, sessions=orders, seats_per_row=max(size, 30))
+    journal = JournalService(journal_file) if journal_file else None
+    started = time.perf_counter()
+    for session_id in range(1, orders + 1):
+        book(cinema, journal, session_id % 100 + 1, session_id, [(1, seat) for seat in range(1, size + 1)])
+    elapsed = time.perf_counter() - started
+    if journal is not None:
+        journal.close()
+        os.remove(journal_file)
+    return elapsed / orders
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2, 5, 10, 20])
+    parser.add_argument('--orders', type=int, default=200, help="заказов на каждый замер")
+    args = parser.parse_args()
+
+    print(f"{'мест':>5} {'журнал':>7} {'группой, мс':>12} {'по одному, мс':>14} {'ускорение':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        journal_file = os.path.join(directory, "journal.jsonl")
+        for size in args.sizes:
+            for journal in (None, journal_file):
+                group = run(book_group, size, args.orders, journal)
+                singles = run(book_singles, size, args.orders, journal)
+                print(f"{size:>5} {'да' if journal else 'нет':>7} {group * 1e3:>12.3f} {singles * 1e3:>14.3f} "
+                      f"{singles / group:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Потоковая загрузка cinema_data.json против json.load.
+
+Для каждого размера пишется синтетический снимок через JSONFileService,
+затем каждый загрузчик запускается в отдельном процессе, чтобы пиковый RSS
+одного не влиял на другой. Выводятся время до первого элемента, полное время
+загрузки с построением объектов и пиковый RSS процесса.
+
+Запуск: python -m benchmarks.bench_json_stream [--bookings 100000 500000]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import make_cinema_data
+from cinema_system.services import DataSerializer, JSONFileService
+
+LOADERS = ('json.load', 'stream')
+
+
+"""Загрузить файл одним из способов (выполняется в дочернем процессе)"""
+
+
+def load(loader: str, filename: str) -> dict:
+    started = time.perf_counter()
+    if loader == 'json.load':
+        data = JSONFileService.load_from_json(filename)
+        first_item = time.perf_counter() - started
+        restored = DataSerializer.deserialize_cinema_data(data)
+        del data
+    else:
+        items = JSONFileService.iter_json_items(filename)
+        first = next(items)
+        first_item = time.perf_counter() - started
+
+        def chained():
+            yield first
+            yield from items
+
+        restored = DataSerializer.deserialize_cinema_items(chained())
+    total = time.perf_counter() - started
+
+    # ru_maxrss в Linux - в килобайтах
+    return {
+        'first_item_s': first_item,
+        'total_s': total,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'bookings': len(restored['bookings']),
+    }
+
+
+def run_in_child(loader: str, filename: str) -> dict:
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_json_stream', '--child', loader, filename],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bookings', type=int, nargs='+', default=[100_000, 500_000])
+    parser.add_argument('--child', nargs=2, metavar=('LOADER', 'FILE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(load(*args.child)))
+        return
+
+    print(f"{'броней':>9} {'файл, МБ':>9} {'загрузчик':>10} {'первый элемент, с':>18} "
+          f"{'всего, с':>9} {'пик RSS, МБ':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for bookings in args.bookings:
+            filename = os.path.join(directory, f"cinema_{bookings}.json")
+            data = make_cinema_data(users=bookings // 4, sessions=max(bookings // 200, 1), bookings=bookings)
+            JSONFileService.save_to_json(data, filename)
+            del data
+            size_mb = os.path.getsize(filename) / 2 ** 20
+
+            for loader in LOADERS:
+                result = run_in_child(loader, filename)
+                print(f"{bookings:>9} {size_mb:>9.1f} {loader:>10} {result['first_item_s']:>18.3f} "
+                      f"{result['total_s']:>9.2f} {result['peak_rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
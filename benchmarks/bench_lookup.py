@@ -0,0 +1,65 @@
+"""Задержка бронирования в зависимости от числа пользователей.
+
+Бронирование ищет пользователя и сеанс по ID через индексы CinemaTheater,
+поэтому его задержка не должна расти вместе с числом пользователей. Для
+сравнения рядом выводится время того же поиска линейным проходом по списку.
+
+Запуск: python -m benchmarks.bench_lookup [--users 1000 10000 100000]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.synthetic import make_cinema
+
+SESSIONS = 1000
+
+
+def run(user_count: int, bookings: int, seed: int = 1) -> dict:
+    cinema = make_cinema(user_count, SESSIONS)
+    rng = random.Random(seed)
+    service = cinema.booking_service
+    hall = cinema.halls[0]
+    requests = [(rng.randint(1, user_count), index % SESSIONS + 1,
+                 index // SESSIONS // hall.seats_per_row + 1, index // SESSIONS % hall.seats_per_row + 1)
+                for index in range(bookings)]
+
+    latencies = []
+    for user_id, session_id, row, seat in requests:
+        started = time.perf_counter()
+        service.create_booking(user_id, session_id, row, seat)
+        latencies.append(time.perf_counter() - started)
+
+    # Поиск пользователя проходом по списку, как до индексов (на части запросов)
+    scan_requests = requests[:100]
+    started = time.perf_counter()
+    for user_id, *_ in scan_requests:
+        next(user for user in cinema.users if user.user_id == user_id)
+    scan_time = (time.perf_counter() - started) / len(scan_requests)
+
+    return {
+        'users': user_count,
+        'median_us': statistics.median(latencies) * 1e6,
+        'p99_us': sorted(latencies)[int(len(latencies) * 0.99)] * 1e6,
+        'scan_us': scan_time * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--bookings', type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'пользователей':>14} {'бронь, мкс (медиана)':>22} {'бронь, мкс (p99)':>18} "
+          f"{'линейный поиск, мкс':>20}")
+    for user_count in args.users:
+        result = run(user_count, args.bookings)
+        print(f"{result['users']:>14} {result['median_us']:>22.1f} {result['p99_us']:>18.1f} "
+              f"{result['scan_us']:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
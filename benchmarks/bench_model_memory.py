@@ -0,0 +1,135 @@
+"""Память на один объект модели до и после перевода на __slots__.
+
+Для каждой модели создается count объектов и через tracemalloc замеряется,
+сколько байт добавилось на объект. "До" - классы с обычным __dict__ и теми же
+полями, что были у моделей до __slots__ (они описаны ниже), "после" - текущие
+классы из cinema_system.models. Значения полей общие для всех объектов, так что
+в замер попадают только сами объекты и их контейнеры.
+
+Отдельно замеряется полная цена одной брони в кинотеатре: строка в
+BookingStore, ID брони у пользователя и в индексе сеанса. Брони создаются
+через BookingService, а отметки об изменениях для сохранения сбрасываются.
+
+Запуск: python -m benchmarks.bench_model_memory [--count 100000]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks.synthetic import make_cinema
+from cinema_system.models import Booking, CinemaHall, Film, Session, User
+
+
+class DictFilm:
+    def __init__(self, film_id, title, duration, genre, rating=0.0):
+        self.film_id = film_id
+        self.title = title
+        self.duration = duration
+        self.genre = genre
+        self.rating = rating
+
+
+class DictUser:
+    def __init__(self, user_id, name):
+        self.user_id = user_id
+        self.name = name
+        self.bookings = []
+
+
+class DictHall:
+    def __init__(self, hall_id, name, rows, seats_per_row):
+        self.id = hall_id
+        self.name = name
+        self.rows = rows
+        self.seats_per_row = seats_per_row
+        self.total_seats = seats_per_row * rows
+        self.reserved_seats = set()
+
+
+class DictSession:
+    def __init__(self, session_id, movie, hall, time, price):
+        self.session_id = session_id
+        self.movie = movie
+        self.hall = hall
+        self.time = time
+        self.price = price
+
+
+class DictBooking:
+    def __init__(self, booking_id, user, session, row, seat):
+        self.booking_id = booking_id
+        self.user = user
+        self.session = session
+        self.row = row
+        self.seat = seat
+
+
+"""Сколько байт занимает один результат make(i) (в среднем по count объектам)"""
+
+
+def bytes_per_object(make, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [make(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Сам список objects - по 8 байт на ссылку, к объектам не относится
+    result = (after - before) / count - 8
+    del objects
+    return result
+
+
+"""Сколько байт добавляет одна бронь в кинотеатре (в среднем по count броням)"""
+
+
+def bytes_per_booking(count: int, users: int = 10_000, seats_per_session: int = 600) -> float:
+    sessions = count // seats_per_session + 1
+    cinema = make_cinema(users=users, sessions=sessions)
+    service = cinema.booking_service
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for index in range(count):
+        position = index // sessions
+        service.create_booking(index % users + 1, index % sessions + 1, position // 30 + 1, position % 30 + 1)
+    cinema.changes.reset()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100_000)
+    args = parser.parse_args()
+
+    film, dict_film = Film(1, "Фильм", 120, "драма", 7.0), DictFilm(1, "Фильм", 120, "драма", 7.0)
+    hall, dict_hall = CinemaHall(1, "Зал", 10, 10), DictHall(1, "Зал", 10, 10)
+    session = Session(1, film, hall, "2030-01-01 18:00", 300)
+    dict_session = DictSession(1, dict_film, dict_hall, "2030-01-01 18:00", 300)
+    user, dict_user = User(1, "Пользователь"), DictUser(1, "Пользователь")
+
+    rows = [
+        ("Film", lambda i: DictFilm(i, "Фильм", 120, "драма", 7.0), lambda i: Film(i, "Фильм", 120, "драма", 7.0)),
+        ("CinemaHall", lambda i: DictHall(i, "Зал", 10, 10), lambda i: CinemaHall(i, "Зал", 10, 10)),
+        ("Session", lambda i: DictSession(i, dict_film, dict_hall, "2030-01-01 18:00", 300),
+         lambda i: Session(i, film, hall, "2030-01-01 18:00", 300)),
+        ("User", lambda i: DictUser(i, "Пользователь"), lambda i: User(i, "Пользователь")),
+        ("Booking", lambda i: DictBooking(i, dict_user, dict_session, 1, 1),
+         lambda i: Booking(i, user, session, 1, 1)),
+    ]
+
+    print(f"{'модель':>18} {'до, байт':>10} {'после, байт':>12}")
+    for name, make_before, make_after in rows:
+        before = bytes_per_object(make_before, args.count)
+        after = bytes_per_object(make_after, args.count)
+        print(f"{name:>18} {before:>10.0f} {after:>12.0f}")
+    print(f"\nБронь в кинотеатре (хранилище + пользователь + сеанс): "
+          f"{bytes_per_booking(args.count):.0f} байт")
+
+
+if __name__ == "__main__":
+    main()
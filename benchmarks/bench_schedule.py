@@ -0,0 +1,95 @@
+"""Запросы к расписанию за год показов.
+
+Строится кинотеатр с расписанием на год (по умолчанию 20 залов, сеанс каждые
+3 часа круглые сутки - 58 400 сеансов) и замеряются запросы ScheduleIndex:
+сеансы в промежутке "сегодня с 18:00 до 22:00", ближайшие 10 сеансов фильма
+и зала, проверка пересечений при добавлении сеанса. Для сравнения те же
+запросы выполняются полным проходом по списку сеансов с разбором строки
+времени, как до индекса.
+
+Запуск: python -m benchmarks.bench_schedule [--halls 20] [--queries 1000]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic import START_TIME, make_cinema
+from cinema_system.models import Session
+from cinema_system.models.session import TIME_FORMAT
+
+SLOT_MINUTES = 180
+FILMS = 50
+
+
+def scan_between(sessions, start: datetime, end: datetime):
+    return sorted((session for session in sessions
+                   if start <= datetime.strptime(session.time, TIME_FORMAT) < end),
+                  key=lambda session: (datetime.strptime(session.time, TIME_FORMAT), session.session_id))
+
+
+def scan_upcoming(sessions, after: datetime, k: int, film_id: int):
+    found = [session for session in sessions
+             if session.movie.film_id == film_id and datetime.strptime(session.time, TIME_FORMAT) >= after]
+    found.sort(key=lambda session: (datetime.strptime(session.time, TIME_FORMAT), session.session_id))
+    return found[:k]
+
+
+def measure(queries, query) -> float:
+    started = time.perf_counter()
+    for args in queries:
+        query(*args)
+    return (time.perf_counter() - started) / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--halls', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--scan-queries', type=int, default=20, help="запросов для замера полного прохода")
+    args = parser.parse_args()
+
+    sessions_count = args.halls * 24 * 60 // SLOT_MINUTES * 365
+    started = time.perf_counter()
+    cinema = make_cinema(users=1, sessions=sessions_count, halls=args.halls, films=FILMS,
+                         slot_minutes=SLOT_MINUTES)
+    build_time = time.perf_counter() - started
+    sessions = cinema.sessions
+    print(f"Сеансов: {len(sessions)} ({sessions[0].time} - {sessions[-1].time}), "
+          f"загрузка с построением индекса: {build_time:.2f} с")
+
+    rng = random.Random(1)
+    evenings = []
+    for _ in range(args.queries):
+        day = START_TIME.replace(hour=18, minute=0) + timedelta(days=rng.randrange(365))
+        evenings.append((day, day + timedelta(hours=4)))
+    upcoming = [(10, START_TIME + timedelta(minutes=rng.randrange(365 * 24 * 60)), rng.randint(1, FILMS))
+                for _ in range(args.queries)]
+    halls_upcoming = [(k, after, None, rng.randint(1, args.halls)) for k, after, _ in upcoming]
+    film = cinema.films[0]
+    new_sessions = []
+    for session_id in range(sessions_count + 1, sessions_count + 1 + args.queries):
+        start = START_TIME + timedelta(minutes=rng.randrange(365 * 24 * 60))
+        new_sessions.append(Session(session_id, film, cinema.halls[rng.randrange(args.halls)],
+                                    start.strftime(TIME_FORMAT), 300))
+
+    rows = [
+        ("сеансы с 18:00 до 22:00", measure(evenings, cinema.find_sessions_between),
+         measure(evenings[:args.scan_queries], lambda start, end: scan_between(sessions, start, end))),
+        ("ближайшие 10 сеансов фильма", measure(upcoming, cinema.find_next_sessions),
+         measure(upcoming[:args.scan_queries],
+                 lambda k, after, film_id: scan_upcoming(sessions, after, k, film_id))),
+        ("ближайшие 10 сеансов зала", measure(halls_upcoming, cinema.find_next_sessions), None),
+        ("пересечения в зале", measure([(session,) for session in new_sessions],
+                                       cinema.schedule.find_hall_conflicts), None),
+    ]
+
+    print(f"{'запрос':>30} {'индекс, мкс':>12} {'полный проход, мкс':>19}")
+    for name, indexed, scan in rows:
+        scan_text = f"{scan * 1e6:>19.0f}" if scan is not None else f"{'-':>19}"
+        print(f"{name:>30} {indexed * 1e6:>12.1f} {scan_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Пропускная способность ShardedBookingService в зависимости от числа шардов.
+
+Кинотеатр из --sessions сеансов делится на 1, 2, 4, ... процессов-шардов.
+Запросы на бронирование (каждое место каждого сеанса один раз) отправляются
+пачками через book_many: роутер раскладывает пачку по шардам, и шарды
+обрабатывают свои части параллельно. Отдельно замеряются одиночные вызовы
+create_booking, где на каждую бронь приходится обмен сообщениями с шардом.
+Для сравнения та же нагрузка выполняется в одном процессе без шардов.
+
+Ускорение от шардов ограничено числом ядер: оно печатается вместе с результатами.
+
+Запуск: python -m benchmarks.bench_sharded [--shards 1 2 4] [--sessions 240] [--batch 2000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_cinema, make_cinema_data
+from cinema_system.services import ShardedBookingService
+
+ROWS = 10
+SEATS_PER_ROW = 50
+
+
+"""Запросы (user_id, session_id, row, seat): сеансы чередуются, чтобы каждая пачка шла во все шарды"""
+
+
+def make_requests(sessions: int, users: int):
+    seats = [(row, seat) for row in range(1, ROWS + 1) for seat in range(1, SEATS_PER_ROW + 1)]
+    return [(index % users + 1, index % sessions + 1, *seats[index // sessions])
+            for index in range(sessions * len(seats))]
+
+
+def run_single_process(data_args: dict, requests) -> float:
+    cinema = make_cinema(**data_args)
+    started = time.perf_counter()
+    for request in requests:
+        cinema.booking_service.create_booking(*request)
+    return len(requests) / (time.perf_counter() - started)
+
+
+def run_sharded(data, shards: int, requests, batch: int, single_calls: int, data_file: str) -> dict:
+    with ShardedBookingService(data, shards, data_file) as service:
+        started = time.perf_counter()
+        for start in range(0, len(requests) - single_calls, batch):
+            results = service.book_many(requests[start:min(start + batch, len(requests) - single_calls)])
+            assert all(isinstance(result, dict) for result in results)
+        batched = (len(requests) - single_calls) / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for request in requests[len(requests) - single_calls:]:
+            service.create_booking(*request)
+        single = single_calls / (time.perf_counter() - started)
+    return {'batched_rps': batched, 'single_rps': single}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--sessions', type=int, default=240)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--batch', type=int, default=2000, help="запросов в одном вызове book_many")
+    parser.add_argument('--single', type=int, default=5000, help="одиночных вызовов create_booking")
+    args = parser.parse_args()
+
+    data_args = {'users': args.users, 'sessions': args.sessions, 'rows': ROWS, 'seats_per_row': SEATS_PER_ROW}
+    data = make_cinema_data(bookings=0, **data_args)
+    requests = make_requests(args.sessions, args.users)
+    print(f"Ядер: {os.cpu_count()}, запросов: {len(requests)}")
+    print(f"Один процесс без шардов: {run_single_process(data_args, requests):.0f} броней/с")
+
+    print(f"{'шардов':>7} {'book_many, броней/с':>20} {'ускорение':>10} {'create_booking, броней/с':>25}")
+    base = None
+    with tempfile.TemporaryDirectory() as directory:
+        for shards in args.shards:
+            result = run_sharded(data, shards, requests, args.batch, args.single,
+                                 os.path.join(directory, f"cinema_{shards}.json"))
+            base = base or result['batched_rps']
+            print(f"{shards:>7} {result['batched_rps']:>20.0f} {result['batched_rps'] / base:>9.2f}x "
+                  f"{result['single_rps']:>25.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Синтетические данные кинотеатра для бенчмарков"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from cinema_system.services import CinemaTheater, DataSerializer
+
+START_TIME = datetime(2030, 1, 1, 9, 0)
+
+
+"""Данные кинотеатра в формате DataSerializer.
+
+Сеансы раскладываются по залам подряд с шагом slot_minutes, поэтому в одном
+зале они не пересекаются. Брони распределяются по сеансам по кругу и занимают
+места по порядку, так что каждое место бронируется не больше одного раза.
+"""
+
+
+def make_cinema_data(users: int, sessions: int, bookings: int, halls: int = 20, films: int = 50,
+                     rows: int = 20, seats_per_row: int = 30, slot_minutes: int = 180,
+                     seed: int = 1) -> Dict[str, Any]:
+    if bookings > sessions * rows * seats_per_row:
+        raise ValueError("Броней больше, чем мест на всех сеансах")
+    rng = random.Random(seed)
+
+    session_list = []
+    for session_id in range(1, sessions + 1):
+        hall_id = (session_id - 1) % halls + 1
+        slot = (session_id - 1) // halls
+        session_list.append({
+            'session_id': session_id,
+            'movie_id': rng.randint(1, films),
+            'hall_id': hall_id,
+            'time': (START_TIME + timedelta(minutes=slot * slot_minutes)).strftime("%Y-%m-%d %H:%M"),
+            'price': rng.choice((250, 300, 350, 400)),
+            'reserved_seats': [],
+        })
+
+    booking_list = []
+    for index in range(bookings):
+        session = session_list[index % sessions]
+        position = index // sessions
+        row, seat = position // seats_per_row + 1, position % seats_per_row + 1
+        session['reserved_seats'].append([row, seat])
+        booking_list.append({
+            'booking_id': index + 1,
+            'user_id': rng.randint(1, users),
+            'session_id': session['session_id'],
+            'row': row,
+            'seat': seat,
+        })
+
+    return {
+        'users': [{'user_id': user_id, 'name': f"Пользователь {user_id}"} for user_id in range(1, users + 1)],
+        'halls': [{'id': hall_id, 'name': f"Зал {hall_id}", 'rows': rows, 'seats_per_row': seats_per_row,
+                   'total_seats': rows * seats_per_row} for hall_id in range(1, halls + 1)],
+        'films': [{'film_id': film_id, 'title': f"Фильм {film_id}", 'duration': 90 + film_id % 60,
+                   'genre': "драма", 'rating': 7.0} for film_id in range(1, films + 1)],
+        'sessions': session_list,
+        'bookings': booking_list,
+        'next_user_id': users + 1,
+        'next_booking_id': bookings + 1,
+    }
+
+
+"""Кинотеатр, восстановленный из синтетических данных"""
+
+
+def make_cinema(users: int, sessions: int, bookings: int = 0, **kwargs) -> CinemaTheater:
+    cinema = CinemaTheater()
+    data = make_cinema_data(users, sessions, bookings, **kwargs)
+    cinema.restore_state(DataSerializer.deserialize_cinema_data(data))
+    return cinema
@@ -1,28 +1,57 @@
+import sys
+import threading
+
 from cinema_system.models import CinemaHall, Film, Session, UserNotFound, SessionNotFoundError, InvalidSeatError, \
-    SeatBookedError, BookingError
-from cinema_system.services import CinemaTheater, JSONFileService, DataSerializer, XMLFileService
+    SeatBookedError, BookingError, SeatHoldError, FileOperationError
+from cinema_system.services import CinemaTheater, JSONFileService, DataSerializer, XMLFileService, JournalService, \
+    BackgroundSaver, HoldService, CinemaReadCache, SQLiteStorage, LazyCinemaTheater, PeriodicTask
 
 
 class CinemaApp:
 
-    def __init__(self):
-        self.cinema = CinemaTheater()
+    def __init__(self, backend: str = "json", lazy: bool = False):
         self.current_user = None
         self.data_file = "cinema_data.json"
+        # Изменения и запись снимка с очисткой журнала не должны чередоваться
+        self._state_lock = threading.RLock()
+        if backend == "json":
+            self.storage = None
+            self.journal = JournalService("cinema_journal.jsonl")
+            self.saver = BackgroundSaver(self._save_snapshot)
+        elif backend == "sqlite":
+            # Каждое изменение сразу записывается в базу отдельной транзакцией
+            self.storage = SQLiteStorage("cinema_data.db")
+            self.journal = self.storage
+            self.saver = None
+        else:
+            raise ValueError(f"Неизвестное хранилище данных: {backend}")
+        if lazy and self.storage is None:
+            raise ValueError("Ленивая загрузка доступна только с хранилищем sqlite")
+        # В ленивом режиме пользователи и прошедшие сеансы читаются из базы по требованию
+        self.cinema = LazyCinemaTheater(self.storage) if lazy else CinemaTheater()
+        # Пользователи, брони и отмены пишутся в базу до изменений в памяти; ID выдает база
+        self.cinema.storage = self.storage
         self._load_data()
+        # Места удерживаются за покупателем, пока он подтверждает оплату
+        self.holds = HoldService(self.cinema, ttl=600)
+        self.holds.start()
+        # Списки сеансов и свободных мест между изменениями берутся из кэша
+        self.reads = CinemaReadCache(self.cinema)
+        # Раз в минуту освобождаем карты мест прошедших сеансов (ленивый кинотеатр еще и выгружает их)
+        self.maintenance = PeriodicTask(self._release_past_sessions, interval=60, name="release-past-sessions")
+        self.maintenance.start()
 
     def _load_data(self):
+        if self.storage is not None:
+            self._load_storage()
+            return
         try:
-            data = JSONFileService.load_from_json(self.data_file)
-            restored_data = DataSerializer.deserialize_cinema_data(data)
-
-            self.cinema.halls = restored_data['halls']
-            self.cinema.films = restored_data['films']
-            self.cinema.users = restored_data['users']
-            self.cinema.sessions = restored_data['sessions']
-            self.cinema.bookings = restored_data['bookings']
-            self.cinema.next_user_id = restored_data['next_user_id']
-            self.cinema.booking_service.next_booking_id = restored_data['next_booking_id']
+            items = JSONFileService.iter_json_items(self.data_file)
+            restored_data = DataSerializer.deserialize_cinema_items(items)
+            self.cinema.restore_state(restored_data)
+            applied = JournalService.replay(self.cinema, self.journal.filename)
+            if applied:
+                print(f"Восстановлено изменений из журнала: {applied}")
 
             print("Данные успешно загружены!")
 
@@ -34,15 +63,65 @@ class CinemaApp:
             print("Создаем новые данные...")
             self._initialize_sample_data()
 
+    def _load_storage(self):
+        try:
+            if self.storage.is_empty():
+                print("База данных пуста, импортируем данные из JSON...")
+                self.storage.import_json(self.data_file)
+            if isinstance(self.cinema, LazyCinemaTheater):
+                self.cinema.load()
+            else:
+                restored_data = DataSerializer.deserialize_cinema_items(self.storage.iter_items())
+                self.cinema.restore_state(restored_data)
+            print("Данные успешно загружены!")
+        except Exception as e:
+            print(f"Ошибка загрузки данных: {e}")
+            print("Создаем новые данные...")
+            self._initialize_sample_data()
+
     def _save_data(self):
+        if self.storage is not None:
+            self._save_storage()
+            return
+        if self.saver.flush():
+            print("Данные успешно сохранены!")
+        else:
+            print(f"Ошибка сохранения данных: {self.saver.last_error}")
+
+    def _save_snapshot(self):
+        with self._state_lock:
+            self.journal.compact(self._write_snapshot)
+
+    def _save_storage(self):
         try:
-            data = DataSerializer.serialize_cinema_data(self.cinema)
-            JSONFileService.save_to_json(data, self.data_file)
-            XMLFileService.save_to_xml(data, "cinema_data.xml")
+            with self._state_lock:
+                # Изменения уже в базе, при первом сохранении переносим все данные
+                if self.storage.is_empty():
+                    self.storage.import_data(DataSerializer.serialize_cinema_data(self.cinema))
+                self.storage.save_counters(self.cinema.next_user_id, self.cinema.booking_service.next_booking_id)
+                self.storage.sync()
             print("Данные успешно сохранены!")
         except Exception as e:
             print(f"Ошибка сохранения данных: {e}")
 
+    def _write_snapshot(self):
+        data = DataSerializer.serialize_cinema_data(self.cinema)
+        JSONFileService.save_to_json(data, self.data_file)
+        XMLFileService.save_to_xml(data, "cinema_data.xml")
+
+    def _release_past_sessions(self):
+        with self._state_lock:
+            self.cinema.release_past_sessions()
+
+    def _log_change(self, log_method, *args):
+        try:
+            log_method(*args)
+            # Изменение уже в журнале; снимок пишется в фоне, только когда журнал пора сжать
+            if self.saver is not None and self.journal.needs_compaction():
+                self.saver.request_save()
+        except Exception as e:
+            print(f"Ошибка записи журнала: {e}")
+
     def _initialize_sample_data(self):
         try:
             hall1 = CinemaHall(1, "Красный зал", 5, 8)
@@ -85,6 +164,12 @@ class CinemaApp:
         except Exception as e:
             print(f"Неожиданная ошибка: {e}")
             self._save_data()
+        finally:
+            self.maintenance.stop()
+            self.holds.stop()
+            if self.saver is not None:
+                self.saver.close()
+            self.journal.close()
 
     def _show_main_menu(self):
         print("\n" + "=" * 40)
@@ -143,6 +228,8 @@ class CinemaApp:
             elif choice == "6":
                 self._save_data()
             elif choice == "7":
+                if isinstance(self.cinema, LazyCinemaTheater):
+                    self.cinema.unpin_user(self.current_user.user_id)
                 self.current_user = None
             else:
                 print("Неверный выбор!")
@@ -158,9 +245,14 @@ class CinemaApp:
             return
 
         try:
-            user = self.cinema.register_user(name)
+            with self._state_lock:
+                user = self.cinema.register_user(name)
+                # В базу пользователя уже записал CinemaTheater, в журнал пишем здесь
+                if self.storage is None:
+                    self._log_change(self.journal.log_user_registered, user)
+            if isinstance(self.cinema, LazyCinemaTheater):
+                self.cinema.pin_user(user.user_id)
             self.current_user = user
-            self._save_data()
             print(f"Успешная регистрация! Добро пожаловать, {name}!")
         except Exception as e:
             print(f"Ошибка регистрации: {e}")
@@ -185,7 +277,7 @@ class CinemaApp:
             return
 
         try:
-            sessions = self.cinema.find_sessions_by_movie(movie_title)
+            sessions = self.reads.find_sessions_by_movie(movie_title)
 
             if not sessions:
                 print(f"Сеансы для фильма '{movie_title}' не найдены")
@@ -193,7 +285,7 @@ class CinemaApp:
 
             print(f"\nНайдено сеансов: {len(sessions)}")
             for i, session in enumerate(sessions, 1):
-                available_seats = len(session.hall.get_available_seats())
+                available_seats = self.reads.count_available_seats(session)
                 print(f"{i}. {session.movie.title}")
                 print(f"   Зал: {session.hall.name}, Время: {session.time}")
                 print(f"   Свободных мест: {available_seats}, Цена: {session.price} руб.")
@@ -210,7 +302,7 @@ class CinemaApp:
 
         try:
             movie_title = input("Введите название фильма: ").strip()
-            sessions = self.cinema.find_sessions_by_movie(movie_title)
+            sessions = self.reads.find_sessions_by_movie(movie_title)
 
             if not sessions:
                 print(f"Сеансы для фильма '{movie_title}' не найдены")
@@ -218,7 +310,7 @@ class CinemaApp:
 
             print("\nДоступные сеансы:")
             for i, session in enumerate(sessions, 1):
-                available_seats = len(session.hall.get_available_seats())
+                available_seats = self.reads.count_available_seats(session)
                 print(f"{i}. {session.time} - Зал: {session.hall.name} - {available_seats} мест")
 
             session_choice = int(input("Выберите сеанс: ")) - 1
@@ -229,7 +321,7 @@ class CinemaApp:
 
             selected_session = sessions[session_choice]
 
-            available_seats = selected_session.hall.get_available_seats()
+            available_seats = self.reads.get_available_seats(selected_session)
 
             if not available_seats:
                 print("Нет доступных мест на этот сеанс!")
@@ -246,21 +338,61 @@ class CinemaApp:
             for row in sorted(seats_by_row.keys()):
                 print(f"Ряд {row}: {', '.join(map(str, sorted(seats_by_row[row])))}")
 
-            row = int(input("Введите номер ряда: "))
-            seat = int(input("Введите номер места: "))
+            tickets_input = input("Количество билетов (по умолчанию 1): ").strip()
+            tickets = int(tickets_input) if tickets_input else 1
 
-            booking = self.cinema.booking_service.create_booking(
-                self.current_user.user_id,
-                selected_session.session_id,
-                row,
-                seat
-            )
-            self._save_data()
-            print(f"Билет успешно забронирован! Номер брони: {booking.booking_id}")
+            if tickets < 1:
+                print("Количество билетов должно быть положительным!")
+                return
+
+            if tickets == 1:
+                row = int(input("Введите номер ряда: "))
+                seat = int(input("Введите номер места: "))
+                seats = [(row, seat)]
+            else:
+                seats = []
+                auto_choice = input("Подобрать места рядом автоматически? (да/нет): ").strip().lower()
+                if auto_choice in ("да", "д", "y", "yes"):
+                    seats = selected_session.find_best_seats(tickets)
+                    if not seats:
+                        print(f"Нет {tickets} свободных мест подряд в одном ряду!")
+                        return
+                    print(f"Подобраны места: ряд {seats[0][0]}, места "
+                          f"{', '.join(str(seat) for _, seat in seats)}")
+                else:
+                    for i in range(1, tickets + 1):
+                        row = int(input(f"Билет {i}. Введите номер ряда: "))
+                        seat = int(input(f"Билет {i}. Введите номер места: "))
+                        seats.append((row, seat))
+
+            hold = self.holds.hold_seats(self.current_user.user_id, selected_session.session_id, seats)
+            print(f"Места удерживаются за вами {int(self.holds.ttl // 60)} мин. "
+                  f"К оплате: {len(seats) * selected_session.price} руб.")
+            payment = input("Подтвердить оплату? (да/нет): ").strip().lower()
+            if payment not in ("да", "д", "y", "yes"):
+                self.holds.release(hold.hold_id)
+                print("Оплата отменена, места освобождены")
+                return
+
+            with self._state_lock:
+                bookings = self.holds.confirm(hold.hold_id)
+                # В базу брони уже записал BookingService, в журнал их пишем здесь
+                if self.storage is None:
+                    if len(bookings) == 1:
+                        self._log_change(self.journal.log_booking_created, bookings[0])
+                    else:
+                        self._log_change(self.journal.log_bookings_created, bookings)
+
+            if len(bookings) == 1:
+                print(f"Билет успешно забронирован! Номер брони: {bookings[0].booking_id}")
+            else:
+                booking_ids = ', '.join(str(booking.booking_id) for booking in bookings)
+                print(f"Билеты успешно забронированы! Номера броней: {booking_ids}")
 
         except (ValueError, IndexError) as e:
             print(f"Неверный ввод: {e}")
-        except (UserNotFound, SessionNotFoundError, InvalidSeatError, SeatBookedError, BookingError) as e:
+        except (UserNotFound, SessionNotFoundError, InvalidSeatError, SeatBookedError, BookingError,
+                SeatHoldError) as e:
             print(f"Ошибка бронирования: {e}")
         except Exception as e:
             print(f"Неизвестная ошибка: {e}")
@@ -271,7 +403,7 @@ class CinemaApp:
             return
 
         print("\n--- Мои бронирования ---")
-        bookings = self.current_user.bookings
+        bookings = self.cinema.bookings.for_user(self.current_user)
 
         if not bookings:
             print("У вас нет активных бронирований")
@@ -286,7 +418,7 @@ class CinemaApp:
             return
 
         print("\n--- Отмена бронирования ---")
-        bookings = self.current_user.bookings
+        bookings = self.cinema.bookings.for_user(self.current_user)
 
         if not bookings:
             print("У вас нет активных бронирований")
@@ -304,23 +436,30 @@ class CinemaApp:
 
             selected_booking = bookings[booking_choice]
 
-            success = self.cinema.booking_service.cancel_booking(
-                self.current_user.user_id,
-                selected_booking.booking_id
-            )
+            with self._state_lock:
+                success = self.cinema.booking_service.cancel_booking(
+                    self.current_user.user_id,
+                    selected_booking.booking_id
+                )
+                if success and self.storage is None:
+                    self._log_change(self.journal.log_booking_cancelled, self.current_user.user_id,
+                                     selected_booking.booking_id)
 
             if success:
-                self._save_data()
                 print("Бронь успешно отменена!")
             else:
                 print("Ошибка отмены брони")
 
         except (ValueError, IndexError) as e:
             print(f"Неверный ввод: {e}")
+        except FileOperationError as e:
+            print(f"Ошибка отмены брони: {e}")
         except Exception as e:
             print(f"Неизвестная ошибка: {e}")
 
 
 if __name__ == "__main__":
-    app = CinemaApp()
+    # Хранилище можно выбрать аргументом: json (по умолчанию) или sqlite;
+    # второй аргумент lazy включает ленивую загрузку из базы
+    app = CinemaApp(sys.argv[1] if len(sys.argv) > 1 else "json", lazy="lazy" in sys.argv[2:])
     app.run()
\ No newline at end of file
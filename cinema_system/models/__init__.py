@@ -5,9 +5,12 @@ from .exceptions import (
     SessionNotFoundError,
     UserNotFound,
     BookingError,
+    ScheduleConflictError,
+    SeatHoldError,
     FileOperationError
 )
 
+from .seat_map import SeatMap
 from .cinema_hall import CinemaHall
 from .film import Film
 from .user import User
@@ -21,7 +24,10 @@ __all__ = [
     'SessionNotFoundError',
     'UserNotFound',
     'BookingError',
+    'ScheduleConflictError',
+    'SeatHoldError',
     'FileOperationError',
+    'SeatMap',
     'CinemaHall',
     'Film',
     'User',
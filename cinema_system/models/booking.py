@@ -1,9 +1,12 @@
-from datetime import datetime
+from typing import Dict
+
 from .user import User
 from .session import Session
 
 
 class Booking:
+    __slots__ = ('booking_id', 'user', 'session', 'row', 'seat')
+
     """Инициализация брони"""
 
     def __init__(self, booking_id: int, user: User, session: Session, row: int, seat: int):
@@ -13,6 +16,16 @@ class Booking:
         self.row = row
         self.seat = seat
 
+    """Объекты броней создаются хранилищем заново при каждом запросе, поэтому сравниваются по ID"""
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Booking):
+            return NotImplemented
+        return self.booking_id == other.booking_id
+
+    def __hash__(self) -> int:
+        return hash(self.booking_id)
+
     def __repr__(self):
         return (f"Бронь #{self.booking_id}: {self.session.movie.title}, "
                 f"ряд {self.row}, место {self.seat}")
@@ -31,9 +44,9 @@ class Booking:
     """Десериализация"""
 
     @classmethod
-    def from_dict(cls, data: dict, users: list, sessions: list) -> 'Booking':
-        user = next((u for u in users if u.user_id == data['user_id']), None)
-        session = next((s for s in sessions if s.session_id == data['session_id']), None)
+    def from_dict(cls, data: dict, users: Dict[int, User], sessions: Dict[int, Session]) -> 'Booking':
+        user = users.get(data['user_id'])
+        session = sessions.get(data['session_id'])
 
         if not user or not session:
             raise ValueError("Не найден пользователь или сеанс")
@@ -29,6 +29,16 @@ class BookingError(CinemaError):
     pass
 
 
+class ScheduleConflictError(CinemaError):
+    """Зал уже занят другим сеансом"""
+    pass
+
+
+class SeatHoldError(CinemaError):
+    """Удержание мест не найдено или истекло"""
+    pass
+
+
 class FileOperationError(CinemaError):
     """Ошибка работы с файлами"""
     pass
@@ -1,4 +1,6 @@
 class Film:
+    __slots__ = ('film_id', 'title', 'duration', 'genre', 'rating')
+
     """Инициализация фильма"""
     def __init__(self, film_id: int, title: str, duration: int, genre: str, rating: float = 0.0):
         self.film_id = film_id
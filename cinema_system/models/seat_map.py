@@ -0,0 +1,279 @@
+from bisect import bisect_left, bisect_right
+from heapq import nsmallest
+from itertools import compress, count
+from typing import Iterable, List, Optional, Set, Tuple, Union
+from .exceptions import InvalidSeatError, SeatBookedError
+
+# Состояния места в карте
+FREE = 0
+RESERVED = 1
+HELD = 2
+
+# Таблица перевода байтов карты мест: 0 (свободно) -> 1, всё остальное -> 0
+_FREE_MASK = bytes([1] + [0] * 255)
+
+# Общий для всех карт мест счетчик версий: версия не повторяется, даже если
+# сеанс и его карта мест созданы заново (перезагрузка данных, ленивая подгрузка)
+_versions = count(1)
+
+
+"""Новая версия данных о местах, больше всех выданных ранее"""
+
+
+def next_version() -> int:
+    return next(_versions)
+
+
+class SeatMap:
+    """Карта мест одного сеанса: один байт на место.
+
+    0 - свободно, 1 - забронировано, 2 - временно удерживается до оплаты.
+    Удерживаемое место недоступно для бронирования, но не сохраняется
+    как забронированное.
+    """
+
+    __slots__ = ('rows', 'seats_per_row', '_seats', '_free_count', '_free_runs', 'version')
+
+    def __init__(self, rows: int, seats_per_row: int):
+        self.rows = rows
+        self.seats_per_row = seats_per_row
+        self._seats = bytearray(rows * seats_per_row)
+        self._free_count = rows * seats_per_row
+        # Непрерывные отрезки свободных мест по рядам: [(начала), (концы)].
+        # Строятся при первом поиске лучших мест и дальше поддерживаются инкрементально
+        self._free_runs: Optional[List[Tuple[List[int], List[int]]]] = None
+        # Версия карты меняется при каждом изменении: по ней кэши понимают, что данные устарели
+        self.version = next_version()
+
+    """Индекс места в плоской карте"""
+
+    def _seat_index(self, row: int, seat: int) -> int:
+        return (row - 1) * self.seats_per_row + (seat - 1)
+
+    """Метод для проверки валидности указанного места"""
+
+    def is_valid_seat(self, row: int, seat: int) -> bool:
+        if 0 < row <= self.rows and 0 < seat <= self.seats_per_row:
+            return True
+        raise InvalidSeatError(f"Указано неверное место: {row} ряд, {seat} место")
+
+    """Проверить, забронировано ли место"""
+
+    def is_reserved(self, row: int, seat: int) -> bool:
+        self.is_valid_seat(row, seat)
+        return self._seats[self._seat_index(row, seat)] != 0
+
+    """Проверить, удерживается ли место до оплаты"""
+
+    def is_held(self, row: int, seat: int) -> bool:
+        self.is_valid_seat(row, seat)
+        return self._seats[self._seat_index(row, seat)] == HELD
+
+    """Занять свободное место (бронью или удержанием)"""
+
+    def _take(self, row: int, seat: int, state: int) -> bool:
+        self.is_valid_seat(row, seat)
+
+        index = self._seat_index(row, seat)
+        if self._seats[index] == HELD:
+            raise SeatBookedError(f"{seat} место, {row} ряд временно заняты")
+        if self._seats[index]:
+            raise SeatBookedError(f"{seat} место, {row} ряд уже забронированы")
+
+        self._seats[index] = state
+        self._free_count -= 1
+        self.version = next_version()
+        if self._free_runs is not None:
+            self._runs_take(row, seat)
+        return True
+
+    """Зарезервировать место"""
+
+    def reserve_seat(self, row: int, seat: int) -> bool:
+        return self._take(row, seat, RESERVED)
+
+    """Удерживать место до оплаты"""
+
+    def hold_seat(self, row: int, seat: int) -> bool:
+        return self._take(row, seat, HELD)
+
+    """Превратить удержание места в бронь"""
+
+    def confirm_hold(self, row: int, seat: int) -> bool:
+        self.is_valid_seat(row, seat)
+
+        index = self._seat_index(row, seat)
+        if self._seats[index] != HELD:
+            raise SeatBookedError(f"{seat} место, {row} ряд не удерживаются")
+        self._seats[index] = RESERVED
+        self.version = next_version()
+        return True
+
+    """Освободить место"""
+
+    def to_free_seat(self, row: int, seat: int) -> bool:
+        self.is_valid_seat(row, seat)
+
+        return self._release(row, seat, RESERVED)
+
+    """Снять удержание места"""
+
+    def release_hold(self, row: int, seat: int) -> bool:
+        self.is_valid_seat(row, seat)
+        return self._release(row, seat, HELD)
+
+    def _release(self, row: int, seat: int, state: int) -> bool:
+        index = self._seat_index(row, seat)
+        if not self._seats[index]:
+            raise SeatBookedError(f"Место и так свободно")
+        if self._seats[index] != state:
+            raise SeatBookedError(f"{seat} место, {row} ряд удерживаются до оплаты" if state == RESERVED
+                                  else f"{seat} место, {row} ряд уже забронированы")
+
+        self._seats[index] = FREE
+        self._free_count += 1
+        self.version = next_version()
+        if self._free_runs is not None:
+            self._runs_release(row, seat)
+        return True
+
+    """Количество свободных мест за O(1)"""
+
+    def count_available_seats(self) -> int:
+        return self._free_count
+
+    """Геттер доступных для бронирования мест"""
+
+    def get_available_seats(self) -> List[Tuple[int, int]]:
+        seats_per_row = self.seats_per_row
+        free_indexes = compress(range(len(self._seats)), self._seats.translate(_FREE_MASK))
+        return [(index // seats_per_row + 1, index % seats_per_row + 1) for index in free_indexes]
+
+    """Геттер карты мест с забронированными и доступными местами"""
+
+    def get_map_hall(self) -> List[Union[Tuple[int, int], str]]:
+        matrix = []
+        index = 0
+        for row in range(1, self.rows + 1):
+            for seat in range(1, self.seats_per_row + 1):
+                if self._seats[index]:
+                    matrix.append('X')
+                else:
+                    matrix.append((row, seat))
+                index += 1
+        return matrix
+
+    """Множество забронированных мест в виде кортежей (ряд, место)"""
+
+    def get_reserved_seats(self) -> Set[Tuple[int, int]]:
+        seats_per_row = self.seats_per_row
+        reserved = set()
+        index = self._seats.find(RESERVED)
+        while index != -1:
+            reserved.add((index // seats_per_row + 1, index % seats_per_row + 1))
+            index = self._seats.find(RESERVED, index + 1)
+        return reserved
+
+    """Построить отрезки свободных мест по всем рядам"""
+
+    def _build_free_runs(self) -> None:
+        runs = []
+        for row in range(self.rows):
+            starts, ends = [], []
+            base = row * self.seats_per_row
+            run_start = None
+            for seat in range(1, self.seats_per_row + 1):
+                if not self._seats[base + seat - 1]:
+                    if run_start is None:
+                        run_start = seat
+                elif run_start is not None:
+                    starts.append(run_start)
+                    ends.append(seat - 1)
+                    run_start = None
+            if run_start is not None:
+                starts.append(run_start)
+                ends.append(self.seats_per_row)
+            runs.append((starts, ends))
+        self._free_runs = runs
+
+    """Место занято: разрезать отрезок, в который оно попадает"""
+
+    def _runs_take(self, row: int, seat: int) -> None:
+        starts, ends = self._free_runs[row - 1]
+        i = bisect_right(starts, seat) - 1
+        start, end = starts[i], ends[i]
+        if start == end:
+            del starts[i]
+            del ends[i]
+        elif seat == start:
+            starts[i] = seat + 1
+        elif seat == end:
+            ends[i] = seat - 1
+        else:
+            ends[i] = seat - 1
+            starts.insert(i + 1, seat + 1)
+            ends.insert(i + 1, end)
+
+    """Место освободилось: склеить его с соседними отрезками"""
+
+    def _runs_release(self, row: int, seat: int) -> None:
+        starts, ends = self._free_runs[row - 1]
+        i = bisect_left(starts, seat)
+        joins_left = i > 0 and ends[i - 1] == seat - 1
+        joins_right = i < len(starts) and starts[i] == seat + 1
+        if joins_left and joins_right:
+            ends[i - 1] = ends[i]
+            del starts[i]
+            del ends[i]
+        elif joins_left:
+            ends[i - 1] = seat
+        elif joins_right:
+            starts[i] = seat
+        else:
+            starts.insert(i, seat)
+            ends.insert(i, seat)
+
+    """Найти до limit лучших блоков из count соседних свободных мест.
+
+    Чем ближе блок к центру зала (по ряду и по месту), тем он лучше.
+    """
+
+    def find_seat_blocks(self, count: int, limit: int = 5) -> List[List[Tuple[int, int]]]:
+        if count <= 0 or count > self.seats_per_row:
+            return []
+        if self._free_runs is None:
+            self._build_free_runs()
+
+        center_row = (self.rows + 1) / 2
+        center_seat = (self.seats_per_row + 1) / 2
+        ideal_start = round(center_seat - (count - 1) / 2)
+
+        candidates = []
+        for row, (starts, ends) in enumerate(self._free_runs, 1):
+            row_penalty = abs(row - center_row)
+            for start, end in zip(starts, ends):
+                if end - start + 1 < count:
+                    continue
+                best_start = min(max(ideal_start, start), end - count + 1)
+                block_center = best_start + (count - 1) / 2
+                score = row_penalty + abs(block_center - center_seat)
+                candidates.append((score, row, best_start))
+
+        return [[(row, start + i) for i in range(count)]
+                for _, row, start in nsmallest(limit, candidates)]
+
+    """Лучший блок из count соседних свободных мест (пустой список, если такого нет)"""
+
+    def find_best_seats(self, count: int) -> List[Tuple[int, int]]:
+        blocks = self.find_seat_blocks(count, limit=1)
+        return blocks[0] if blocks else []
+
+    """Зарезервировать набор мест (при загрузке данных)"""
+
+    def reserve_many(self, seats: Iterable[Tuple[int, int]]) -> None:
+        for row, seat in seats:
+            self.reserve_seat(row, seat)
+
+    def __repr__(self) -> str:
+        return (f"SeatMap(rows={self.rows}, seats_per_row={self.seats_per_row}, "
+                f"free={self._free_count})")
@@ -1,8 +1,19 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .exceptions import BookingError
 from .film import Film
 from .cinema_hall import CinemaHall
+from .seat_map import SeatMap, next_version
+
+TIME_FORMAT = "%Y-%m-%d %H:%M"
 
 
 class Session:
+    __slots__ = ('session_id', 'movie', 'hall', '_time', '_start_time', 'price',
+                 '_seat_map', '_released', '_version', 'lock')
+
     def __init__(self, session_id: int, movie: Film, hall: CinemaHall,
                  time: str, price: int):
         self.session_id = session_id
@@ -10,6 +21,13 @@ class Session:
         self.hall = hall
         self.time = time
         self.price = price
+        # Карта мест сеанса создается при первом бронировании
+        self._seat_map: Optional[SeatMap] = None
+        self._released = False
+        # Версия мест, пока у сеанса нет карты мест (до первого бронирования и после освобождения)
+        self._version = next_version()
+        # Блокировка карты мест сеанса для параллельных бронирований
+        self.lock = threading.Lock()
 
     def __repr__(self) -> str:
         return (f"Сеанс:\n"
@@ -18,23 +36,188 @@ class Session:
                 f"Время: {self.time}\n"
                 f"Цена: {self.price} руб.")
 
+    """Время сеанса строкой (при изменении сбрасывается разобранное время)"""
+
+    @property
+    def time(self) -> str:
+        return self._time
+
+    @time.setter
+    def time(self, value: str) -> None:
+        self._time = value
+        self._start_time: Optional[datetime] = None
+
+    """Время начала сеанса (строка разбирается один раз)"""
+
+    @property
+    def start_time(self) -> datetime:
+        if self._start_time is None:
+            self._start_time = datetime.strptime(self._time, TIME_FORMAT)
+        return self._start_time
+
+    """Время окончания сеанса (начало + длительность фильма)"""
+
+    @property
+    def end_time(self) -> datetime:
+        return self.start_time + timedelta(minutes=self.movie.duration)
+
+    """Прошел ли сеанс"""
+
+    def is_past(self, now: Optional[datetime] = None) -> bool:
+        return self.start_time < (now or datetime.now())
+
+    """Закрыт ли сеанс для бронирования: уже прошел или его карта мест освобождена"""
+
+    def is_closed(self, now: Optional[datetime] = None) -> bool:
+        return self._released or self.is_past(now)
+
+    """Освобождена ли карта мест прошедшего сеанса"""
+
+    def is_released(self) -> bool:
+        return self._released
+
+    """Карта мест сеанса (создается лениво по схеме зала)"""
+
+    @property
+    def seats(self) -> SeatMap:
+        if self._released:
+            raise BookingError(f"Сеанс {self.session_id} уже прошел")
+        if self._seat_map is None:
+            self._seat_map = self.hall.create_seat_map()
+        return self._seat_map
+
+    """Карта мест для новых броней и удержаний (на прошедший сеанс бронировать нельзя)"""
+
+    def bookable_seats(self) -> SeatMap:
+        if self.is_closed():
+            raise BookingError(f"Сеанс {self.session_id} уже прошел")
+        return self.seats
+
+    """Создана ли карта мест сеанса"""
+
+    def has_seat_map(self) -> bool:
+        return self._seat_map is not None
+
+    """Версия состояния мест сеанса: меняется при каждом изменении карты мест.
+
+    Версии берутся из общего счетчика, поэтому у пересозданного сеанса с тем же
+    ID версия не совпадет с закэшированной для прежнего объекта.
+    """
+
+    @property
+    def seat_version(self) -> int:
+        seat_map = self._seat_map
+        if seat_map is None:
+            return self._version
+        return seat_map.version
+
+    """Освободить память карты мест прошедшего сеанса"""
+
+    def release_seats(self) -> None:
+        self._version = next_version()
+        self._seat_map = None
+        self._released = True
+
+    """Зарезервировать место на сеанс"""
+
+    def reserve_seat(self, row: int, seat: int) -> bool:
+        return self.seats.reserve_seat(row, seat)
+
+    """Освободить место на сеансе (у прошедшего сеанса карты мест уже нет)"""
+
+    def to_free_seat(self, row: int, seat: int) -> bool:
+        if self._released:
+            return False
+        return self.seats.to_free_seat(row, seat)
+
+    """Удерживать место до оплаты"""
+
+    def hold_seat(self, row: int, seat: int) -> bool:
+        return self.bookable_seats().hold_seat(row, seat)
+
+    """Снять удержание места (у прошедшего сеанса карты мест уже нет)"""
+
+    def release_hold(self, row: int, seat: int) -> bool:
+        if self._seat_map is None:
+            return False
+        return self._seat_map.release_hold(row, seat)
+
+    """Превратить удержание места в бронь"""
+
+    def confirm_hold(self, row: int, seat: int) -> bool:
+        return self.bookable_seats().confirm_hold(row, seat)
+
+    """Количество свободных мест (у прошедшего сеанса свободных мест нет)"""
+
+    def count_available_seats(self) -> int:
+        if self.is_closed():
+            return 0
+        if self._seat_map is None:
+            return self.hall.rows * self.hall.seats_per_row
+        return self._seat_map.count_available_seats()
+
+    """Геттер доступных для бронирования мест"""
+
+    def get_available_seats(self) -> List[Tuple[int, int]]:
+        if self.is_closed():
+            return []
+        if self._seat_map is None:
+            return self.hall.get_available_seats()
+        return self._seat_map.get_available_seats()
+
+    """Геттер карты зала на сеанс"""
+
+    def get_map_hall(self) -> List[Union[Tuple[int, int], str]]:
+        if self.is_closed():
+            return []
+        if self._seat_map is None:
+            return self.hall.get_map_hall()
+        return self._seat_map.get_map_hall()
+
+    """Подобрать лучший блок из count соседних свободных мест.
+
+    Отрезки свободных мест строятся и читаются под блокировкой сеанса: иначе
+    место, занятое во время их построения, не попадет в индекс отрезков.
+    """
+
+    def find_best_seats(self, count: int) -> List[Tuple[int, int]]:
+        if self.is_closed():
+            return []
+        with self.lock:
+            return self.seats.find_best_seats(count)
+
+    """Забронированные места сеанса"""
+
+    @property
+    def reserved_seats(self) -> Set[Tuple[int, int]]:
+        if self._seat_map is None:
+            return set()
+        return self._seat_map.get_reserved_seats()
+
     """Сериализация в словарь"""
 
     def to_dict(self) -> dict:
-        return {
+        session_dict = {
             'session_id': self.session_id,
             'movie_id': self.movie.film_id,
             'hall_id': self.hall.id,
             'time': self.time,
-            'price': self.price
+            'price': self.price,
         }
+        # Карты мест освобожденного сеанса нет: без ключа загрузчик восстановит места по броням
+        if not self._released:
+            session_dict['reserved_seats'] = [list(seat) for seat in sorted(self.reserved_seats)]
+        return session_dict
 
     @classmethod
-    def from_dict(cls, data: dict, films: list, halls: list) -> 'Session':
-        movie = next((f for f in films if f.film_id == data['movie_id']), None)
-        hall = next((h for h in halls if h.id == data['hall_id']), None)
+    def from_dict(cls, data: dict, films: Dict[int, Film], halls: Dict[int, CinemaHall]) -> 'Session':
+        movie = films.get(data['movie_id'])
+        hall = halls.get(data['hall_id'])
 
         if not movie or not hall:
             raise ValueError("Не найден фильм или зал для сеанса")
 
-        return cls(data['session_id'], movie, hall, data['time'], data['price'])
\ No newline at end of file
+        session = cls(data['session_id'], movie, hall, data['time'], data['price'])
+        if data.get('reserved_seats'):
+            session.seats.reserve_many(tuple(seat) for seat in data['reserved_seats'])
+        return session
@@ -1,19 +1,66 @@
+from array import array
+from typing import Dict, List, Optional, Union
+
+# Пока броней немного, их ID лежат в компактном массиве. У пользователя с большим
+# числом броней массив заменяется словарем (порядок добавления сохраняется),
+# чтобы проверка и удаление брони стоили O(1), а не проход по всему массиву
+INDEXED_BOOKINGS = 64
+
+
 class User:
+    __slots__ = ('user_id', 'name', '_booking_ids')
 
     def __init__(self, user_id: int, name: str):
         self.user_id = user_id
         self.name = name
-        self.bookings = []
+        # ID броней в порядке добавления; сами брони лежат в BookingStore.
+        # Массив создается при первой брони: у большинства пользователей их нет
+        self._booking_ids: Optional[Union[array, Dict[int, None]]] = None
+
+    """ID броней пользователя в порядке добавления"""
+    @property
+    def booking_ids(self) -> List[int]:
+        return list(self._booking_ids) if self._booking_ids else []
+
+    """Количество броней пользователя"""
+    @property
+    def booking_count(self) -> int:
+        return len(self._booking_ids) if self._booking_ids else 0
 
     """Добавить бронирование пользователю"""
     def add_booking(self, booking) -> None:
-        self.bookings.append(booking)
+        booking_ids = self._booking_ids
+        if booking_ids is None:
+            booking_ids = self._booking_ids = array('q')
+        if isinstance(booking_ids, dict):
+            booking_ids[booking.booking_id] = None
+            return
+        booking_ids.append(booking.booking_id)
+        if len(booking_ids) > INDEXED_BOOKINGS:
+            self._booking_ids = dict.fromkeys(booking_ids)
+
+    """Есть ли у пользователя бронь с таким ID"""
+    def has_booking(self, booking_id: int) -> bool:
+        return bool(self._booking_ids) and booking_id in self._booking_ids
+
+    """Удалить бронь пользователя (False, если брони нет)"""
+    def remove_booking(self, booking_id: int) -> bool:
+        booking_ids = self._booking_ids
+        if not booking_ids:
+            return False
+        if isinstance(booking_ids, dict):
+            return booking_ids.pop(booking_id, False) is None
+        try:
+            booking_ids.remove(booking_id)
+        except ValueError:
+            return False
+        return True
 
     def __repr__(self) -> str:
         return (f"Пользователь:\n"
                 f"ID: {self.user_id}\n"
                 f"Имя: {self.name}\n"
-                f"Броней: {len(self.bookings)}")
+                f"Броней: {self.booking_count}")
 
     """Сериализация в словарь"""
 
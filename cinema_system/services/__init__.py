@@ -1,11 +1,44 @@
 from .cinema_service import CinemaTheater
-from .booking_service import BookingService
+from .booking_service import BookingService, IdAllocator
+from .booking_store import BookingStore
 from .file_service import JSONFileService, XMLFileService, DataSerializer
+from .binary_service import BinaryFileService, BinarySnapshot
+from .journal_service import JournalService
+from .async_service import AsyncCinemaService
+from .search_index import TextSearchIndex
+from .schedule_index import ScheduleIndex
+from .change_tracker import ChangeTracker
+from .background_saver import BackgroundSaver
+from .hold_service import HoldService, SeatHold
+from .read_cache import VersionedLRUCache, CinemaReadCache
+from .sharded_service import ShardedBookingService
+from .sqlite_service import SQLiteStorage
+from .lazy_cinema import LazyCinemaTheater, SnapshotSource
+from .periodic_task import PeriodicTask
 
 __all__ = [
     'CinemaTheater',
     'BookingService',
+    'IdAllocator',
+    'BookingStore',
     'JSONFileService',
     'XMLFileService',
-    'DataSerializer'
+    'DataSerializer',
+    'BinaryFileService',
+    'BinarySnapshot',
+    'JournalService',
+    'AsyncCinemaService',
+    'TextSearchIndex',
+    'ScheduleIndex',
+    'ChangeTracker',
+    'BackgroundSaver',
+    'HoldService',
+    'SeatHold',
+    'VersionedLRUCache',
+    'CinemaReadCache',
+    'ShardedBookingService',
+    'SQLiteStorage',
+    'LazyCinemaTheater',
+    'SnapshotSource',
+    'PeriodicTask'
 ]
\ No newline at end of file
@@ -0,0 +1,117 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from cinema_system.models.booking import Booking
+from cinema_system.models.exceptions import SessionNotFoundError
+from cinema_system.models.session import Session
+from .file_service import DataSerializer, JSONFileService, XMLFileService
+
+
+class AsyncCinemaService:
+    """Асинхронный фасад над CinemaTheater и BookingService.
+
+    Операции с данными выполняются в памяти прямо в цикле событий, а запись
+    на диск уходит в executor. Изменения, пришедшие в течение save_delay
+    секунд, сохраняются одной записью.
+    """
+
+    def __init__(self, cinema_theater, data_file: str = "cinema_data.json",
+                 xml_file: Optional[str] = None, save_delay: float = 0.5,
+                 executor: Optional[Executor] = None):
+        self.cinema = cinema_theater
+        self.data_file = data_file
+        self.xml_file = xml_file
+        self.save_delay = save_delay
+        self._executor = executor
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+        self.saves_count = 0
+
+    """Создать бронирование"""
+
+    async def create_booking(self, user_id: int, session_id: int, row: int, seat: int) -> Booking:
+        booking = self.cinema.booking_service.create_booking(user_id, session_id, row, seat)
+        self._schedule_save()
+        return booking
+
+    """Забронировать несколько мест на один сеанс"""
+
+    async def create_group_booking(self, user_id: int, session_id: int,
+                                   seats: List[Tuple[int, int]]) -> List[Booking]:
+        bookings = self.cinema.booking_service.create_group_booking(user_id, session_id, seats)
+        self._schedule_save()
+        return bookings
+
+    """Отменить бронирование"""
+
+    async def cancel_booking(self, user_id: int, booking_id: int) -> bool:
+        success = self.cinema.booking_service.cancel_booking(user_id, booking_id)
+        if success:
+            self._schedule_save()
+        return success
+
+    """Отменить все брони сеанса"""
+
+    async def cancel_session_bookings(self, session_id: int) -> List[Booking]:
+        cancelled = self.cinema.booking_service.cancel_session_bookings(session_id)
+        if cancelled:
+            self._schedule_save()
+        return cancelled
+
+    """Найти сеансы по названию фильма"""
+
+    async def find_sessions(self, movie_title: str) -> List[Session]:
+        return self.cinema.find_sessions_by_movie(movie_title)
+
+    """Карта зала на сеанс"""
+
+    async def get_seat_map(self, session_id: int) -> List[Union[Tuple[int, int], str]]:
+        return self._get_session(session_id).get_map_hall()
+
+    """Свободные места на сеанс"""
+
+    async def get_available_seats(self, session_id: int) -> List[Tuple[int, int]]:
+        return self._get_session(session_id).get_available_seats()
+
+    """Подобрать лучший блок из count соседних свободных мест"""
+
+    async def find_best_seats(self, session_id: int, count: int) -> List[Tuple[int, int]]:
+        return self._get_session(session_id).find_best_seats(count)
+
+    def _get_session(self, session_id: int) -> Session:
+        session = self.cinema.get_session(session_id)
+        if not session:
+            raise SessionNotFoundError(f"Сеанс с ID {session_id} не найден")
+        return session
+
+    """Запланировать сохранение (несколько изменений объединяются в одну запись)"""
+
+    def _schedule_save(self) -> None:
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save_loop())
+
+    async def _save_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._dirty:
+            await asyncio.sleep(self.save_delay)
+            self._dirty = False
+            # Снимок строится в цикле событий, чтобы не читать данные во время изменения
+            data = DataSerializer.serialize_cinema_data(self.cinema)
+            try:
+                await loop.run_in_executor(self._executor, self._write, data)
+                self.saves_count += 1
+            except Exception as e:
+                print(f"Ошибка сохранения данных: {e}")
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        JSONFileService.save_to_json(data, self.data_file)
+        if self.xml_file:
+            XMLFileService.save_to_xml(data, self.xml_file)
+
+    """Дождаться записи всех накопленных изменений"""
+
+    async def flush(self) -> None:
+        if self._save_task is not None:
+            await self._save_task
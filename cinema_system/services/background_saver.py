@@ -0,0 +1,129 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Служебные элементы очереди
+_SAVE = object()
+_STOP = object()
+
+
+class BackgroundSaver:
+    """Фоновое сохранение данных: отдельный поток с очередью запросов.
+
+    request_save только ставит запрос в очередь. Поток собирает запросы,
+    пришедшие в течение delay секунд после первого (но не больше max_pending),
+    и выполняет одно сохранение на всю пачку. flush дожидается записи всех
+    поставленных запросов, close дописывает оставшееся и останавливает поток.
+    """
+
+    def __init__(self, save: Callable[[], None], delay: float = 0.5, max_pending: int = 100):
+        self._save = save
+        self.delay = delay
+        self.max_pending = max_pending
+        self._queue: queue.Queue = queue.Queue()
+
+        self.requests_count = 0
+        self.saves_count = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+        self.last_error: Optional[Exception] = None
+
+        self._thread = threading.Thread(target=self._run, name="background-saver", daemon=True)
+        self._thread.start()
+
+    """Запросить сохранение (не блокирует вызывающий поток)"""
+
+    def request_save(self) -> None:
+        self._queue.put(_SAVE)
+
+    """Сохранить накопленные изменения сейчас и дождаться записи.
+
+    Возвращает True, если сохранение прошло без ошибки.
+    """
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        if not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout) and self.last_error is None
+
+    """Дописать оставшиеся изменения и остановить поток"""
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    """Количество запросов в очереди"""
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    """Метрики: число запросов и сохранений, задержка записи в секундах"""
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            'requests': self.requests_count,
+            'saves': self.saves_count,
+            'queue_depth': self.queue_depth,
+            'last_latency': self.last_latency,
+            'max_latency': self.max_latency,
+            'avg_latency': self._total_latency / self.saves_count if self.saves_count else 0.0,
+        }
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            pending = 0
+            waiters = []
+            stop = False
+            deadline = time.monotonic() + self.delay
+
+            # Собираем запросы до конца окна, до max_pending или до flush/close
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif item is _SAVE:
+                    pending += 1
+                else:
+                    waiters.append(item)
+                if stop or waiters or pending >= self.max_pending:
+                    break
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+            if pending or waiters:
+                self._save_now(pending)
+            for done in waiters:
+                done.set()
+            if stop:
+                return
+
+    def _save_now(self, pending: int) -> None:
+        started = time.perf_counter()
+        try:
+            self._save()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = e
+            print(f"Ошибка сохранения данных: {e}")
+        finally:
+            latency = time.perf_counter() - started
+            self.requests_count += pending
+            self.saves_count += 1
+            self.last_latency = latency
+            self.max_latency = max(self.max_latency, latency)
+            self._total_latency += latency
+
+    def __repr__(self) -> str:
+        return (f"BackgroundSaver(saves={self.saves_count}, requests={self.requests_count}, "
+                f"queue_depth={self.queue_depth})")
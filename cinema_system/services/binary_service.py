@@ -0,0 +1,366 @@
+import mmap
+import struct
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from cinema_system.models.exceptions import FileOperationError
+from .file_service import atomic_write
+
+MAGIC = b'CINB'
+# Версия 2 добавила индексы сеансов по времени и броней по пользователям и сеансам
+VERSION = 2
+
+# Заголовок: сигнатура, версия, next_user_id, next_booking_id
+_HEADER = struct.Struct('<4sHxxqq')
+# Таблица разделов: смещение, количество записей, размер записи
+_SECTION = struct.Struct('<QQI4x')
+
+# Записи фиксированной длины; строки хранятся как (смещение, длина) в таблице строк.
+# Первое поле каждой записи - ID, записи отсортированы по нему
+_USER = struct.Struct('<qII')
+_HALL = struct.Struct('<qIIiii')
+_FILM = struct.Struct('<qIIiIId')
+_SESSION = struct.Struct('<qqqIIqQI4x')
+_BOOKING = struct.Struct('<qqqii')
+# Запись индекса: ключ и номер записи в разделе; записи отсортированы по ключу
+_INDEX = struct.Struct('<qI')
+
+# Смещение битовой карты у сеанса без карты мест (в исходных данных не было reserved_seats):
+# при загрузке его места восстанавливаются по броням
+_NO_SEATS = 0xFFFFFFFFFFFFFFFF
+
+_SECTION_NAMES = ('strings', 'users', 'halls', 'films', 'sessions', 'bookings', 'seats')
+_INDEX_NAMES = ('sessions_by_time', 'bookings_by_user', 'bookings_by_session')
+
+
+"""Время сеанса (строка в формате Session.TIME_FORMAT) числом ГГГГММДДЧЧММ для индекса"""
+
+
+def _time_key(time: str) -> int:
+    return int(''.join(char for char in time if char.isdigit()))
+
+
+"""Индекс раздела: пары (ключ, номер записи), отсортированные по ключу и затем по ID записи"""
+
+
+def _pack_index(keys) -> bytes:
+    return b''.join(_INDEX.pack(key, position)
+                    for key, _, position in sorted((key, record_id, position)
+                                                   for position, (key, record_id) in enumerate(keys)))
+
+
+class _StringTable:
+    """Таблица строк: все строки снимка подряд в UTF-8"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._size = 0
+
+    def add(self, text: str) -> Tuple[int, int]:
+        if text not in self._offsets:
+            encoded = text.encode('utf-8')
+            self._offsets[text] = (self._size, len(encoded))
+            self._chunks.append(encoded)
+            self._size += len(encoded)
+        return self._offsets[text]
+
+    def to_bytes(self) -> bytes:
+        return b''.join(self._chunks)
+
+
+class _RecordSection(Sequence):
+    """Раздел снимка: записи декодируются только при обращении к ним"""
+
+    def __init__(self, snapshot: 'BinarySnapshot', offset: int, count: int,
+                 record: struct.Struct, decode: Callable[[tuple], Dict[str, Any]]):
+        self._snapshot = snapshot
+        self._offset = offset
+        self._count = count
+        self._record = record
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Номер записи вне раздела")
+        values = self._record.unpack_from(self._snapshot.buffer, self._offset + index * self._record.size)
+        return self._decode(values)
+
+    """ID записи без полного декодирования"""
+
+    def _key(self, index: int) -> int:
+        return struct.unpack_from('<q', self._snapshot.buffer, self._offset + index * self._record.size)[0]
+
+    """Найти запись по ID двоичным поиском"""
+
+    def find(self, record_id: int) -> Optional[Dict[str, Any]]:
+        keys = _KeyView(self)
+        index = bisect_left(keys, record_id)
+        if index < self._count and keys[index] == record_id:
+            return self[index]
+        return None
+
+    """Номера записей с ключом от low до high включительно (без high - до конца раздела)"""
+
+    def key_range(self, low: int, high: Optional[int] = None) -> range:
+        keys = _KeyView(self)
+        start = bisect_left(keys, low)
+        stop = self._count if high is None else bisect_right(keys, high, start)
+        return range(start, stop)
+
+
+class _KeyView(Sequence):
+    """Последовательность ID записей раздела (для bisect)"""
+
+    def __init__(self, section: _RecordSection):
+        self._section = section
+
+    def __len__(self) -> int:
+        return len(self._section)
+
+    def __getitem__(self, index: int) -> int:
+        return self._section._key(index)
+
+
+class BinarySnapshot(Mapping):
+    """Бинарный снимок, открытый через mmap.
+
+    Ведет себя как словарь DataSerializer.serialize_cinema_data, поэтому его
+    можно передать в DataSerializer.deserialize_cinema_data. Разделы users,
+    halls, films, sessions и bookings - ленивые последовательности словарей.
+    Индексы (с версии 2) позволяют найти сеансы после заданного времени и
+    брони пользователя или сеанса двоичным поиском, не читая весь раздел.
+    """
+
+    def __init__(self, filename: str):
+        self._file = open(filename, 'rb')
+        try:
+            self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, next_user_id, next_booking_id = _HEADER.unpack_from(self.buffer, 0)
+            if magic != MAGIC or version not in (1, VERSION):
+                raise ValueError("Неизвестный формат бинарного снимка")
+        except Exception:
+            self._file.close()
+            raise
+
+        self._values: Dict[str, Any] = {
+            'next_user_id': next_user_id,
+            'next_booking_id': next_booking_id,
+        }
+        sections = {}
+        position = _HEADER.size
+        for name in _SECTION_NAMES + (_INDEX_NAMES if version >= 2 else ()):
+            sections[name] = _SECTION.unpack_from(self.buffer, position)
+            position += _SECTION.size
+
+        self._strings_offset = sections['strings'][0]
+        self._seats_offset = sections['seats'][0]
+        decoders = {
+            'users': (_USER, self._decode_user),
+            'halls': (_HALL, self._decode_hall),
+            'films': (_FILM, self._decode_film),
+            'sessions': (_SESSION, self._decode_session),
+            'bookings': (_BOOKING, self._decode_booking),
+        }
+        for name, (record, decode) in decoders.items():
+            offset, count, _ = sections[name]
+            self._values[name] = _RecordSection(self, offset, count, record, decode)
+        # Индексы не входят в словарь данных: у снимков версии 1 их нет
+        self._indexes = {name: _RecordSection(self, sections[name][0], sections[name][1], _INDEX,
+                                              lambda values: values[1])
+                         for name in _INDEX_NAMES if name in sections}
+
+    """Есть ли в снимке индексы (снимки версии 1 их не содержат)"""
+
+    @property
+    def has_indexes(self) -> bool:
+        return bool(self._indexes)
+
+    def _indexed(self, section: str, index: str, low: int, high: Optional[int] = None) -> List[Dict[str, Any]]:
+        records, positions = self._values[section], self._indexes[index]
+        return [records[positions[i]] for i in positions.key_range(low, high)]
+
+    """Сеансы, начинающиеся не раньше time, в порядке времени и ID"""
+
+    def sessions_from(self, time: str) -> List[Dict[str, Any]]:
+        return self._indexed('sessions', 'sessions_by_time', _time_key(time))
+
+    """Брони пользователя в порядке ID"""
+
+    def user_bookings(self, user_id: int) -> List[Dict[str, Any]]:
+        return self._indexed('bookings', 'bookings_by_user', user_id, user_id)
+
+    """Брони сеанса в порядке ID"""
+
+    def session_bookings(self, session_id: int) -> List[Dict[str, Any]]:
+        return self._indexed('bookings', 'bookings_by_session', session_id, session_id)
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_offset + offset
+        return self.buffer[start:start + length].decode('utf-8')
+
+    def _decode_user(self, values: tuple) -> Dict[str, Any]:
+        user_id, name_offset, name_length = values
+        return {'user_id': user_id, 'name': self._string(name_offset, name_length)}
+
+    def _decode_hall(self, values: tuple) -> Dict[str, Any]:
+        hall_id, name_offset, name_length, rows, seats_per_row, total_seats = values
+        return {'id': hall_id, 'name': self._string(name_offset, name_length), 'rows': rows,
+                'seats_per_row': seats_per_row, 'total_seats': total_seats}
+
+    def _decode_film(self, values: tuple) -> Dict[str, Any]:
+        film_id, title_offset, title_length, duration, genre_offset, genre_length, rating = values
+        return {'film_id': film_id, 'title': self._string(title_offset, title_length),
+                'duration': duration, 'genre': self._string(genre_offset, genre_length),
+                'rating': rating}
+
+    def _decode_session(self, values: tuple) -> Dict[str, Any]:
+        (session_id, movie_id, hall_id, time_offset, time_length, price,
+         bitmap_offset, bitmap_length) = values
+        session = {'session_id': session_id, 'movie_id': movie_id, 'hall_id': hall_id,
+                   'time': self._string(time_offset, time_length), 'price': price}
+        if bitmap_offset == _NO_SEATS:
+            return session
+
+        reserved_seats = []
+        hall = self._values['halls'].find(hall_id) if bitmap_length else None
+        seats_per_row = hall['seats_per_row'] if hall else 0
+        start = self._seats_offset + bitmap_offset
+        bitmap = self.buffer[start:start + bitmap_length] if seats_per_row else b''
+        for byte_index, byte in enumerate(bitmap):
+            while byte:
+                bit = byte & -byte
+                index = byte_index * 8 + bit.bit_length() - 1
+                reserved_seats.append([index // seats_per_row + 1, index % seats_per_row + 1])
+                byte ^= bit
+        session['reserved_seats'] = reserved_seats
+        return session
+
+    @staticmethod
+    def _decode_booking(values: tuple) -> Dict[str, Any]:
+        booking_id, user_id, session_id, row, seat = values
+        return {'booking_id': booking_id, 'user_id': user_id, 'session_id': session_id,
+                'row': row, 'seat': seat}
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    """Закрыть отображение файла"""
+
+    def close(self) -> None:
+        self.buffer.close()
+        self._file.close()
+
+    def __enter__(self) -> 'BinarySnapshot':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class BinaryFileService:
+    """Сохранить данные в бинарный снимок"""
+
+    @staticmethod
+    def save_to_binary(data: Dict[str, Any], filename: str) -> None:
+        try:
+            strings = _StringTable()
+            seats_blob = bytearray()
+            halls = {hall['id']: hall for hall in data.get('halls', [])}
+
+            users = b''.join(_USER.pack(user['user_id'], *strings.add(user['name']))
+                             for user in sorted(data.get('users', []), key=lambda u: u['user_id']))
+            halls_blob = b''.join(
+                _HALL.pack(hall['id'], *strings.add(hall['name']), hall['rows'],
+                           hall['seats_per_row'], hall.get('total_seats', hall['rows'] * hall['seats_per_row']))
+                for hall in sorted(halls.values(), key=lambda h: h['id']))
+            films = b''.join(
+                _FILM.pack(film['film_id'], *strings.add(film['title']), film['duration'],
+                           *strings.add(film['genre']), film['rating'])
+                for film in sorted(data.get('films', []), key=lambda f: f['film_id']))
+
+            sessions = []
+            session_list = sorted(data.get('sessions', []), key=lambda s: s['session_id'])
+            for session in session_list:
+                hall = halls[session['hall_id']]
+                if 'reserved_seats' in session:
+                    bitmap = BinaryFileService._pack_seats(session['reserved_seats'],
+                                                           hall['rows'] * hall['seats_per_row'],
+                                                           hall['seats_per_row'])
+                    bitmap_offset = len(seats_blob)
+                else:
+                    bitmap, bitmap_offset = b'', _NO_SEATS
+                sessions.append(_SESSION.pack(session['session_id'], session['movie_id'],
+                                              session['hall_id'], *strings.add(session['time']),
+                                              session['price'], bitmap_offset, len(bitmap)))
+                seats_blob += bitmap
+            sessions_blob = b''.join(sessions)
+
+            booking_list = sorted(data.get('bookings', []), key=lambda b: b['booking_id'])
+            bookings = b''.join(
+                _BOOKING.pack(b['booking_id'], b['user_id'], b['session_id'], b['row'], b['seat'])
+                for b in booking_list)
+
+            indexes = [
+                _pack_index((_time_key(s['time']), s['session_id']) for s in session_list),
+                _pack_index((b['user_id'], b['booking_id']) for b in booking_list),
+                _pack_index((b['session_id'], b['booking_id']) for b in booking_list),
+            ]
+
+            strings_blob = strings.to_bytes()
+            blobs = [
+                (strings_blob, len(strings_blob), 1),
+                (users, len(users) // _USER.size, _USER.size),
+                (halls_blob, len(halls_blob) // _HALL.size, _HALL.size),
+                (films, len(films) // _FILM.size, _FILM.size),
+                (sessions_blob, len(sessions_blob) // _SESSION.size, _SESSION.size),
+                (bookings, len(bookings) // _BOOKING.size, _BOOKING.size),
+                (bytes(seats_blob), len(seats_blob), 1),
+            ] + [(index, len(index) // _INDEX.size, _INDEX.size) for index in indexes]
+
+            with atomic_write(filename, 'wb') as f:
+                f.write(_HEADER.pack(MAGIC, VERSION, data.get('next_user_id', 1),
+                                     data.get('next_booking_id', 1)))
+                offset = _HEADER.size + _SECTION.size * len(blobs)
+                for blob, count, record_size in blobs:
+                    f.write(_SECTION.pack(offset, count, record_size))
+                    offset += len(blob)
+                for blob, _, _ in blobs:
+                    f.write(blob)
+        except Exception as e:
+            raise FileOperationError(f"Ошибка сохранения бинарного снимка: {str(e)}")
+
+    """Упаковать забронированные места в битовую карту"""
+
+    @staticmethod
+    def _pack_seats(reserved_seats, total: int, seats_per_row: int) -> bytes:
+        if not reserved_seats:
+            return b''
+        bitmap = bytearray((total + 7) // 8)
+        for row, seat in reserved_seats:
+            index = (row - 1) * seats_per_row + (seat - 1)
+            bitmap[index >> 3] |= 1 << (index & 7)
+        return bytes(bitmap)
+
+    """Открыть бинарный снимок (записи читаются лениво)"""
+
+    @staticmethod
+    def load_from_binary(filename: str) -> BinarySnapshot:
+        try:
+            return BinarySnapshot(filename)
+        except Exception as e:
+            raise FileOperationError(f"Ошибка загрузки бинарного снимка: {str(e)}")
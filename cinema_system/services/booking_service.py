@@ -1,15 +1,96 @@
+import threading
+from typing import List, Sequence, Tuple
+
 from cinema_system.models.booking import Booking
 from cinema_system.models.exceptions import *
 
 
+class IdAllocator:
+    """Потокобезопасная выдача последовательных ID.
+
+    step - шаг между ID: при step=n несколько счетчиков с разными начальными
+    остатками по модулю n выдают непересекающиеся ID (например, шарды).
+    """
+
+    def __init__(self, next_id: int = 1, step: int = 1):
+        if step <= 0:
+            raise ValueError("Шаг ID должен быть положительным числом")
+        self._next_id = next_id
+        self.step = step
+        self._lock = threading.Lock()
+
+    """Выделить диапазон из count ID, вернуть первый"""
+    def allocate(self, count: int = 1) -> int:
+        with self._lock:
+            first_id = self._next_id
+            self._next_id += count * self.step
+            return first_id
+
+    """Выделить count ID, вернуть их как range"""
+    def allocate_range(self, count: int) -> range:
+        first_id = self.allocate(count)
+        return range(first_id, first_id + count * self.step, self.step)
+
+    """Сдвинуть счетчик так, чтобы следующий ID был не меньше min_next_id (остаток по модулю шага сохраняется)"""
+    def advance_to(self, min_next_id: int) -> None:
+        with self._lock:
+            if min_next_id > self._next_id:
+                self._next_id += -(-(min_next_id - self._next_id) // self.step) * self.step
+
+    @property
+    def next_id(self) -> int:
+        return self._next_id
+
+    @next_id.setter
+    def next_id(self, value: int) -> None:
+        with self._lock:
+            self._next_id = value
+
+
 class BookingService:
     def __init__(self, cinema_theater):
         self.cinema = cinema_theater
-        self.next_booking_id = 1
+        self._booking_ids = IdAllocator()
+
+    """Хранилище кинотеатра, в которое брони и отмены записываются до изменений в памяти"""
+    @property
+    def storage(self):
+        return self.cinema.storage
+
+    @storage.setter
+    def storage(self, storage) -> None:
+        self.cinema.storage = storage
+
+    """Выдавать ID броней вида index + k * count (свои ID у каждого из count шардов)"""
+    def set_id_stride(self, index: int, count: int) -> None:
+        if not 0 <= index < count:
+            raise ValueError("Номер шарда должен быть от 0 до count - 1")
+        next_id = self._booking_ids.next_id
+        next_id += (index - next_id) % count
+        self._booking_ids = IdAllocator(next_id, count)
+
+    """Следующий ID брони"""
+    @property
+    def next_booking_id(self) -> int:
+        return self._booking_ids.next_id
+
+    @next_booking_id.setter
+    def next_booking_id(self, value: int) -> None:
+        self._booking_ids.next_id = value
+
+    """Выдать ID новым броням; если есть хранилище, брони сначала записываются в него"""
+    def _allocate_ids(self, user, session, seats: Sequence[Tuple[int, int]]) -> Sequence[int]:
+        if self.storage is None:
+            return self._booking_ids.allocate_range(len(seats))
+        booking_ids = self.storage.insert_bookings(user.user_id, session.session_id, seats)
+        self._booking_ids.advance_to(booking_ids[-1] + 1)
+        return booking_ids
 
     """Создать бронирование билета"""
     def create_booking(self, user_id: int, session_id: int, row: int, seat: int) -> Booking:
 
+        session = None
+        reserved = False
         try:
             user = self.cinema.get_user(user_id)
             session = self.cinema.get_session(session_id)
@@ -19,40 +100,181 @@ class BookingService:
             if not session:
                 raise SessionNotFoundError(f"Сеанс с ID {session_id} не найден")
 
-            hall = session.hall
-
-            if not hall.is_valid_seat(row, seat):
+            if not session.hall.is_valid_seat(row, seat):
                 raise InvalidSeatError(f"Неверное место: ряд {row}, место {seat}")
 
-            hall.reserve_seat(row, seat)
+            # Блокируется только карта мест этого сеанса
+            with session.lock:
+                session.bookable_seats().reserve_seat(row, seat)
+            reserved = True
 
-            booking = Booking(self.next_booking_id, user, session, row, seat)
-            self.next_booking_id += 1
+            booking = Booking(self._allocate_ids(user, session, [(row, seat)])[0], user, session, row, seat)
 
             self.cinema.bookings.append(booking)
             user.add_booking(booking)
+            self._mark_changed(session, [booking])
 
             return booking
 
         except Exception as e:
-            if session:
-                session.hall.free_seat(row, seat)
+            if reserved:
+                with session.lock:
+                    session.to_free_seat(row, seat)
+            raise BookingError(f"Ошибка бронирования: {str(e)}")
+
+    """Забронировать несколько мест на один сеанс: все или ни одного"""
+    def create_group_booking(self, user_id: int, session_id: int,
+                             seats: Sequence[Tuple[int, int]]) -> List[Booking]:
+
+        try:
+            user = self.cinema.get_user(user_id)
+            session = self.cinema.get_session(session_id)
+
+            if not user:
+                raise UserNotFound(f"Пользователь с ID {user_id} не найден")
+            if not session:
+                raise SessionNotFoundError(f"Сеанс с ID {session_id} не найден")
+            if not seats:
+                raise InvalidSeatError("Не выбрано ни одного места")
+            if len(set(seats)) != len(seats):
+                raise InvalidSeatError("Места в заказе повторяются")
+
+            with session.lock:
+                # Сначала проверяем все места, и только потом резервируем
+                seat_map = session.bookable_seats()
+                for row, seat in seats:
+                    if seat_map.is_reserved(row, seat):
+                        raise SeatBookedError(f"{seat} место, {row} ряд уже забронированы")
+                for row, seat in seats:
+                    seat_map.reserve_seat(row, seat)
+
+            try:
+                booking_ids = self._allocate_ids(user, session, seats)
+            except CinemaError:
+                with session.lock:
+                    for row, seat in seats:
+                        session.to_free_seat(row, seat)
+                raise
+            bookings = [Booking(booking_id, user, session, row, seat)
+                        for booking_id, (row, seat) in zip(booking_ids, seats)]
+
+            self.cinema.bookings.extend(bookings)
+            for booking in bookings:
+                user.add_booking(booking)
+            self._mark_changed(session, bookings)
+
+            return bookings
+
+        except CinemaError as e:
+            raise BookingError(f"Ошибка бронирования: {str(e)}")
+
+    """Оформить брони на места удержания hold (SeatHold): все или ни одной.
+
+    Брони получает только пользователь, за которым места удерживаются.
+    """
+    def book_held_seats(self, user_id: int, hold) -> List[Booking]:
+
+        try:
+            user, session, seats = hold.user, hold.session, hold.seats
+            if user.user_id != user_id:
+                raise SeatHoldError(f"Удержание {hold.hold_id} оформлено на другого пользователя")
+
+            with session.lock:
+                seat_map = session.bookable_seats()
+                for row, seat in seats:
+                    if not seat_map.is_held(row, seat):
+                        raise SeatHoldError(f"{seat} место, {row} ряд не удерживаются")
+
+            # Места удерживаются за пользователем, поэтому их можно записать в хранилище
+            # до подтверждения: при ошибке удержание просто снимается
+            booking_ids = self._allocate_ids(user, session, seats)
+            with session.lock:
+                for row, seat in seats:
+                    seat_map.confirm_hold(row, seat)
+            bookings = [Booking(booking_id, user, session, row, seat)
+                        for booking_id, (row, seat) in zip(booking_ids, seats)]
+
+            self.cinema.bookings.extend(bookings)
+            for booking in bookings:
+                user.add_booking(booking)
+            self._mark_changed(session, bookings)
+
+            return bookings
+
+        except CinemaError as e:
             raise BookingError(f"Ошибка бронирования: {str(e)}")
 
+    """Восстановить бронь с заданным ID (например, из журнала)"""
+    def restore_booking(self, booking_id: int, user_id: int, session_id: int, row: int, seat: int) -> Booking:
+        user = self.cinema.get_user(user_id)
+        session = self.cinema.get_session(session_id)
+
+        if not user:
+            raise UserNotFound(f"Пользователь с ID {user_id} не найден")
+        if not session:
+            raise SessionNotFoundError(f"Сеанс с ID {session_id} не найден")
+
+        with session.lock:
+            session.reserve_seat(row, seat)
+
+        booking = Booking(booking_id, user, session, row, seat)
+        self._booking_ids.advance_to(booking_id + 1)
+
+        self.cinema.bookings.append(booking)
+        user.add_booking(booking)
+        self._mark_changed(session, [booking])
+
+        return booking
+
     """Отменить бронирование"""
     def cancel_booking(self, user_id: int, booking_id: int) -> bool:
         user = self.cinema.get_user(user_id)
         if not user:
             return False
 
-        for booking in user.bookings:
-            if booking.booking_id == booking_id:
-                booking.session.hall.free_seat(booking.row, booking.seat)
-                user.bookings.remove(booking)
-                self.cinema.bookings.remove(booking)
-                return True
+        if not user.has_booking(booking_id):
+            return False
+        booking = self.cinema.bookings.get(booking_id)
+        if not booking:
+            return False
+
+        with booking.session.lock:
+            # Бронь могли уже отменить в другом потоке
+            if not user.has_booking(booking_id):
+                return False
+            # Сначала хранилище: если запись не удалась, бронь остается и в памяти
+            if self.storage is not None:
+                self.storage.delete_booking(user_id, booking_id)
+            # Сначала место: если его не удалось освободить, бронь остается целиком
+            booking.session.to_free_seat(booking.row, booking.seat)
+            user.remove_booking(booking_id)
+        self.cinema.bookings.discard(booking_id)
+        self._mark_changed(booking.session, [booking])
+        return True
+
+    """Отменить все брони сеанса (например, при отмене показа), вернуть отмененные брони"""
+    def cancel_session_bookings(self, session_id: int) -> List[Booking]:
+        session = self.cinema.get_session(session_id)
+        if not session:
+            raise SessionNotFoundError(f"Сеанс с ID {session_id} не найден")
+
+        with session.lock:
+            if self.storage is not None:
+                self.storage.delete_session_bookings(session_id)
+            cancelled = self.cinema.bookings.discard_session(session_id)
+            for booking in cancelled:
+                session.to_free_seat(booking.row, booking.seat)
+                if booking.user is not None:
+                    booking.user.remove_booking(booking.booking_id)
+        self._mark_changed(session, cancelled)
+        return cancelled
 
-        return False
+    """Отметить измененные карту мест сеанса, брони и их владельцев для сохранения"""
+    def _mark_changed(self, session, bookings: List[Booking]) -> None:
+        self.cinema.mark_dirty('sessions', session.session_id)
+        self.cinema.changes.mark_many('bookings', [booking.booking_id for booking in bookings])
+        for user_id in {booking.user.user_id for booking in bookings if booking.user is not None}:
+            self.cinema.mark_dirty('users', user_id)
 
     def __repr__(self) -> str:
         return f"Сервис бронирования: всего броней - {len(self.cinema.bookings)}"
\ No newline at end of file
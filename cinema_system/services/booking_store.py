@@ -0,0 +1,299 @@
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import compress
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from cinema_system.models.booking import Booking
+from cinema_system.models.user import User
+
+# Удаленные строки остаются в колонках, пока их не больше половины (но не меньше этого числа)
+_COMPACT_MIN_DEAD = 1024
+
+
+class BookingStore:
+    """Колоночное хранилище броней - единственное место, где брони хранятся.
+
+    Каждое поле брони хранится в отдельном массиве (модуль array), строки
+    отсортированы по booking_id, поэтому бронь по ID находится двоичным
+    поиском без отдельного словаря. У удаленной брони обнуляются user_id и
+    session_id; такие строки вычищаются одним проходом, когда их становится
+    больше половины. Пользователи хранят только ID своих броней, а объекты
+    Booking создаются по требованию как представления строк хранилища.
+
+    На одну бронь приходится 32 байта колонок и по 8 байт в массивах ID
+    броней сеанса и пользователя. У пользователя, у которого броней больше
+    INDEXED_BOOKINGS, ID броней хранятся в словаре: около 55 байт на бронь
+    вместо 8, зато отмена не проходит по всему списку его броней.
+    """
+
+    def __init__(self, cinema_theater):
+        self._cinema = cinema_theater
+        self._booking_ids = array('q')
+        self._user_ids = array('q')
+        self._session_ids = array('q')
+        self._rows = array('i')
+        self._seats = array('i')
+        self._dead = 0
+        # session_id -> ID броней сеанса (для массовой отмены)
+        self._by_session: Dict[int, array] = {}
+        self._lock = threading.Lock()
+
+    def _columns(self):
+        return self._booking_ids, self._user_ids, self._session_ids, self._rows, self._seats
+
+    """Номер строки живой брони (None, если брони нет)"""
+
+    def _find(self, booking_id: int) -> Optional[int]:
+        position = bisect_left(self._booking_ids, booking_id)
+        if position < len(self._booking_ids) and self._booking_ids[position] == booking_id \
+                and self._user_ids[position]:
+            return position
+        return None
+
+    """Добавить бронь"""
+
+    def append(self, booking: Booking) -> None:
+        with self._lock:
+            self._append(booking)
+
+    def _append(self, booking: Booking) -> None:
+        booking_id = booking.booking_id
+        values = (booking_id, booking.user.user_id, booking.session.session_id, booking.row, booking.seat)
+        ids = self._booking_ids
+        if not ids or booking_id > ids[-1]:
+            for column, value in zip(self._columns(), values):
+                column.append(value)
+        else:
+            # ID выдаются по возрастанию, но параллельные бронирования могут дописываться
+            # не по порядку: такая строка вставляется рядом с концом колонок
+            position = bisect_left(ids, booking_id)
+            if position < len(ids) and ids[position] == booking_id:
+                if self._user_ids[position]:
+                    raise ValueError(f"Бронь с ID {booking_id} уже существует")
+                for column, value in zip(self._columns(), values):
+                    column[position] = value
+                self._dead -= 1
+            else:
+                for column, value in zip(self._columns(), values):
+                    column.insert(position, value)
+        self._by_session.setdefault(booking.session.session_id, array('q')).append(booking_id)
+
+    """Добавить несколько броней (в пустое хранилище - одной сортировкой)"""
+
+    def extend(self, bookings: Iterable[Booking]) -> None:
+        with self._lock:
+            if self._booking_ids:
+                for booking in bookings:
+                    self._append(booking)
+                return
+
+            rows = sorted((booking.booking_id, booking.user.user_id, booking.session.session_id,
+                           booking.row, booking.seat) for booking in bookings)
+            for previous, current in zip(rows, rows[1:]):
+                if previous[0] == current[0]:
+                    raise ValueError(f"Бронь с ID {current[0]} уже существует")
+            for index, column in enumerate(self._columns()):
+                column.extend(row[index] for row in rows)
+            for booking_id, _, session_id, _, _ in rows:
+                self._by_session.setdefault(session_id, array('q')).append(booking_id)
+
+    """Удалить бронь"""
+
+    def remove(self, booking: Booking) -> None:
+        if not self.discard(booking.booking_id):
+            raise ValueError(f"Бронь с ID {booking.booking_id} не найдена")
+
+    """Удалить бронь по ID, если она есть"""
+
+    def discard(self, booking_id: int) -> bool:
+        with self._lock:
+            position = self._find(booking_id)
+            if position is None:
+                return False
+            session_id = self._session_ids[position]
+            session_bookings = self._by_session[session_id]
+            session_bookings.remove(booking_id)
+            if not session_bookings:
+                del self._by_session[session_id]
+            self._user_ids[position] = 0
+            self._session_ids[position] = 0
+            self._dead += 1
+            self._compact_if_needed()
+            return True
+
+    """Удалить все брони сеанса одним проходом, вернуть удаленные брони"""
+
+    def discard_session(self, session_id: int) -> List[Booking]:
+        removed = []
+        with self._lock:
+            for booking_id in self._by_session.pop(session_id, ()):
+                position = self._find(booking_id)
+                removed.append(self._view(position))
+                self._user_ids[position] = 0
+                self._session_ids[position] = 0
+            self._dead += len(removed)
+            self._compact_if_needed()
+        return removed
+
+    def _compact_if_needed(self) -> None:
+        if self._dead >= _COMPACT_MIN_DEAD and self._dead * 2 > len(self._booking_ids):
+            self._compact()
+
+    """Вычистить удаленные строки"""
+
+    def _compact(self) -> None:
+        alive = [user_id != 0 for user_id in self._user_ids]
+        self._booking_ids, self._user_ids, self._session_ids, self._rows, self._seats = (
+            array(column.typecode, compress(column, alive)) for column in self._columns())
+        self._dead = 0
+
+    """Очистить хранилище"""
+
+    def clear(self) -> None:
+        with self._lock:
+            for column in self._columns():
+                del column[:]
+            self._dead = 0
+            self._by_session.clear()
+
+    """Есть ли бронь с таким ID"""
+
+    def has_booking(self, booking_id: int) -> bool:
+        with self._lock:
+            return self._find(booking_id) is not None
+
+    """ID броней сеанса"""
+
+    def booking_ids_for_session(self, session_id: int) -> List[int]:
+        return list(self._by_session.get(session_id, ()))
+
+    """Есть ли у сеанса брони"""
+
+    def has_session_bookings(self, session_id: int) -> bool:
+        return session_id in self._by_session
+
+    def _view(self, position: int, user: Optional[User] = None) -> Booking:
+        return Booking(self._booking_ids[position],
+                       user or self._cinema.get_user(self._user_ids[position]),
+                       self._cinema.get_session(self._session_ids[position]),
+                       self._rows[position], self._seats[position])
+
+    """Бронь по ID (объект создается из колонок)"""
+
+    def get(self, booking_id: int) -> Optional[Booking]:
+        with self._lock:
+            position = self._find(booking_id)
+            if position is None:
+                return None
+            return self._view(position)
+
+    """Брони пользователя в порядке добавления"""
+
+    def for_user(self, user: User) -> List[Booking]:
+        bookings = []
+        with self._lock:
+            for booking_id in user.booking_ids:
+                position = self._find(booking_id)
+                if position is not None:
+                    bookings.append(self._view(position, user))
+        return bookings
+
+    """Словарь брони по ID без создания объекта"""
+
+    def get_dict(self, booking_id: int) -> Optional[dict]:
+        with self._lock:
+            position = self._find(booking_id)
+            if position is None:
+                return None
+            return {
+                'booking_id': booking_id,
+                'user_id': self._user_ids[position],
+                'session_id': self._session_ids[position],
+                'row': self._rows[position],
+                'seat': self._seats[position],
+            }
+
+    """Словари броней для сериализации без создания объектов"""
+
+    def iter_dicts(self) -> Iterator[dict]:
+        for booking_id, user_id, session_id, row, seat in zip(*self._columns()):
+            if user_id:
+                yield {
+                    'booking_id': booking_id,
+                    'user_id': user_id,
+                    'session_id': session_id,
+                    'row': row,
+                    'seat': seat,
+                }
+
+    def __iter__(self) -> Iterator[Booking]:
+        for position in range(len(self._booking_ids)):
+            if self._user_ids[position]:
+                yield self._view(position)
+
+    def __len__(self) -> int:
+        return len(self._booking_ids) - self._dead
+
+    """Количество броней по сеансам"""
+
+    def count_by_session(self) -> Counter:
+        counts = Counter(self._session_ids)
+        counts.pop(0, None)
+        return counts
+
+    """Количество броней по пользователям"""
+
+    def count_by_user(self) -> Counter:
+        counts = Counter(self._user_ids)
+        counts.pop(0, None)
+        return counts
+
+    """Выручка по сеансам: число броней сеанса * цена сеанса"""
+
+    def revenue_by_session(self) -> Dict[int, int]:
+        revenue = {}
+        for session_id, count in self.count_by_session().items():
+            session = self._cinema.get_session(session_id)
+            if session:
+                revenue[session_id] = count * session.price
+        return revenue
+
+    def _group_sessions(self, key) -> Dict[int, List[int]]:
+        counts, revenue = Counter(), Counter()
+        for session_id, count in self.count_by_session().items():
+            session = self._cinema.get_session(session_id)
+            if session:
+                group = key(session)
+                counts[group] += count
+                revenue[group] += count * session.price
+        return {group: [counts[group], revenue[group]] for group in counts}
+
+    """Количество броней и выручка по фильмам: {film_id: [броней, выручка]}"""
+
+    def stats_by_film(self) -> Dict[int, List[int]]:
+        return self._group_sessions(lambda session: session.movie.film_id)
+
+    """Количество броней и выручка по залам: {hall_id: [броней, выручка]}"""
+
+    def stats_by_hall(self) -> Dict[int, List[int]]:
+        return self._group_sessions(lambda session: session.hall.id)
+
+    """Заполненность сеансов: доля занятых мест"""
+
+    def occupancy_by_session(self) -> Dict[int, float]:
+        occupancy = {}
+        for session_id, count in self.count_by_session().items():
+            session = self._cinema.get_session(session_id)
+            if session:
+                occupancy[session_id] = count / (session.hall.rows * session.hall.seats_per_row)
+        return occupancy
+
+    """Общая выручка"""
+
+    def total_revenue(self) -> int:
+        return sum(self.revenue_by_session().values())
+
+    def __repr__(self) -> str:
+        return f"BookingStore(bookings={len(self)})"
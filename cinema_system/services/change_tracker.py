@@ -0,0 +1,127 @@
+import threading
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# Типы сущностей, для которых ведется учет изменений (совпадают с разделами сериализации)
+KINDS = ('users', 'halls', 'films', 'sessions', 'bookings')
+
+
+class ChangeTracker:
+    """Учет измененных сущностей и кэш их сериализованных фрагментов.
+
+    Для каждого типа сущностей хранится множество ID, измененных после
+    последнего сохранения, и список словарей из предыдущей сериализации.
+    При следующем сохранении пересобираются только фрагменты измененных
+    сущностей, поэтому стоимость сохранения зависит от числа изменений,
+    а не от размера кинотеатра.
+    """
+
+    def __init__(self):
+        self._dirty: Dict[str, Set[int]] = {kind: set() for kind in KINDS}
+        self._fragments: Dict[str, List[dict]] = {}
+        # ID сущности -> номер ее фрагмента в списке
+        self._positions: Dict[str, Dict[int, int]] = {}
+        # ID сущности -> версия, с которой она последний раз отмечалась (см. mark_versions)
+        self._versions: Dict[str, Dict[int, Hashable]] = {}
+        self._lock = threading.Lock()
+
+    """Отметить сущность как измененную"""
+
+    def mark(self, kind: str, entity_id: int) -> None:
+        with self._lock:
+            self._dirty[kind].add(entity_id)
+
+    """Отметить несколько сущностей одного типа"""
+
+    def mark_many(self, kind: str, entity_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._dirty[kind].update(entity_ids)
+
+    """Отметить сущности, версия которых изменилась с прошлого вызова.
+
+    Так в сохранение попадают и изменения в обход сервисов, которые
+    отмечают сущности (например, прямой вызов session.reserve_seat).
+    """
+
+    def mark_versions(self, kind: str, versions: Iterable[Tuple[int, Hashable]]) -> None:
+        with self._lock:
+            known = self._versions.setdefault(kind, {})
+            dirty = self._dirty[kind]
+            for entity_id, version in versions:
+                if known.get(entity_id) != version:
+                    known[entity_id] = version
+                    dirty.add(entity_id)
+
+    """Количество изменений, еще не попавших в кэш"""
+
+    def dirty_count(self) -> int:
+        with self._lock:
+            return sum(len(ids) for ids in self._dirty.values())
+
+    """Сбросить кэш (например, после замены всех данных кинотеатра)"""
+
+    def reset(self) -> None:
+        with self._lock:
+            self._dirty = {kind: set() for kind in KINDS}
+            self._fragments.clear()
+            self._positions.clear()
+            self._versions.clear()
+
+    """Фрагменты раздела kind.
+
+    При первом вызове все фрагменты строятся через build_all (пары ID,
+    словарь), дальше для измененных ID вызывается build_one: он возвращает
+    новый словарь или None, если сущность удалена.
+    """
+
+    def fragments(self, kind: str, build_one: Callable[[int], Optional[dict]],
+                  build_all: Callable[[], Iterable[Tuple[int, dict]]]) -> List[dict]:
+        with self._lock:
+            dirty = self._dirty[kind]
+            self._dirty[kind] = set()
+
+        fragments = self._fragments.get(kind)
+        if fragments is None:
+            fragments, positions = [], {}
+            for entity_id, fragment in build_all():
+                positions[entity_id] = len(fragments)
+                fragments.append(fragment)
+            self._fragments[kind] = fragments
+            self._positions[kind] = positions
+            return list(fragments)
+
+        positions = self._positions[kind]
+        for entity_id in dirty:
+            fragment = build_one(entity_id)
+            position = positions.get(entity_id)
+            if fragment is None:
+                if position is not None:
+                    self._drop(fragments, positions, kind, position, entity_id)
+            elif position is None:
+                positions[entity_id] = len(fragments)
+                fragments.append(fragment)
+            else:
+                fragments[position] = fragment
+        # Копия списка: вызывающий код может записывать ее в другом потоке
+        return list(fragments)
+
+    """Удалить фрагмент: на его место переносится последний"""
+
+    @staticmethod
+    def _drop(fragments: List[dict], positions: Dict[int, int], kind: str,
+              position: int, entity_id: int) -> None:
+        del positions[entity_id]
+        last = fragments.pop()
+        if position < len(fragments):
+            fragments[position] = last
+            positions[_fragment_id(kind, last)] = position
+
+    def __repr__(self) -> str:
+        return f"ChangeTracker(dirty={self.dirty_count()}, cached={list(self._fragments)})"
+
+
+_ID_KEYS = {'users': 'user_id', 'halls': 'id', 'films': 'film_id',
+            'sessions': 'session_id', 'bookings': 'booking_id'}
+
+
+def _fragment_id(kind: str, fragment: dict) -> int:
+    return fragment[_ID_KEYS[kind]]
@@ -1,8 +1,14 @@
-from typing import List, Optional
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from .booking_service import BookingService
-from ..models.booking import Booking
+from .booking_store import BookingStore
+from .change_tracker import ChangeTracker
+from .schedule_index import ScheduleIndex
+from .search_index import TextSearchIndex
 from ..models.cinema_hall import CinemaHall
+from ..models.exceptions import ScheduleConflictError
 from ..models.film import Film
 from ..models.session import Session
 from ..models.user import User
@@ -15,9 +21,70 @@ class CinemaTheater:
         self.films: List[Film] = []
         self.sessions: List[Session] = []
         self.users: List[User] = []
-        self.bookings: List[Booking] = []
+        self.bookings = BookingStore(self)
         self.next_user_id = 1
+        # Хранилище, в которое новые пользователи и брони записываются до того, как попадут
+        # в память (SQLiteStorage). Оно же выдает им ID, чтобы их не повторили другие процессы
+        self.storage = None
         self.booking_service = BookingService(self)
+        # Время на уборку зала между сеансами, в минутах
+        self.cleaning_minutes = 0
+
+        # Индексы id -> объект для поиска за O(1)
+        self._halls_by_id: Dict[int, CinemaHall] = {}
+        self._films_by_id: Dict[int, Film] = {}
+        self._sessions_by_id: Dict[int, Session] = {}
+        self._users_by_id: Dict[int, User] = {}
+        self._sessions_by_film: Dict[int, List[Session]] = {}
+        # Поисковые индексы по названиям фильмов и именам пользователей
+        self._film_titles = TextSearchIndex()
+        self._user_names = TextSearchIndex()
+        # Расписание сеансов, отсортированное по времени начала
+        self.schedule = ScheduleIndex()
+        # Защищает выдачу ID пользователей при параллельной регистрации
+        self._users_lock = threading.Lock()
+        # Измененные после последнего сохранения сущности (для сериализации)
+        self.changes = ChangeTracker()
+        # Версия каталога фильмов и расписания: растет при добавлении фильмов и сеансов
+        self.schedule_version = 0
+
+    """Восстановить состояние из десериализованных данных"""
+
+    def restore_state(self, restored_data: Dict[str, Any]) -> None:
+        self.halls = restored_data['halls']
+        self.films = restored_data['films']
+        self.users = restored_data['users']
+        self.sessions = restored_data['sessions']
+        self.bookings.clear()
+        self.bookings.extend(restored_data['bookings'])
+        self.next_user_id = restored_data['next_user_id']
+        self.booking_service.next_booking_id = restored_data['next_booking_id']
+        self.rebuild_indexes()
+        self.changes.reset()
+        self.schedule_version += 1
+
+    """Перестроить индексы по текущим спискам"""
+
+    def rebuild_indexes(self) -> None:
+        self._halls_by_id = {hall.id: hall for hall in self.halls}
+        self._films_by_id = {film.film_id: film for film in self.films}
+        self._sessions_by_id = {session.session_id: session for session in self.sessions}
+        self._users_by_id = {user.user_id: user for user in self.users}
+
+        self._sessions_by_film = {}
+        for session in self.sessions:
+            self._sessions_by_film.setdefault(session.movie.film_id, []).append(session)
+
+        self._film_titles.clear()
+        self._film_titles.add_many((film.film_id, film.title) for film in self.films)
+        self._user_names.clear()
+        self._user_names.add_many((user.user_id, user.name) for user in self.users)
+        self.schedule.rebuild(self.sessions)
+
+    """Отметить сущность как измененную с последнего сохранения"""
+
+    def mark_dirty(self, kind: str, entity_id: int) -> None:
+        self.changes.mark(kind, entity_id)
 
     """Добавить кинозал"""
 
@@ -25,6 +92,8 @@ class CinemaTheater:
         if not isinstance(hall, CinemaHall):
             raise ValueError("Должен быть объект CinemaHall")
         self.halls.append(hall)
+        self._halls_by_id[hall.id] = hall
+        self.mark_dirty('halls', hall.id)
 
     """Найти зал по ID"""
 
@@ -32,10 +101,7 @@ class CinemaTheater:
         if not isinstance(hall_id, int) or hall_id <= 0:
             raise ValueError("ID зала должен быть положительным числом")
 
-        for hall in self.halls:
-            if hall.id == hall_id:
-                return hall
-        return None
+        return self._halls_by_id.get(hall_id)
 
     """Добавить фильм"""
 
@@ -43,6 +109,10 @@ class CinemaTheater:
         if not isinstance(film, Film):
             raise ValueError("Должен быть объект Film")
         self.films.append(film)
+        self._films_by_id[film.film_id] = film
+        self._film_titles.add(film.film_id, film.title)
+        self.mark_dirty('films', film.film_id)
+        self.schedule_version += 1
 
     """Найти фильм по ID"""
 
@@ -50,10 +120,7 @@ class CinemaTheater:
         if not isinstance(film_id, int) or film_id <= 0:
             raise ValueError("ID фильма должен быть положительным числом")
 
-        for film in self.films:
-            if film.film_id == film_id:
-                return film
-        return None
+        return self._films_by_id.get(film_id)
 
     """Найти фильмы по названию"""
 
@@ -61,18 +128,92 @@ class CinemaTheater:
         if not isinstance(title, str) or not title.strip():
             raise ValueError("Название фильма не может быть пустым")
 
-        films = []
-        for film in self.films:
-            if title.lower() in film.title.lower():
-                films.append(film)
-        return films
+        film_ids = self._film_titles.search(title)
+        return [self._films_by_id[film_id] for film_id in sorted(film_ids)]
+
+    """Найти фильмы, название которых начинается с prefix (автодополнение)"""
+
+    def find_films_by_prefix(self, prefix: str, limit: Optional[int] = None) -> List[Film]:
+        if not isinstance(prefix, str) or not prefix.strip():
+            raise ValueError("Название фильма не может быть пустым")
+
+        film_ids = sorted(self._film_titles.search_prefix(prefix))[:limit]
+        return [self._films_by_id[film_id] for film_id in film_ids]
 
     """Добавить сеанс"""
 
     def add_session(self, session: Session) -> None:
         if not isinstance(session, Session):
             raise ValueError("Должен быть объект Session")
+        if session.session_id in self._sessions_by_id:
+            raise ValueError(f"Сеанс с ID {session.session_id} уже существует")
+
+        conflicts = self.schedule.find_hall_conflicts(session, self._cleaning_buffer())
+        if conflicts:
+            raise ScheduleConflictError(
+                f"Зал {session.hall.name} занят в {session.time}: пересекается с сеансами "
+                f"{', '.join(str(other.session_id) for other in conflicts)}")
+
+        self.schedule.add(session)
+        self._register_session(session)
+
+    def _register_session(self, session: Session) -> None:
         self.sessions.append(session)
+        self._sessions_by_id[session.session_id] = session
+        self._sessions_by_film.setdefault(session.movie.film_id, []).append(session)
+        self.mark_dirty('sessions', session.session_id)
+        self.schedule_version += 1
+
+    def _cleaning_buffer(self) -> timedelta:
+        return timedelta(minutes=self.cleaning_minutes)
+
+    """Импортировать расписание с проверкой пересечений за O(n log n).
+
+    Возвращает список конфликтов (новый сеанс, занимающий зал сеанс).
+    При strict=True и наличии конфликтов ничего не добавляется и выбрасывается
+    ScheduleConflictError, иначе добавляются только сеансы без конфликтов.
+    """
+
+    def import_sessions(self, sessions: Iterable[Session],
+                        strict: bool = True) -> List[Tuple[Session, Session]]:
+        buffer = self._cleaning_buffer()
+        new_sessions = sorted(sessions, key=lambda s: (s.hall.id, s.start_time, s.session_id))
+
+        conflicts: List[Tuple[Session, Session]] = []
+        accepted: List[Session] = []
+        seen_ids = set()
+        last_in_hall: Optional[Session] = None
+
+        for session in new_sessions:
+            if not isinstance(session, Session):
+                raise ValueError("Должен быть объект Session")
+            if session.session_id in self._sessions_by_id or session.session_id in seen_ids:
+                raise ValueError(f"Сеанс с ID {session.session_id} уже существует")
+            seen_ids.add(session.session_id)
+
+            if last_in_hall is not None and last_in_hall.hall.id != session.hall.id:
+                last_in_hall = None
+
+            session_conflicts = self.schedule.find_hall_conflicts(session, buffer)
+            # Принятые сеансы зала не пересекаются, поэтому достаточно сравнить с последним
+            if last_in_hall is not None and last_in_hall.end_time + buffer > session.start_time:
+                session_conflicts.append(last_in_hall)
+
+            if session_conflicts:
+                conflicts.extend((session, other) for other in session_conflicts)
+            else:
+                accepted.append(session)
+                last_in_hall = session
+
+        if conflicts and strict:
+            raise ScheduleConflictError(
+                f"Найдено пересечений в расписании: {len(conflicts)}; "
+                f"первое - сеансы {conflicts[0][0].session_id} и {conflicts[0][1].session_id}")
+
+        self.schedule.add_many(accepted)
+        for session in accepted:
+            self._register_session(session)
+        return conflicts
 
     """Найти сеанс по ID"""
 
@@ -80,10 +221,7 @@ class CinemaTheater:
         if not isinstance(session_id, int) or session_id <= 0:
             raise ValueError("ID сеанса должен быть положительным числом")
 
-        for session in self.sessions:
-            if session.session_id == session_id:
-                return session
-        return None
+        return self._sessions_by_id.get(session_id)
 
     """Найти сеансы по названию фильма"""
 
@@ -92,32 +230,81 @@ class CinemaTheater:
             raise ValueError("Название фильма не может быть пустым")
 
         sessions = []
-        for session in self.sessions:
-            if movie_title.lower() in session.movie.title.lower():
-                sessions.append(session)
+        for film_id in self._film_titles.search(movie_title):
+            sessions.extend(self._sessions_by_film.get(film_id, []))
+        sessions.sort(key=lambda session: session.session_id)
         return sessions
 
+    """Найти сеансы, начинающиеся в промежутке [start, end)"""
+
+    def find_sessions_between(self, start: datetime, end: datetime, film_id: Optional[int] = None,
+                              hall_id: Optional[int] = None) -> List[Session]:
+        if start > end:
+            raise ValueError("Начало промежутка не может быть позже конца")
+        return self.schedule.between(start, end, film_id, hall_id)
+
+    """Ближайшие k сеансов (по умолчанию - начиная с текущего момента)"""
+
+    def find_next_sessions(self, k: int, after: Optional[datetime] = None, film_id: Optional[int] = None,
+                           hall_id: Optional[int] = None) -> List[Session]:
+        if not isinstance(k, int) or k <= 0:
+            raise ValueError("Количество сеансов должно быть положительным числом")
+        return self.schedule.upcoming(after or datetime.now(), k, film_id, hall_id)
+
+    """Освободить карты мест прошедших сеансов.
+
+    Бронировать прошедший сеанс нельзя и без этого (Session.is_closed), здесь
+    освобождается память и меняется версия мест, по которой сбрасываются кэши.
+    Брони таких сеансов остаются; при сохранении у сеанса не пишутся
+    reserved_seats, и при загрузке места восстанавливаются по броням.
+    """
+
+    def release_past_sessions(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.now()
+        released = 0
+        for session in self.sessions:
+            if not session.is_released() and session.is_past(now):
+                with session.lock:
+                    session.release_seats()
+                self.mark_dirty('sessions', session.session_id)
+                released += 1
+        return released
+
     """Зарегистрировать пользователя"""
 
     def register_user(self, name: str) -> User:
         if not isinstance(name, str) or not name.strip():
             raise ValueError("Имя пользователя не может быть пустым")
 
-        user = User(self.next_user_id, name)
-        self.users.append(user)
-        self.next_user_id += 1
+        with self._users_lock:
+            user_id = self.next_user_id if self.storage is None else self.storage.insert_user(name)
+            user = User(user_id, name)
+            self.users.append(user)
+            self._users_by_id[user.user_id] = user
+            self.next_user_id = max(self.next_user_id, user_id + 1)
+        self._user_names.add(user.user_id, user.name)
+        self.mark_dirty('users', user.user_id)
         return user
 
+    """Добавить уже существующего пользователя (например, при восстановлении из журнала)"""
+
+    def add_user(self, user: User) -> None:
+        if not isinstance(user, User):
+            raise ValueError("Должен быть объект User")
+        with self._users_lock:
+            self.users.append(user)
+            self._users_by_id[user.user_id] = user
+            self.next_user_id = max(self.next_user_id, user.user_id + 1)
+        self._user_names.add(user.user_id, user.name)
+        self.mark_dirty('users', user.user_id)
+
     """Найти пользователя по ID"""
 
     def get_user(self, user_id: int) -> Optional[User]:
         if not isinstance(user_id, int) or user_id <= 0:
             raise ValueError("ID пользователя должен быть положительным числом")
 
-        for user in self.users:
-            if user.user_id == user_id:
-                return user
-        return None
+        return self._users_by_id.get(user_id)
 
     """Найти пользователя по имени"""
 
@@ -125,10 +312,10 @@ class CinemaTheater:
         if not isinstance(name, str) or not name.strip():
             raise ValueError("Имя пользователя не может быть пустым")
 
-        for user in self.users:
-            if name.lower() in user.name.lower():
-                return user
-        return None
+        user_ids = self._user_names.search(name)
+        if not user_ids:
+            return None
+        return self._users_by_id[min(user_ids)]
 
     def __repr__(self) -> str:
         return (f"Кинотеатр:\n"
@@ -1,15 +1,137 @@
 import json
+import os
 import xml.etree.ElementTree as ET
-from typing import Dict, Any, List
+from contextlib import contextmanager
+from xml.sax.saxutils import XMLGenerator
+from xml.sax.xmlreader import AttributesImpl
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 
 from cinema_system.models.booking import Booking
 from cinema_system.models.cinema_hall import CinemaHall
-from cinema_system.models.exceptions import FileOperationError
+from cinema_system.models.exceptions import CinemaError, FileOperationError
 from cinema_system.models.film import Film
 from cinema_system.models.session import Session
 from cinema_system.models.user import User
 
 
+class _JSONStreamReader:
+    """Потоковый разбор JSON-объекта верхнего уровня.
+
+    Файл читается блоками, а элементы массивов верхнего уровня декодируются
+    по одному, поэтому в памяти одновременно находится только текущий блок
+    и текущий элемент.
+    """
+
+    _WHITESPACE = ' \t\n\r'
+    _DELIMITERS = ' \t\n\r,:]}'
+
+    def __init__(self, file, chunk_size: int = 64 * 1024):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    """Дочитать следующий блок файла"""
+
+    def _read_more(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Отбрасываем уже разобранную часть буфера
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    """Пропустить пробелы и вернуть следующий символ"""
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in self._WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read_more():
+                raise ValueError("Неожиданный конец JSON")
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Ожидался символ '{char}' в позиции {self._pos}")
+        self._pos += 1
+
+    """Декодировать одно JSON-значение, при необходимости дочитывая файл"""
+
+    def _decode_value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._read_more():
+                    continue
+                raise
+            # Значение на границе блока (например, число) могло быть обрезано:
+            # за целым значением всегда следует разделитель
+            if (end == len(self._buffer) or self._buffer[end] not in self._DELIMITERS) \
+                    and self._read_more():
+                continue
+            self._pos = end
+            return value
+
+    """Итерировать пары (раздел, значение); массивы отдаются поэлементно"""
+
+    def iter_items(self) -> Iterator[Tuple[str, Any]]:
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._decode_value()
+            self._expect(':')
+            if self._peek() == '[':
+                self._pos += 1
+                if self._peek() != ']':
+                    while True:
+                        yield key, self._decode_value()
+                        if self._peek() == ',':
+                            self._pos += 1
+                            continue
+                        break
+                self._expect(']')
+            else:
+                yield key, self._decode_value()
+
+            if self._peek() == ',':
+                self._pos += 1
+                continue
+            self._expect('}')
+            return
+
+
+@contextmanager
+def atomic_write(filename: str, mode: str = 'w', encoding: Optional[str] = 'utf-8'):
+    """Записать файл атомарно: данные пишутся во временный файл рядом с ним,
+    который затем заменяет старый через os.replace. Если запись прервется,
+    прежнее содержимое filename останется целым.
+    """
+    temp_filename = filename + '.tmp'
+    try:
+        with open(temp_filename, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, filename)
+    except BaseException:
+        try:
+            os.remove(temp_filename)
+        except OSError:
+            pass
+        raise
+
+
 class JSONFileService:
     """Сохранить данные в JSON файл"""
 
@@ -17,7 +139,7 @@ class JSONFileService:
     def save_to_json(data: Dict[str, Any], filename: str) -> None:
 
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
+            with atomic_write(filename) as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
         except Exception as e:
             raise FileOperationError(f"Ошибка сохранения JSON: {str(e)}")
@@ -33,66 +155,166 @@ class JSONFileService:
         except Exception as e:
             raise FileOperationError(f"Ошибка загрузки JSON: {str(e)}")
 
+    """Потоково загрузить данные из JSON файла: пары (раздел, элемент)"""
+
+    @staticmethod
+    def iter_json_items(filename: str, chunk_size: int = 64 * 1024) -> Iterator[Tuple[str, Any]]:
+
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                yield from _JSONStreamReader(f, chunk_size).iter_items()
+        except Exception as e:
+            raise FileOperationError(f"Ошибка загрузки JSON: {str(e)}")
+
 
 """Сервис для работы с XML файлами"""
 
 
 class XMLFileService:
-    """Сохранить данные в XML файл"""
+    # Разделы XML: (тег раздела, тег элемента, [(тег поля, ключ словаря, тип)])
+    _SECTIONS = (
+        ('users', 'user', [('id', 'user_id', int), ('name', 'name', str)]),
+        ('halls', 'hall', [('id', 'id', int), ('name', 'name', str), ('rows', 'rows', int),
+                           ('seats_per_row', 'seats_per_row', int), ('total_seats', 'total_seats', int)]),
+        ('films', 'film', [('id', 'film_id', int), ('title', 'title', str), ('duration', 'duration', int),
+                           ('genre', 'genre', str), ('rating', 'rating', float)]),
+        ('sessions', 'session', [('id', 'session_id', int), ('movie_id', 'movie_id', int),
+                                 ('hall_id', 'hall_id', int), ('time', 'time', str),
+                                 ('price', 'price', int)]),
+        ('bookings', 'booking', [('id', 'booking_id', int), ('user_id', 'user_id', int),
+                                 ('session_id', 'session_id', int), ('row', 'row', int),
+                                 ('seat', 'seat', int)]),
+    )
+    _COUNTERS = ('next_user_id', 'next_booking_id')
+
+    """Сохранить данные в XML файл (потоковая запись, элементы пишутся по одному)"""
 
     @staticmethod
     def save_to_xml(data: Dict[str, Any], filename: str) -> None:
         try:
-            root = ET.Element('cinema_theater')
-
-            # Пользователи
-            users_elem = ET.SubElement(root, 'users')
-            for user in data.get('users', []):
-                user_elem = ET.SubElement(users_elem, 'user')
-                ET.SubElement(user_elem, 'id').text = str(user['user_id'])
-                ET.SubElement(user_elem, 'name').text = user['name']
-
-            # Залы
-            halls_elem = ET.SubElement(root, 'halls')
-            for hall in data.get('halls', []):
-                hall_elem = ET.SubElement(halls_elem, 'hall')
-                ET.SubElement(hall_elem, 'id').text = str(hall['id'])
-                ET.SubElement(hall_elem, 'name').text = hall['name']
-                ET.SubElement(hall_elem, 'rows').text = str(hall['rows'])
-                ET.SubElement(hall_elem, 'seats_per_row').text = str(hall['seats_per_row'])
-
-            # Фильмы
-            films_elem = ET.SubElement(root, 'films')
-            for film in data.get('films', []):
-                film_elem = ET.SubElement(films_elem, 'film')
-                ET.SubElement(film_elem, 'id').text = str(film['film_id'])
-                ET.SubElement(film_elem, 'title').text = film['title']
-                ET.SubElement(film_elem, 'duration').text = str(film['duration'])
-                ET.SubElement(film_elem, 'genre').text = film['genre']
-                ET.SubElement(film_elem, 'rating').text = str(film['rating'])
-
-            tree = ET.ElementTree(root)
-            tree.write(filename, encoding='utf-8', xml_declaration=True)
+            with atomic_write(filename) as f:
+                writer = XMLGenerator(f, encoding='utf-8', short_empty_elements=True)
+                writer.startDocument()
+                writer.startElement('cinema_theater', AttributesImpl({}))
+                writer.ignorableWhitespace('\n')
+
+                for section_tag, item_tag, fields in XMLFileService._SECTIONS:
+                    writer.startElement(section_tag, AttributesImpl({}))
+                    writer.ignorableWhitespace('\n')
+                    for item in data.get(section_tag, []):
+                        writer.startElement(item_tag, AttributesImpl({}))
+                        for tag, key, _ in fields:
+                            if key in item:
+                                XMLFileService._write_text(writer, tag, str(item[key]))
+                        if section_tag == 'sessions' and 'reserved_seats' in item:
+                            writer.startElement('reserved_seats', AttributesImpl({}))
+                            for row, seat in item['reserved_seats']:
+                                writer.startElement('seat', AttributesImpl({'row': str(row),
+                                                                           'number': str(seat)}))
+                                writer.endElement('seat')
+                            writer.endElement('reserved_seats')
+                        writer.endElement(item_tag)
+                        writer.ignorableWhitespace('\n')
+                    writer.endElement(section_tag)
+                    writer.ignorableWhitespace('\n')
+
+                for key in XMLFileService._COUNTERS:
+                    if key in data:
+                        XMLFileService._write_text(writer, key, str(data[key]))
+                        writer.ignorableWhitespace('\n')
+
+                writer.endElement('cinema_theater')
+                writer.endDocument()
 
         except Exception as e:
             raise FileOperationError(f"Ошибка сохранения XML: {str(e)}")
 
+    @staticmethod
+    def _write_text(writer: XMLGenerator, tag: str, text: str) -> None:
+        writer.startElement(tag, AttributesImpl({}))
+        writer.characters(text)
+        writer.endElement(tag)
+
+    """Потоково загрузить данные из XML файла: пары (раздел, элемент)"""
+
+    @staticmethod
+    def iter_xml_items(filename: str) -> Iterator[Tuple[str, Any]]:
+        sections = {item_tag: (section_tag, fields)
+                    for section_tag, item_tag, fields in XMLFileService._SECTIONS}
+        try:
+            stack = []
+            for event, elem in ET.iterparse(filename, events=('start', 'end')):
+                if event == 'start':
+                    stack.append(elem)
+                    continue
+
+                stack.pop()
+                parent = stack[-1] if stack else None
+                if parent is None:
+                    continue
 
+                if elem.tag in sections and parent.tag == sections[elem.tag][0]:
+                    section_tag, fields = sections[elem.tag]
+                    yield section_tag, XMLFileService._element_to_dict(elem, fields)
+                    # Разобранный элемент больше не нужен - освобождаем память
+                    parent.remove(elem)
+                elif elem.tag in XMLFileService._COUNTERS and parent.tag == 'cinema_theater':
+                    yield elem.tag, int(elem.text)
+                    parent.remove(elem)
+        except Exception as e:
+            raise FileOperationError(f"Ошибка загрузки XML: {str(e)}")
+
+    @staticmethod
+    def _element_to_dict(elem, fields) -> Dict[str, Any]:
+        item = {}
+        for tag, key, value_type in fields:
+            child = elem.find(tag)
+            if child is not None:
+                item[key] = value_type(child.text or '')
+        reserved = elem.find('reserved_seats')
+        if reserved is not None:
+            item['reserved_seats'] = [[int(seat.get('row')), int(seat.get('number'))]
+                                      for seat in reserved.iter('seat')]
+        return item
 
 
 """Сериализатор данных кинотеатра"""
 
 
+def _entity_dict(entity) -> Optional[dict]:
+    return entity.to_dict() if entity is not None else None
+
+
 class DataSerializer:
-    """Сериализация в словарь"""
+    """Сериализация в словарь.
+
+    Словари неизмененных с прошлого вызова сущностей берутся из кэша
+    cinema_theater.changes, заново строятся только фрагменты измененных.
+    Сеансы дополнительно сверяются по seat_version, чтобы не потерять места,
+    измененные прямо через Session
+    """
     @staticmethod
     def serialize_cinema_data(cinema_theater) -> Dict[str, Any]:
+        changes = cinema_theater.changes
+        store = cinema_theater.bookings
+        changes.mark_versions('sessions', ((session.session_id, session.seat_version)
+                                           for session in cinema_theater.sessions))
         return {
-            'users': [user.to_dict() for user in cinema_theater.users],
-            'halls': [hall.to_dict() for hall in cinema_theater.halls],
-            'films': [film.to_dict() for film in cinema_theater.films],
-            'sessions': [session.to_dict() for session in cinema_theater.sessions],
-            'bookings': [booking.to_dict() for booking in cinema_theater.bookings],
+            'users': changes.fragments(
+                'users', lambda user_id: _entity_dict(cinema_theater.get_user(user_id)),
+                lambda: ((user.user_id, user.to_dict()) for user in cinema_theater.users)),
+            'halls': changes.fragments(
+                'halls', lambda hall_id: _entity_dict(cinema_theater.get_hall(hall_id)),
+                lambda: ((hall.id, hall.to_dict()) for hall in cinema_theater.halls)),
+            'films': changes.fragments(
+                'films', lambda film_id: _entity_dict(cinema_theater.get_film(film_id)),
+                lambda: ((film.film_id, film.to_dict()) for film in cinema_theater.films)),
+            'sessions': changes.fragments(
+                'sessions', lambda session_id: _entity_dict(cinema_theater.get_session(session_id)),
+                lambda: ((session.session_id, session.to_dict()) for session in cinema_theater.sessions)),
+            'bookings': changes.fragments(
+                'bookings', store.get_dict,
+                lambda: ((booking['booking_id'], booking) for booking in store.iter_dicts())),
             'next_user_id': cinema_theater.next_user_id,
             'next_booking_id': cinema_theater.booking_service.next_booking_id
         }
@@ -101,33 +323,124 @@ class DataSerializer:
 
     @staticmethod
     def deserialize_cinema_data(data: Dict[str, Any]) -> Dict[str, Any]:
+        return DataSerializer.deserialize_cinema_items(DataSerializer._iter_dict_items(data))
 
-        halls = [CinemaHall.from_dict(hall_data) for hall_data in data.get('halls', [])]
-        films = [Film.from_dict(film_data) for film_data in data.get('films', [])]
-        users = [User.from_dict(user_data) for user_data in data.get('users', [])]
+    """Десериализация из потока пар (раздел, элемент)"""
 
-        sessions = []
-        for session_data in data.get('sessions', []):
-            try:
-                session = Session.from_dict(session_data, films, halls)
-                sessions.append(session)
-            except ValueError as e:
+    @staticmethod
+    def deserialize_cinema_items(items: Iterable[Tuple[str, Any]]) -> Dict[str, Any]:
+        builder = _CinemaDataBuilder()
+        for section, value in items:
+            builder.add(section, value)
+        return builder.build()
+
+    """Представить словарь данных в виде потока пар (раздел, элемент)"""
+
+    @staticmethod
+    def _iter_dict_items(data: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+        for section in ('halls', 'films', 'users', 'sessions', 'bookings'):
+            for value in data.get(section, []):
+                yield section, value
+        for key in ('next_user_id', 'next_booking_id'):
+            if key in data:
+                yield key, data[key]
+
+
+class _CinemaDataBuilder:
+    """Построение объектов модели по мере поступления данных.
+
+    Сеансы и брони, ссылки которых еще не встречались в потоке,
+    откладываются и разрешаются в конце.
+    """
+
+    def __init__(self):
+        self.halls: List[CinemaHall] = []
+        self.films: List[Film] = []
+        self.users: List[User] = []
+        self.sessions: List[Session] = []
+        self.bookings: List[Booking] = []
+        self.next_user_id = 1
+        self.next_booking_id = 1
+        # Индексы id -> объект для разрешения ссылок за O(1)
+        self._halls_by_id: Dict[int, CinemaHall] = {}
+        self._films_by_id: Dict[int, Film] = {}
+        self._users_by_id: Dict[int, User] = {}
+        self._sessions_by_id: Dict[int, Session] = {}
+        # Старый формат хранил брони в зале - такие сеансы восстанавливаем по броням
+        self._legacy_session_ids = set()
+        self._pending_sessions: List[Dict[str, Any]] = []
+        self._pending_bookings: List[Dict[str, Any]] = []
+
+    def add(self, section: str, value: Any) -> None:
+        if section == 'halls':
+            hall = CinemaHall.from_dict(value)
+            self.halls.append(hall)
+            self._halls_by_id[hall.id] = hall
+        elif section == 'films':
+            film = Film.from_dict(value)
+            self.films.append(film)
+            self._films_by_id[film.film_id] = film
+        elif section == 'users':
+            user = User.from_dict(value)
+            self.users.append(user)
+            self._users_by_id[user.user_id] = user
+        elif section == 'sessions':
+            self._add_session(value, final=False)
+        elif section == 'bookings':
+            self._add_booking(value, final=False)
+        elif section == 'next_user_id':
+            self.next_user_id = value
+        elif section == 'next_booking_id':
+            self.next_booking_id = value
+
+    def _add_session(self, session_data: Dict[str, Any], final: bool) -> None:
+        try:
+            session = Session.from_dict(session_data, self._films_by_id, self._halls_by_id)
+        except ValueError as e:
+            if not final:
+                self._pending_sessions.append(session_data)
+            else:
                 print(f"Предупреждение: {e}")
+            return
 
-        bookings = []
-        for booking_data in data.get('bookings', []):
-            try:
-                booking = Booking.from_dict(booking_data, users, sessions)
-                bookings.append(booking)
-            except ValueError as e:
+        self.sessions.append(session)
+        self._sessions_by_id[session.session_id] = session
+        if 'reserved_seats' not in session_data:
+            self._legacy_session_ids.add(session.session_id)
+
+    def _add_booking(self, booking_data: Dict[str, Any], final: bool) -> None:
+        try:
+            booking = Booking.from_dict(booking_data, self._users_by_id, self._sessions_by_id)
+        except ValueError as e:
+            if not final:
+                self._pending_bookings.append(booking_data)
+            else:
                 print(f"Предупреждение: {e}")
+            return
+
+        try:
+            if booking.session.session_id in self._legacy_session_ids:
+                booking.session.reserve_seat(booking.row, booking.seat)
+        except CinemaError as e:
+            print(f"Предупреждение: {e}")
+            return
+        self.bookings.append(booking)
+        booking.user.add_booking(booking)
+
+    def build(self) -> Dict[str, Any]:
+        for session_data in self._pending_sessions:
+            self._add_session(session_data, final=True)
+        for booking_data in self._pending_bookings:
+            self._add_booking(booking_data, final=True)
+        self._pending_sessions = []
+        self._pending_bookings = []
 
         return {
-            'halls': halls,
-            'films': films,
-            'users': users,
-            'sessions': sessions,
-            'bookings': bookings,
-            'next_user_id': data.get('next_user_id', 1),
-            'next_booking_id': data.get('next_booking_id', 1)
+            'halls': self.halls,
+            'films': self.films,
+            'users': self.users,
+            'sessions': self.sessions,
+            'bookings': self.bookings,
+            'next_user_id': self.next_user_id,
+            'next_booking_id': self.next_booking_id
         }
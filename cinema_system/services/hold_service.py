@@ -0,0 +1,197 @@
+import heapq
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from cinema_system.models.booking import Booking
+from cinema_system.models.exceptions import *
+from cinema_system.models.session import Session
+from cinema_system.models.user import User
+from .booking_service import IdAllocator
+
+
+class SeatHold:
+    """Удержание мест сеанса на время оплаты"""
+
+    __slots__ = ('hold_id', 'user', 'session', 'seats', 'expires_at')
+
+    def __init__(self, hold_id: int, user: User, session: Session,
+                 seats: List[Tuple[int, int]], expires_at: float):
+        self.hold_id = hold_id
+        self.user = user
+        self.session = session
+        self.seats = seats
+        self.expires_at = expires_at
+
+    def __repr__(self) -> str:
+        return (f"SeatHold(id={self.hold_id}, user={self.user.user_id}, "
+                f"session={self.session.session_id}, seats={self.seats})")
+
+
+class HoldService:
+    """Временные удержания мест с истечением по TTL.
+
+    Сроки хранятся в куче (время истечения, ID удержания), поэтому снятие
+    просроченных удержаний стоит O(k log n) для k истекших, без обхода всех
+    живых удержаний. Просроченные удержания снимаются при каждой операции
+    сервиса, а после start() - еще и фоновым потоком, который спит до
+    ближайшего срока.
+    """
+
+    def __init__(self, cinema_theater, ttl: float = 600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.cinema = cinema_theater
+        self.ttl = ttl
+        self._clock = clock
+        self._ids = IdAllocator()
+        self._holds: Dict[int, SeatHold] = {}
+        self._expiry: List[Tuple[float, int]] = []
+        self._changed = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.expired_count = 0
+
+    """Удерживать места сеанса для пользователя: все или ни одного"""
+
+    def hold_seats(self, user_id: int, session_id: int, seats: Sequence[Tuple[int, int]],
+                   ttl: Optional[float] = None) -> SeatHold:
+        self.expire_due()
+
+        user = self.cinema.get_user(user_id)
+        session = self.cinema.get_session(session_id)
+        if not user:
+            raise UserNotFound(f"Пользователь с ID {user_id} не найден")
+        if not session:
+            raise SessionNotFoundError(f"Сеанс с ID {session_id} не найден")
+        seats = [tuple(seat) for seat in seats]
+        if not seats:
+            raise InvalidSeatError("Не выбрано ни одного места")
+        if len(set(seats)) != len(seats):
+            raise InvalidSeatError("Места в заказе повторяются")
+
+        with session.lock:
+            seat_map = session.bookable_seats()
+            for row, seat in seats:
+                if seat_map.is_reserved(row, seat):
+                    raise SeatBookedError(f"{seat} место, {row} ряд уже заняты")
+            for row, seat in seats:
+                seat_map.hold_seat(row, seat)
+
+        hold = SeatHold(self._ids.allocate(), user, session, seats,
+                        self._clock() + (self.ttl if ttl is None else ttl))
+        with self._changed:
+            self._holds[hold.hold_id] = hold
+            heapq.heappush(self._expiry, (hold.expires_at, hold.hold_id))
+            # Фоновый поток мог заснуть до более позднего срока
+            if self._expiry[0][1] == hold.hold_id:
+                self._changed.notify()
+        return hold
+
+    """Удержание по ID (None, если его нет или оно истекло)"""
+
+    def get_hold(self, hold_id: int) -> Optional[SeatHold]:
+        hold = self._holds.get(hold_id)
+        if hold is None or hold.expires_at <= self._clock():
+            return None
+        return hold
+
+    """Сколько секунд осталось до истечения удержания"""
+
+    def time_left(self, hold_id: int) -> float:
+        hold = self.get_hold(hold_id)
+        return max(hold.expires_at - self._clock(), 0.0) if hold else 0.0
+
+    """Оформить брони на удерживаемые места (после оплаты)"""
+
+    def confirm(self, hold_id: int) -> List[Booking]:
+        self.expire_due()
+        hold = self._take(hold_id)
+        if hold is None:
+            raise SeatHoldError(f"Удержание {hold_id} не найдено или истекло")
+
+        try:
+            return self.cinema.booking_service.book_held_seats(hold.user.user_id, hold)
+        except Exception:
+            self._release_seats(hold)
+            raise
+
+    """Отказаться от удержания и освободить места"""
+
+    def release(self, hold_id: int) -> bool:
+        hold = self._take(hold_id)
+        if hold is None:
+            return False
+        self._release_seats(hold)
+        return True
+
+    """Снять все удержания со сроком не позже now, вернуть их количество"""
+
+    def expire_due(self, now: Optional[float] = None) -> int:
+        now = self._clock() if now is None else now
+        expired = []
+        with self._changed:
+            while self._expiry and self._expiry[0][0] <= now:
+                expires_at, hold_id = heapq.heappop(self._expiry)
+                hold = self._holds.get(hold_id)
+                # В куче могут остаться записи уже подтвержденных или снятых удержаний
+                if hold is not None and hold.expires_at == expires_at:
+                    del self._holds[hold_id]
+                    expired.append(hold)
+
+        for hold in expired:
+            self._release_seats(hold)
+        self.expired_count += len(expired)
+        return len(expired)
+
+    """Запустить фоновое снятие просроченных удержаний"""
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="hold-expiry", daemon=True)
+        self._thread.start()
+
+    """Остановить фоновый поток"""
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        with self._changed:
+            self._stopping = True
+            self._changed.notify()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            with self._changed:
+                if self._stopping:
+                    return
+                timeout = self._expiry[0][0] - self._clock() if self._expiry else None
+                if timeout is None or timeout > 0:
+                    self._changed.wait(timeout)
+                    continue
+            self.expire_due()
+
+    def _take(self, hold_id: int) -> Optional[SeatHold]:
+        with self._changed:
+            hold = self._holds.get(hold_id)
+            if hold is None or hold.expires_at <= self._clock():
+                return None
+            del self._holds[hold_id]
+            return hold
+
+    def _release_seats(self, hold: SeatHold) -> None:
+        with hold.session.lock:
+            for row, seat in hold.seats:
+                try:
+                    hold.session.release_hold(row, seat)
+                except CinemaError as e:
+                    print(f"Предупреждение: {e}")
+
+    def __len__(self) -> int:
+        return len(self._holds)
+
+    def __repr__(self) -> str:
+        return f"HoldService(holds={len(self._holds)}, ttl={self.ttl})"
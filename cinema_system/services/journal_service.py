@@ -0,0 +1,194 @@
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from cinema_system.models.booking import Booking
+from cinema_system.models.exceptions import CinemaError, FileOperationError
+from cinema_system.models.user import User
+
+USER_REGISTERED = 'user_registered'
+BOOKING_CREATED = 'booking_created'
+BOOKING_CANCELLED = 'booking_cancelled'
+SESSION_BOOKINGS_CANCELLED = 'session_bookings_cancelled'
+
+
+class JournalService:
+    """Журнал изменений в формате JSON Lines: одна запись на одно изменение.
+
+    Запись дописывается в конец файла, поэтому стоимость сохранения не зависит
+    от объема данных. fsync_every - через сколько записей вызывать fsync
+    (0 - не вызывать), compact_every - после скольких записей пора сжать
+    журнал в полный снимок.
+    """
+
+    def __init__(self, filename: str, fsync_every: int = 1, compact_every: int = 1000):
+        self.filename = filename
+        self.fsync_every = fsync_every
+        self.compact_every = compact_every
+        self.records_since_snapshot = 0
+        self._unsynced = 0
+        self._file = None
+
+    """Открыть файл журнала на дозапись"""
+
+    def _open(self):
+        if self._file is None:
+            try:
+                self._end_last_line()
+                self._file = open(self.filename, 'a', encoding='utf-8')
+            except Exception as e:
+                raise FileOperationError(f"Ошибка открытия журнала: {str(e)}")
+        return self._file
+
+    """Завершить недописанную после сбоя последнюю строку, чтобы новые записи начинались с новой строки"""
+
+    def _end_last_line(self) -> None:
+        try:
+            f = open(self.filename, 'rb+')
+        except FileNotFoundError:
+            return
+        with f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+    """Дописать запись в журнал"""
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self.append_many([record])
+
+    """Дописать несколько записей одной операцией записи"""
+
+    def append_many(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        try:
+            f = self._open()
+            f.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+            f.flush()
+        except FileOperationError:
+            raise
+        except Exception as e:
+            raise FileOperationError(f"Ошибка записи журнала: {str(e)}")
+
+        self.records_since_snapshot += len(records)
+        self._unsynced += 1
+        if self.fsync_every and self._unsynced >= self.fsync_every:
+            self.sync()
+
+    """Записать регистрацию пользователя"""
+
+    def log_user_registered(self, user: User) -> None:
+        self.append({'op': USER_REGISTERED, **user.to_dict()})
+
+    """Записать создание брони"""
+
+    def log_booking_created(self, booking: Booking) -> None:
+        self.append({'op': BOOKING_CREATED, **booking.to_dict()})
+
+    """Записать создание нескольких броней (групповой заказ)"""
+
+    def log_bookings_created(self, bookings: Iterable[Booking]) -> None:
+        self.append_many([{'op': BOOKING_CREATED, **booking.to_dict()} for booking in bookings])
+
+    """Записать отмену брони"""
+
+    def log_booking_cancelled(self, user_id: int, booking_id: int) -> None:
+        self.append({'op': BOOKING_CANCELLED, 'user_id': user_id, 'booking_id': booking_id})
+
+    """Записать отмену всех броней сеанса"""
+
+    def log_session_bookings_cancelled(self, session_id: int) -> None:
+        self.append({'op': SESSION_BOOKINGS_CANCELLED, 'session_id': session_id})
+
+    """Сбросить накопленные записи на диск"""
+
+    def sync(self) -> None:
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    """Пора ли сжать журнал в снимок"""
+
+    def needs_compaction(self) -> bool:
+        return bool(self.compact_every) and self.records_since_snapshot >= self.compact_every
+
+    """Сжать журнал: сохранить полный снимок и очистить журнал"""
+
+    def compact(self, save_snapshot: Callable[[], None]) -> None:
+        self.sync()
+        save_snapshot()
+        self.truncate()
+
+    """Очистить журнал (после записи снимка)"""
+
+    def truncate(self) -> None:
+        self.close()
+        try:
+            with open(self.filename, 'w', encoding='utf-8'):
+                pass
+        except Exception as e:
+            raise FileOperationError(f"Ошибка очистки журнала: {str(e)}")
+        self.records_since_snapshot = 0
+
+    """Закрыть файл журнала"""
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    """Прочитать записи журнала"""
+
+    @staticmethod
+    def read_records(filename: str) -> Iterator[Dict[str, Any]]:
+        try:
+            f = open(filename, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Недописанная после сбоя строка; записи после нее еще можно применить
+                    print(f"Предупреждение: поврежденная строка журнала пропущена: {line.strip()[:80]}")
+                    continue
+                yield record
+
+    """Применить журнал к загруженному из снимка кинотеатру"""
+
+    @staticmethod
+    def replay(cinema_theater, filename: str) -> int:
+        booking_service = cinema_theater.booking_service
+        applied = 0
+
+        for record in JournalService.read_records(filename):
+            op: Optional[str] = record.get('op')
+            try:
+                if op == USER_REGISTERED:
+                    if cinema_theater.get_user(record['user_id']) is None:
+                        cinema_theater.add_user(User.from_dict(record))
+                        applied += 1
+                elif op == BOOKING_CREATED:
+                    if not cinema_theater.bookings.has_booking(record['booking_id']):
+                        booking_service.restore_booking(record['booking_id'], record['user_id'],
+                                                        record['session_id'], record['row'],
+                                                        record['seat'])
+                        applied += 1
+                elif op == BOOKING_CANCELLED:
+                    if booking_service.cancel_booking(record['user_id'], record['booking_id']):
+                        applied += 1
+                elif op == SESSION_BOOKINGS_CANCELLED:
+                    booking_service.cancel_session_bookings(record['session_id'])
+                    applied += 1
+            except (KeyError, ValueError, CinemaError) as e:
+                print(f"Предупреждение: запись журнала пропущена ({e})")
+
+        return applied
@@ -0,0 +1,290 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from cinema_system.models.booking import Booking
+from cinema_system.models.cinema_hall import CinemaHall
+from cinema_system.models.film import Film
+from cinema_system.models.session import Session, TIME_FORMAT
+from cinema_system.models.user import User
+from .binary_service import BinarySnapshot
+from .cinema_service import CinemaTheater
+
+
+class SnapshotSource:
+    """Источник данных для LazyCinemaTheater поверх бинарного снимка.
+
+    Повторяет методы чтения SQLiteStorage. Пользователи, залы, фильмы и
+    сеансы ищутся двоичным поиском по ID прямо в mmap, предстоящие сеансы и
+    брони пользователя - по индексам снимка, поэтому стоимость запроса не
+    зависит от объема истории. В снимках версии 1 индексов нет: тогда сеансы
+    перебираются целиком, а индекс броней по пользователям строится одним
+    проходом при первом обращении.
+    """
+
+    def __init__(self, snapshot: BinarySnapshot):
+        self.snapshot = snapshot
+        self._bookings_by_user: Optional[Dict[int, List[int]]] = None
+        self._lock = threading.Lock()
+
+    def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self.snapshot['users'].find(user_id)
+
+    def get_session(self, session_id: int) -> Optional[Dict[str, Any]]:
+        return self._with_seats(self.snapshot['sessions'].find(session_id))
+
+    def get_all(self, section: str) -> List[Dict[str, Any]]:
+        return list(self.snapshot[section])
+
+    def get_sessions_from(self, time: str) -> List[Dict[str, Any]]:
+        if self.snapshot.has_indexes:
+            sessions = self.snapshot.sessions_from(time)
+        else:
+            sessions = [session for session in self.snapshot['sessions'] if session['time'] >= time]
+            sessions.sort(key=lambda session: (session['time'], session['session_id']))
+        return [self._with_seats(session) for session in sessions]
+
+    def get_user_bookings(self, user_id: int) -> List[Dict[str, Any]]:
+        if self.snapshot.has_indexes:
+            return self.snapshot.user_bookings(user_id)
+        bookings = self.snapshot['bookings']
+        with self._lock:
+            if self._bookings_by_user is None:
+                index: Dict[int, List[int]] = {}
+                for position, booking in enumerate(bookings):
+                    index.setdefault(booking['user_id'], []).append(position)
+                self._bookings_by_user = index
+        return [bookings[position] for position in self._bookings_by_user.get(user_id, [])]
+
+    """У сеанса, сохраненного без карты мест, места восстанавливаются по его броням (как в SQLiteStorage)"""
+
+    def _with_seats(self, session: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if session is not None and 'reserved_seats' not in session and self.snapshot.has_indexes:
+            session['reserved_seats'] = [[booking['row'], booking['seat']]
+                                         for booking in self.snapshot.session_bookings(session['session_id'])]
+        return session
+
+    def get_counter(self, name: str) -> int:
+        return self.snapshot[name]
+
+
+class LazyCinemaTheater(CinemaTheater):
+    """Кинотеатр, который загружает сущности из источника по требованию.
+
+    При load() в память попадают только залы, фильмы и предстоящие сеансы.
+    Пользователи (вместе с их бронями) и прошедшие сеансы подгружаются из
+    source при первом обращении через get_user/get_session и хранятся в
+    LRU ограниченного размера. Источник - SQLiteStorage или SnapshotSource.
+
+    Если изменения сразу пишутся в источник (SQLiteStorage в CinemaApp),
+    вытесненная сущность при следующем обращении прочитается актуальной.
+    Для источника только для чтения нужно pin_changes=True: тогда измененные
+    пользователи и сеансы не вытесняются. Поиск пользователей по имени и
+    агрегаты по броням учитывают только загруженные данные.
+
+    Прошедшие сеансы выгружаются в release_past_sessions; его нужно вызывать
+    по расписанию (CinemaApp делает это раз в минуту через PeriodicTask).
+    """
+
+    def __init__(self, source, max_users: int = 10000, max_sessions: int = 1000,
+                 pin_changes: bool = False):
+        super().__init__()
+        self.source = source
+        self.max_users = max_users
+        self.max_sessions = max_sessions
+        self.pin_changes = pin_changes
+        self._users_by_id: 'OrderedDict[int, User]' = OrderedDict()
+        self._sessions_by_id: 'OrderedDict[int, Session]' = OrderedDict()
+        # Подгруженные по требованию сеансы (вытесняются по LRU)
+        self._faulted_sessions: 'OrderedDict[int, None]' = OrderedDict()
+        self._pinned: Dict[str, Set[int]] = {'users': set(), 'sessions': set()}
+        self._fault_lock = threading.RLock()
+        self.faults = 0
+        self.evictions = 0
+
+    """Загруженные в память пользователи и сеансы"""
+
+    @property
+    def users(self) -> List[User]:
+        return list(self._users_by_id.values())
+
+    @users.setter
+    def users(self, users: List[User]) -> None:
+        self._users_by_id = OrderedDict((user.user_id, user) for user in users)
+
+    @property
+    def sessions(self) -> List[Session]:
+        return list(self._sessions_by_id.values())
+
+    @sessions.setter
+    def sessions(self, sessions: List[Session]) -> None:
+        self._sessions_by_id = OrderedDict((session.session_id, session) for session in sessions)
+
+    """Загрузить справочники и предстоящие сеансы"""
+
+    def load(self, now: Optional[datetime] = None) -> None:
+        now = now or datetime.now()
+        with self._fault_lock:
+            self.halls = [CinemaHall.from_dict(hall) for hall in self.source.get_all('halls')]
+            self.films = [Film.from_dict(film) for film in self.source.get_all('films')]
+            self.users = []
+            self.bookings.clear()
+            self._faulted_sessions.clear()
+            self.rebuild_indexes()
+
+            upcoming = [Session.from_dict(data, self._films_by_id, self._halls_by_id)
+                        for data in self.source.get_sessions_from(now.strftime(TIME_FORMAT))]
+            self.schedule.add_many(upcoming)
+            for session in upcoming:
+                self._attach_session(session)
+
+            self.next_user_id = self.source.get_counter('next_user_id')
+            self.booking_service.next_booking_id = self.source.get_counter('next_booking_id')
+            self.changes.reset()
+            self.schedule_version += 1
+
+    def rebuild_indexes(self) -> None:
+        super().rebuild_indexes()
+        self._users_by_id = OrderedDict(self._users_by_id)
+        self._sessions_by_id = OrderedDict(self._sessions_by_id)
+
+    def mark_dirty(self, kind: str, entity_id: int) -> None:
+        super().mark_dirty(kind, entity_id)
+        if self.pin_changes and kind in self._pinned:
+            self._pinned[kind].add(entity_id)
+
+    """Не вытеснять пользователя (например, вошедшего в систему)"""
+
+    def pin_user(self, user_id: int) -> None:
+        self._pinned['users'].add(user_id)
+
+    """Разрешить вытеснение пользователя"""
+
+    def unpin_user(self, user_id: int) -> None:
+        self._pinned['users'].discard(user_id)
+
+    """Найти пользователя по ID (при промахе - загрузить из источника)"""
+
+    def get_user(self, user_id: int) -> Optional[User]:
+        user = super().get_user(user_id)
+        with self._fault_lock:
+            if user is None:
+                user = self._users_by_id.get(user_id) or self._fault_user(user_id)
+            elif user_id in self._users_by_id:
+                self._users_by_id.move_to_end(user_id)
+        return user
+
+    """Найти сеанс по ID (при промахе - загрузить из источника)"""
+
+    def get_session(self, session_id: int) -> Optional[Session]:
+        session = super().get_session(session_id)
+        with self._fault_lock:
+            if session is None:
+                session = self._sessions_by_id.get(session_id) or self._fault_session(session_id)
+            elif session_id in self._faulted_sessions:
+                self._faulted_sessions.move_to_end(session_id)
+        return session
+
+    def _fault_user(self, user_id: int) -> Optional[User]:
+        data = self.source.get_user(user_id)
+        if data is None:
+            return None
+        user = User.from_dict(data)
+        self._users_by_id[user_id] = user
+        self._user_names.add(user.user_id, user.name)
+        self.next_user_id = max(self.next_user_id, user_id + 1)
+
+        for booking_data in self.source.get_user_bookings(user_id):
+            if self.bookings.has_booking(booking_data['booking_id']):
+                continue
+            session = self.get_session(booking_data['session_id'])
+            if session is None:
+                continue
+            booking = Booking(booking_data['booking_id'], user, session, booking_data['row'], booking_data['seat'])
+            self.bookings.append(booking)
+            user.add_booking(booking)
+
+        self.faults += 1
+        self._evict_users()
+        return user
+
+    def _fault_session(self, session_id: int) -> Optional[Session]:
+        data = self.source.get_session(session_id)
+        if data is None:
+            return None
+        session = Session.from_dict(data, self._films_by_id, self._halls_by_id)
+        self.schedule.add(session)
+        self._attach_session(session)
+        self._faulted_sessions[session_id] = None
+        self.faults += 1
+        self._evict_sessions()
+        return session
+
+    def _attach_session(self, session: Session) -> None:
+        self._sessions_by_id[session.session_id] = session
+        self._sessions_by_film.setdefault(session.movie.film_id, []).append(session)
+
+    def _detach_session(self, session: Session) -> None:
+        del self._sessions_by_id[session.session_id]
+        self._faulted_sessions.pop(session.session_id, None)
+        film_sessions = self._sessions_by_film.get(session.movie.film_id, [])
+        if session in film_sessions:
+            film_sessions.remove(session)
+        self.schedule.remove(session)
+        self.evictions += 1
+
+    """Сеанс можно выгрузить, если на него не ссылаются загруженные брони"""
+
+    def _can_evict_session(self, session_id: int) -> bool:
+        return (session_id not in self._pinned['sessions']
+                and not self.bookings.has_session_bookings(session_id))
+
+    def _evict_users(self) -> None:
+        excess = len(self._users_by_id) - self.max_users
+        if excess <= 0:
+            return
+        for user_id in list(self._users_by_id):
+            if excess <= 0:
+                break
+            if user_id in self._pinned['users']:
+                continue
+            user = self._users_by_id.pop(user_id)
+            self._user_names.remove(user_id)
+            for booking_id in user.booking_ids:
+                self.bookings.discard(booking_id)
+            self.evictions += 1
+            excess -= 1
+
+    def _evict_sessions(self) -> None:
+        excess = len(self._faulted_sessions) - self.max_sessions
+        if excess <= 0:
+            return
+        for session_id in list(self._faulted_sessions):
+            if excess <= 0:
+                break
+            if self._can_evict_session(session_id):
+                self._detach_session(self._sessions_by_id[session_id])
+                excess -= 1
+
+    """Выгрузить прошедшие сеансы, на которые не ссылаются загруженные брони"""
+
+    def evict_past_sessions(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.now()
+        with self._fault_lock:
+            past = [session for session in self._sessions_by_id.values()
+                    if session.is_past(now) and self._can_evict_session(session.session_id)]
+            for session in past:
+                self._detach_session(session)
+        return len(past)
+
+    """Освободить карты мест прошедших сеансов и выгрузить их из памяти"""
+
+    def release_past_sessions(self, now: Optional[datetime] = None) -> int:
+        released = super().release_past_sessions(now)
+        self.evict_past_sessions(now)
+        return released
+
+    def __repr__(self) -> str:
+        return (f"LazyCinemaTheater(users={len(self._users_by_id)}, sessions={len(self._sessions_by_id)}, "
+                f"bookings={len(self.bookings)}, faults={self.faults}, evictions={self.evictions})")
@@ -0,0 +1,51 @@
+import threading
+from typing import Callable, Optional
+
+
+class PeriodicTask:
+    """Фоновый поток, который вызывает action раз в interval секунд.
+
+    Первый вызов выполняется сразу после start(). Ошибки action выводятся
+    как предупреждения и не останавливают поток; stop() дожидается
+    завершения текущего вызова.
+    """
+
+    def __init__(self, action: Callable[[], None], interval: float, name: str = "periodic-task"):
+        if interval <= 0:
+            raise ValueError("Интервал должен быть положительным числом")
+        self._action = action
+        self.interval = interval
+        self.name = name
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs_count = 0
+
+    """Запустить поток"""
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    """Остановить поток"""
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._action()
+            except Exception as e:
+                print(f"Предупреждение: {self.name}: {e}")
+            self.runs_count += 1
+            self._stopping.wait(self.interval)
+
+    def __repr__(self) -> str:
+        return f"PeriodicTask(name={self.name!r}, interval={self.interval}, runs={self.runs_count})"
@@ -0,0 +1,125 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple, Union
+
+from cinema_system.models.session import Session
+from .search_index import TextSearchIndex
+
+
+class VersionedLRUCache:
+    """LRU-кэш, в котором каждое значение хранится вместе с версией данных.
+
+    Значение считается актуальным, только если запрошенная версия совпадает
+    с сохраненной, поэтому отдельно сбрасывать кэш при изменениях не нужно:
+    устаревшая запись просто не находится и вытесняется по LRU.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize <= 0:
+            raise ValueError("Размер кэша должен быть положительным числом")
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Hashable, Tuple[Hashable, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    """Значение по ключу для версии version; при промахе вычисляется через compute"""
+
+    def get_or_compute(self, key: Hashable, version: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    """Очистить кэш"""
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    """Метрики: попадания, промахи, вытеснения, доля попаданий"""
+
+    def metrics(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"VersionedLRUCache(size={len(self)}, maxsize={self.maxsize}, hits={self.hits}, misses={self.misses})"
+
+
+class CinemaReadCache:
+    """Кэш частых запросов на чтение к кинотеатру.
+
+    Данные о местах сеанса привязаны к session.seat_version (меняется при
+    каждом бронировании, отмене и удержании места и не повторяется у заново
+    созданного сеанса с тем же ID), результаты поиска - к
+    cinema_theater.schedule_version (меняется при добавлении фильмов и
+    сеансов). Возвращаемые списки общие для всех читателей, изменять их нельзя.
+    """
+
+    def __init__(self, cinema_theater, maxsize: int = 1024):
+        self.cinema = cinema_theater
+        self.cache = VersionedLRUCache(maxsize)
+
+    """Свободные места сеанса"""
+
+    def get_available_seats(self, session: Session) -> List[Tuple[int, int]]:
+        return self.cache.get_or_compute(('available', session.session_id), self._seat_version(session),
+                                         session.get_available_seats)
+
+    """Количество свободных мест сеанса"""
+
+    def count_available_seats(self, session: Session) -> int:
+        return self.cache.get_or_compute(('count', session.session_id), self._seat_version(session),
+                                         session.count_available_seats)
+
+    """Карта зала на сеанс"""
+
+    def get_map_hall(self, session: Session) -> List[Union[Tuple[int, int], str]]:
+        return self.cache.get_or_compute(('map', session.session_id), self._seat_version(session),
+                                         session.get_map_hall)
+
+    """Версия мест сеанса; начавшийся сеанс закрывается для бронирования без изменения карты мест"""
+
+    @staticmethod
+    def _seat_version(session: Session) -> Tuple[int, bool]:
+        return session.seat_version, session.is_closed()
+
+    """Сеансы по названию фильма"""
+
+    def find_sessions_by_movie(self, movie_title: str) -> List[Session]:
+        # Ключ и результат считаются по одной и той же строке запроса
+        query = movie_title.strip()
+        key = ('search', TextSearchIndex.normalize(query))
+        return self.cache.get_or_compute(key, self.cinema.schedule_version,
+                                         lambda: self.cinema.find_sessions_by_movie(query))
+
+    """Метрики кэша"""
+
+    def metrics(self) -> Dict[str, float]:
+        return self.cache.metrics()
+
+    def __repr__(self) -> str:
+        return f"CinemaReadCache({self.cache!r})"
@@ -0,0 +1,139 @@
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cinema_system.models.session import Session
+
+# Элемент расписания: (время начала, ID сеанса) - ID делает ключ уникальным
+ScheduleEntry = Tuple[datetime, int]
+
+
+class ScheduleIndex:
+    """Расписание сеансов, отсортированное по времени начала.
+
+    Хранит общий список и отдельные списки по фильмам и залам, поэтому
+    запросы по диапазону времени и "ближайшие k сеансов" выполняются
+    двоичным поиском за O(log n + k).
+    """
+
+    def __init__(self):
+        self._sessions: Dict[int, Session] = {}
+        self._all: List[ScheduleEntry] = []
+        self._by_film: Dict[int, List[ScheduleEntry]] = {}
+        self._by_hall: Dict[int, List[ScheduleEntry]] = {}
+
+    """Добавить сеанс в расписание"""
+
+    def add(self, session: Session) -> None:
+        entry = (session.start_time, session.session_id)
+        self._sessions[session.session_id] = session
+        insort(self._all, entry)
+        insort(self._by_film.setdefault(session.movie.film_id, []), entry)
+        insort(self._by_hall.setdefault(session.hall.id, []), entry)
+
+    """Добавить много сеансов сразу: дописать и досортировать затронутые списки"""
+
+    def add_many(self, sessions: Iterable[Session]) -> None:
+        touched_films, touched_halls = set(), set()
+        for session in sessions:
+            entry = (session.start_time, session.session_id)
+            self._sessions[session.session_id] = session
+            self._all.append(entry)
+            self._by_film.setdefault(session.movie.film_id, []).append(entry)
+            self._by_hall.setdefault(session.hall.id, []).append(entry)
+            touched_films.add(session.movie.film_id)
+            touched_halls.add(session.hall.id)
+
+        self._all.sort()
+        for film_id in touched_films:
+            self._by_film[film_id].sort()
+        for hall_id in touched_halls:
+            self._by_hall[hall_id].sort()
+
+    """Удалить сеанс из расписания"""
+
+    def remove(self, session: Session) -> None:
+        if self._sessions.pop(session.session_id, None) is None:
+            return
+        entry = (session.start_time, session.session_id)
+        for entries in (self._all, self._by_film.get(session.movie.film_id, []),
+                        self._by_hall.get(session.hall.id, [])):
+            i = bisect_left(entries, entry)
+            if i < len(entries) and entries[i] == entry:
+                del entries[i]
+
+    """Построить расписание заново по списку сеансов"""
+
+    def rebuild(self, sessions: Iterable[Session]) -> None:
+        self._sessions = {}
+        self._all = []
+        self._by_film = {}
+        self._by_hall = {}
+        for session in sessions:
+            try:
+                entry = (session.start_time, session.session_id)
+            except ValueError as e:
+                print(f"Предупреждение: сеанс {session.session_id} не попал в расписание ({e})")
+                continue
+            self._sessions[session.session_id] = session
+            self._all.append(entry)
+            self._by_film.setdefault(session.movie.film_id, []).append(entry)
+            self._by_hall.setdefault(session.hall.id, []).append(entry)
+
+        self._all.sort()
+        for entries in self._by_film.values():
+            entries.sort()
+        for entries in self._by_hall.values():
+            entries.sort()
+
+    def _entries(self, film_id: Optional[int], hall_id: Optional[int]) -> List[ScheduleEntry]:
+        if film_id is not None and hall_id is not None:
+            raise ValueError("Можно указать только фильм или только зал")
+        if film_id is not None:
+            return self._by_film.get(film_id, [])
+        if hall_id is not None:
+            return self._by_hall.get(hall_id, [])
+        return self._all
+
+    """Сеансы, начинающиеся в промежутке [start, end)"""
+
+    def between(self, start: datetime, end: datetime, film_id: Optional[int] = None,
+                hall_id: Optional[int] = None) -> List[Session]:
+        entries = self._entries(film_id, hall_id)
+        lo = bisect_left(entries, (start, 0))
+        hi = bisect_left(entries, (end, 0), lo)
+        return [self._sessions[session_id] for _, session_id in entries[lo:hi]]
+
+    """Ближайшие k сеансов, начинающихся не раньше after"""
+
+    def upcoming(self, after: datetime, k: int, film_id: Optional[int] = None,
+                 hall_id: Optional[int] = None) -> List[Session]:
+        entries = self._entries(film_id, hall_id)
+        lo = bisect_left(entries, (after, 0))
+        return [self._sessions[session_id] for _, session_id in entries[lo:lo + k]]
+
+    """Сеансы зала, пересекающиеся по времени с session (с учетом уборки зала)"""
+
+    def find_hall_conflicts(self, session: Session, buffer: timedelta = timedelta()) -> List[Session]:
+        entries = self._by_hall.get(session.hall.id, [])
+        start, end = session.start_time, session.end_time + buffer
+        conflicts = []
+
+        # Предыдущий сеанс зала: не должен заканчиваться позже начала нового
+        i = bisect_left(entries, (start, 0))
+        if i > 0:
+            previous = self._sessions[entries[i - 1][1]]
+            if previous.end_time + buffer > start:
+                conflicts.append(previous)
+
+        # Следующие сеансы: не должны начинаться раньше окончания нового
+        while i < len(entries) and entries[i][0] < end:
+            following = self._sessions[entries[i][1]]
+            if following is not session:
+                conflicts.append(following)
+            i += 1
+
+        return conflicts
+
+    def __len__(self) -> int:
+        return len(self._all)
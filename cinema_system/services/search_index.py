@@ -0,0 +1,94 @@
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, Set
+
+# Маркер начала строки: позволяет искать по префиксу тем же индексом
+_START = '\x02'
+_GRAM_SIZE = 3
+
+
+class TextSearchIndex:
+    """Индекс подстрок по n-граммам (длиной до 3 символов) без учета регистра.
+
+    Для каждой строки запоминаются все ее подстроки длиной 1..3. Короткий
+    запрос ищется напрямую, длинный - пересечением списков его триграмм
+    с последующей проверкой кандидатов.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[Hashable]] = defaultdict(set)
+        self._texts: Dict[Hashable, str] = {}
+
+    """Привести строку к виду для сравнения (регистр, ё -> е)"""
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return text.casefold().replace('ё', 'е')
+
+    @staticmethod
+    def _grams(text: str) -> Set[str]:
+        grams = set()
+        for size in range(1, _GRAM_SIZE + 1):
+            for i in range(len(text) - size + 1):
+                grams.add(text[i:i + size])
+        return grams
+
+    """Добавить (или обновить) строку под ключом key"""
+
+    def add(self, key: Hashable, text: str) -> None:
+        if key in self._texts:
+            self.remove(key)
+        normalized = _START + self.normalize(text)
+        self._texts[key] = normalized
+        for gram in self._grams(normalized):
+            self._postings[gram].add(key)
+
+    """Добавить набор пар (ключ, строка)"""
+
+    def add_many(self, items: Iterable) -> None:
+        for key, text in items:
+            self.add(key, text)
+
+    """Удалить строку из индекса"""
+
+    def remove(self, key: Hashable) -> None:
+        normalized = self._texts.pop(key, None)
+        if normalized is None:
+            return
+        for gram in self._grams(normalized):
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    """Очистить индекс"""
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._texts.clear()
+
+    def _lookup(self, query: str) -> Set[Hashable]:
+        if len(query) <= _GRAM_SIZE:
+            return set(self._postings.get(query, ()))
+
+        grams = {query[i:i + _GRAM_SIZE] for i in range(len(query) - _GRAM_SIZE + 1)}
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            if not candidates:
+                break
+            candidates &= keys
+        return {key for key in candidates if query in self._texts[key]}
+
+    """Ключи строк, содержащих подстроку query"""
+
+    def search(self, query: str) -> Set[Hashable]:
+        return self._lookup(self.normalize(query))
+
+    """Ключи строк, начинающихся с prefix"""
+
+    def search_prefix(self, prefix: str) -> Set[Hashable]:
+        return self._lookup(_START + self.normalize(prefix))
+
+    def __len__(self) -> int:
+        return len(self._texts)
@@ -0,0 +1,410 @@
+import builtins
+import multiprocessing
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from cinema_system.models import exceptions
+from cinema_system.models.exceptions import CinemaError
+from cinema_system.models.user import User
+from .booking_service import IdAllocator
+from .cinema_service import CinemaTheater
+from .file_service import DataSerializer, JSONFileService
+
+# Разделы, которые нужны каждому шарду целиком
+_SHARED_SECTIONS = ('users', 'halls', 'films')
+
+
+"""Номер шарда, которому принадлежит сеанс"""
+
+
+def shard_of(session_id: int, shard_count: int) -> int:
+    return session_id % shard_count
+
+
+"""Имя файла, в который шард сохраняет свою часть данных"""
+
+
+def shard_filename(data_file: str, index: int) -> str:
+    base, ext = os.path.splitext(data_file)
+    return f"{base}.shard{index}{ext}"
+
+
+"""Имя файла с количеством шардов, которые последними сохранили данные"""
+
+
+def shard_manifest_filename(data_file: str) -> str:
+    base, ext = os.path.splitext(data_file)
+    return f"{base}.shards{ext}"
+
+
+"""Разделить сериализованные данные кинотеатра на shard_count частей по ID сеанса.
+
+Пользователи, залы и фильмы попадают в каждую часть, сеансы и их брони -
+только в часть своего шарда.
+"""
+
+
+def split_cinema_data(data: Dict[str, Any], shard_count: int) -> List[Dict[str, Any]]:
+    if shard_count <= 0:
+        raise ValueError("Количество шардов должно быть положительным числом")
+
+    parts = [{section: list(data.get(section, [])) for section in _SHARED_SECTIONS}
+             for _ in range(shard_count)]
+    for part in parts:
+        part['sessions'] = []
+        part['bookings'] = []
+        part['next_user_id'] = data.get('next_user_id', 1)
+        part['next_booking_id'] = data.get('next_booking_id', 1)
+
+    for session in data.get('sessions', []):
+        parts[shard_of(session['session_id'], shard_count)]['sessions'].append(session)
+    for booking in data.get('bookings', []):
+        parts[shard_of(booking['session_id'], shard_count)]['bookings'].append(booking)
+    return parts
+
+
+"""Собрать данные шардов обратно в один словарь.
+
+Записи с одинаковым ID берутся один раз - из первой части, где они есть.
+"""
+
+
+def merge_cinema_data(parts: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    merged: Dict[str, Any] = {}
+    for section, key in (('users', 'user_id'), ('halls', 'id'), ('films', 'film_id'),
+                         ('sessions', 'session_id'), ('bookings', 'booking_id')):
+        items = {}
+        for part in parts:
+            for item in part.get(section, []):
+                items.setdefault(item[key], item)
+        merged[section] = [items[item_id] for item_id in sorted(items)]
+
+    merged['next_user_id'] = max((part.get('next_user_id', 1) for part in parts), default=1)
+    merged['next_booking_id'] = max((part.get('next_booking_id', 1) for part in parts), default=1)
+    return merged
+
+
+class _ShardWorker:
+    """Часть кинотеатра внутри процесса шарда"""
+
+    # Операции, которые роутер может вызвать у шарда
+    OPERATIONS = frozenset(('create_booking', 'create_group_booking', 'create_bookings', 'cancel_booking',
+                            'cancel_session_bookings', 'add_user', 'user_bookings', 'get_available_seats',
+                            'count_available_seats', 'snapshot', 'save'))
+
+    def __init__(self, index: int, shard_count: int, data: Dict[str, Any], data_file: str):
+        self.cinema = CinemaTheater()
+        self.cinema.restore_state(DataSerializer.deserialize_cinema_data(data))
+        # ID броней шарда имеют остаток index по модулю shard_count
+        self.cinema.booking_service.set_id_stride(index, shard_count)
+        self.data_file = data_file
+
+    def create_booking(self, user_id: int, session_id: int, row: int, seat: int) -> dict:
+        return self.cinema.booking_service.create_booking(user_id, session_id, row, seat).to_dict()
+
+    def create_group_booking(self, user_id: int, session_id: int, seats: List[Tuple[int, int]]) -> List[dict]:
+        bookings = self.cinema.booking_service.create_group_booking(user_id, session_id, seats)
+        return [booking.to_dict() for booking in bookings]
+
+    def create_bookings(self, requests: List[Tuple[int, int, int, int]]) -> List[tuple]:
+        results = []
+        for request in requests:
+            try:
+                results.append(('ok', self.create_booking(*request)))
+            except Exception as e:
+                results.append(('error', type(e).__name__, str(e)))
+        return results
+
+    def cancel_booking(self, user_id: int, booking_id: int) -> bool:
+        return self.cinema.booking_service.cancel_booking(user_id, booking_id)
+
+    def cancel_session_bookings(self, session_id: int) -> List[dict]:
+        return [booking.to_dict() for booking in self.cinema.booking_service.cancel_session_bookings(session_id)]
+
+    def add_user(self, user_id: int, name: str) -> None:
+        if self.cinema.get_user(user_id) is None:
+            self.cinema.add_user(User(user_id, name))
+
+    def user_bookings(self, user_id: int) -> List[dict]:
+        user = self.cinema.get_user(user_id)
+        if not user:
+            return []
+        store = self.cinema.bookings
+        return [store.get_dict(booking_id) for booking_id in user.booking_ids]
+
+    def get_available_seats(self, session_id: int) -> List[Tuple[int, int]]:
+        return self._session(session_id).get_available_seats()
+
+    def count_available_seats(self, session_id: int) -> int:
+        return self._session(session_id).count_available_seats()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return DataSerializer.serialize_cinema_data(self.cinema)
+
+    def save(self) -> None:
+        JSONFileService.save_to_json(self.snapshot(), self.data_file)
+
+    def _session(self, session_id: int):
+        session = self.cinema.get_session(session_id)
+        if session is None:
+            raise exceptions.SessionNotFoundError(f"Сеанс с ID {session_id} не найден")
+        return session
+
+
+def _shard_main(connection, index: int, shard_count: int, data: Dict[str, Any], data_file: str) -> None:
+    try:
+        worker = _ShardWorker(index, shard_count, data, data_file)
+    except Exception as e:
+        connection.send(('error', type(e).__name__, str(e)))
+        return
+    connection.send(('ok', None))
+
+    while True:
+        try:
+            operation, args = connection.recv()
+        except (EOFError, OSError):
+            break
+        if operation == 'stop':
+            try:
+                worker.save()
+                connection.send(('ok', None))
+            except Exception as e:
+                connection.send(('error', type(e).__name__, str(e)))
+            break
+        if operation not in _ShardWorker.OPERATIONS:
+            connection.send(('error', 'ValueError', f"Неизвестная операция шарда: {operation}"))
+            continue
+        try:
+            connection.send(('ok', getattr(worker, operation)(*args)))
+        except Exception as e:
+            connection.send(('error', type(e).__name__, str(e)))
+
+
+def _make_error(name: str, message: str) -> Exception:
+    error_class = getattr(exceptions, name, None) or getattr(builtins, name, None)
+    if not (isinstance(error_class, type) and issubclass(error_class, Exception)):
+        error_class = CinemaError
+    return error_class(message)
+
+
+class ShardedBookingService:
+    """Бронирование, распределенное по процессам-шардам.
+
+    Сеансы вместе с картами мест и бронями делятся между shard_count
+    процессами по session_id % shard_count, пользователи, залы и фильмы
+    есть в каждом шарде. Этот объект - роутер: он пересылает операции
+    владельцу сеанса через multiprocessing.Pipe. ID броней шарда имеют
+    остаток, равный его номеру, поэтому отмена по ID брони тоже уходит
+    в один шард. Каждый шард сохраняет свою часть в отдельный JSON-файл,
+    после чего роутер записывает количество шардов в файл-манифест.
+    """
+
+    def __init__(self, data: Dict[str, Any], shard_count: int, data_file: str = "cinema_data.json"):
+        self.shard_count = shard_count
+        self.data_file = data_file
+        # Брони с меньшими ID созданы до разделения и лежат в шарде своего сеанса
+        self._strided_from = data.get('next_booking_id', 1)
+        self._user_ids = IdAllocator(data.get('next_user_id', 1))
+
+        context = multiprocessing.get_context()
+        self._connections = []
+        self._processes = []
+        self._locks = []
+        for index, part in enumerate(split_cinema_data(data, shard_count)):
+            parent, child = context.Pipe()
+            process = context.Process(target=_shard_main, name=f"cinema-shard-{index}", daemon=True,
+                                      args=(child, index, shard_count, part, shard_filename(data_file, index)))
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+            self._locks.append(threading.Lock())
+
+        try:
+            for index in range(shard_count):
+                self._receive(index)
+        except Exception:
+            self._terminate()
+            raise
+
+    """Загрузить данные, сохраненные шардами (если их нет - из общего файла).
+
+    Читаются только файлы шардов, которые записали данные последними (их
+    количество хранится в shard_manifest_filename): файлы, оставшиеся от
+    запуска с большим числом шардов, устарели. shard_count может отличаться
+    от сохраненного - данные разделятся заново.
+    """
+
+    @classmethod
+    def load(cls, data_file: str, shard_count: int) -> 'ShardedBookingService':
+        manifest_file = shard_manifest_filename(data_file)
+        if os.path.exists(manifest_file):
+            saved_count = JSONFileService.load_from_json(manifest_file)['shard_count']
+            parts = [JSONFileService.load_from_json(shard_filename(data_file, index))
+                     for index in range(saved_count)]
+        else:
+            # Файлы без манифеста: подряд идущие номера, повторы отбрасывает merge_cinema_data
+            parts = []
+            index = 0
+            while os.path.exists(shard_filename(data_file, index)):
+                parts.append(JSONFileService.load_from_json(shard_filename(data_file, index)))
+                index += 1
+        data = merge_cinema_data(parts) if parts else JSONFileService.load_from_json(data_file)
+        return cls(data, shard_count, data_file)
+
+    def shard_of(self, session_id: int) -> int:
+        return shard_of(session_id, self.shard_count)
+
+    def _receive(self, index: int) -> Any:
+        status, *payload = self._connections[index].recv()
+        if status == 'error':
+            raise _make_error(*payload)
+        return payload[0]
+
+    def _call(self, index: int, operation: str, *args) -> Any:
+        with self._locks[index]:
+            self._connections[index].send((operation, args))
+            return self._receive(index)
+
+    """Выполнить операцию во всех шардах параллельно"""
+
+    def _broadcast(self, operation: str, *args) -> List[Any]:
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            for connection in self._connections:
+                connection.send((operation, args))
+            results, error = [], None
+            for index in range(self.shard_count):
+                try:
+                    results.append(self._receive(index))
+                except Exception as e:
+                    error = error or e
+            if error is not None:
+                raise error
+            return results
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    """Зарегистрировать пользователя во всех шардах"""
+
+    def register_user(self, name: str) -> Dict[str, Any]:
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("Имя пользователя не может быть пустым")
+        user_id = self._user_ids.allocate()
+        self._broadcast('add_user', user_id, name)
+        return {'user_id': user_id, 'name': name}
+
+    """Создать бронь в шарде сеанса"""
+
+    def create_booking(self, user_id: int, session_id: int, row: int, seat: int) -> Dict[str, Any]:
+        return self._call(self.shard_of(session_id), 'create_booking', user_id, session_id, row, seat)
+
+    """Забронировать несколько мест одного сеанса: все или ни одного"""
+
+    def create_group_booking(self, user_id: int, session_id: int,
+                             seats: Sequence[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        return self._call(self.shard_of(session_id), 'create_group_booking', user_id, session_id, list(seats))
+
+    """Создать много броней: запросы (user_id, session_id, row, seat) группируются
+    по шардам, шарды обрабатывают свои пачки параллельно. Для каждого запроса
+    возвращается словарь брони или исключение.
+    """
+
+    def book_many(self, requests: Iterable[Tuple[int, int, int, int]]) -> List[Union[Dict[str, Any], Exception]]:
+        requests = list(requests)
+        batches: List[List[int]] = [[] for _ in range(self.shard_count)]
+        for position, request in enumerate(requests):
+            batches[self.shard_of(request[1])].append(position)
+
+        results: List[Optional[Union[Dict[str, Any], Exception]]] = [None] * len(requests)
+        busy = [index for index in range(self.shard_count) if batches[index]]
+        for index in busy:
+            self._locks[index].acquire()
+        try:
+            for index in busy:
+                self._connections[index].send(('create_bookings', ([requests[p] for p in batches[index]],)))
+            for index in busy:
+                for position, (status, *payload) in zip(batches[index], self._receive(index)):
+                    results[position] = payload[0] if status == 'ok' else _make_error(*payload)
+        finally:
+            for index in busy:
+                self._locks[index].release()
+        return results
+
+    """Отменить бронь (шард определяется по ID брони)"""
+
+    def cancel_booking(self, user_id: int, booking_id: int) -> bool:
+        if booking_id < self._strided_from:
+            return any(self._broadcast('cancel_booking', user_id, booking_id))
+        return self._call(booking_id % self.shard_count, 'cancel_booking', user_id, booking_id)
+
+    """Отменить все брони сеанса"""
+
+    def cancel_session_bookings(self, session_id: int) -> List[Dict[str, Any]]:
+        return self._call(self.shard_of(session_id), 'cancel_session_bookings', session_id)
+
+    """Брони пользователя во всех шардах"""
+
+    def user_bookings(self, user_id: int) -> List[Dict[str, Any]]:
+        bookings = [booking for part in self._broadcast('user_bookings', user_id) for booking in part]
+        return sorted(bookings, key=lambda booking: booking['booking_id'])
+
+    """Свободные места сеанса"""
+
+    def get_available_seats(self, session_id: int) -> List[Tuple[int, int]]:
+        return self._call(self.shard_of(session_id), 'get_available_seats', session_id)
+
+    """Количество свободных мест сеанса"""
+
+    def count_available_seats(self, session_id: int) -> int:
+        return self._call(self.shard_of(session_id), 'count_available_seats', session_id)
+
+    """Собрать данные всех шардов в один словарь (как DataSerializer.serialize_cinema_data)"""
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = merge_cinema_data(self._broadcast('snapshot'))
+        data['next_user_id'] = max(data['next_user_id'], self._user_ids.next_id)
+        return data
+
+    """Сохранить данные каждого шарда в его файл"""
+
+    def save(self) -> None:
+        self._broadcast('save')
+        self._save_manifest()
+
+    """Записать количество шардов после того, как все шарды сохранили свои файлы"""
+
+    def _save_manifest(self) -> None:
+        JSONFileService.save_to_json({'shard_count': self.shard_count}, shard_manifest_filename(self.data_file))
+
+    """Сохранить данные и остановить процессы шардов"""
+
+    def close(self) -> None:
+        if not self._processes:
+            return
+        try:
+            self._broadcast('stop')
+            self._save_manifest()
+        finally:
+            self._terminate()
+
+    def _terminate(self) -> None:
+        for connection in self._connections:
+            connection.close()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def __enter__(self) -> 'ShardedBookingService':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"ShardedBookingService(shards={self.shard_count}, data_file='{self.data_file}')"
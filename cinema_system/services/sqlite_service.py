@@ -0,0 +1,392 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from cinema_system.models.booking import Booking
+from cinema_system.models.exceptions import BookingError, FileOperationError, SeatBookedError
+from cinema_system.models.user import User
+from .file_service import JSONFileService
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS halls (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    seats_per_row INTEGER NOT NULL,
+    total_seats INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS films (
+    film_id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    genre TEXT NOT NULL,
+    rating REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id INTEGER PRIMARY KEY,
+    movie_id INTEGER NOT NULL REFERENCES films (film_id),
+    hall_id INTEGER NOT NULL REFERENCES halls (id),
+    time TEXT NOT NULL,
+    price INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bookings (
+    booking_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users (user_id),
+    session_id INTEGER NOT NULL REFERENCES sessions (session_id),
+    row INTEGER NOT NULL,
+    seat INTEGER NOT NULL,
+    UNIQUE (session_id, row, seat)
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_users_name ON users (name);
+CREATE INDEX IF NOT EXISTS idx_films_title ON films (title);
+CREATE INDEX IF NOT EXISTS idx_sessions_movie ON sessions (movie_id, time);
+CREATE INDEX IF NOT EXISTS idx_sessions_hall ON sessions (hall_id, time);
+CREATE INDEX IF NOT EXISTS idx_sessions_time ON sessions (time);
+CREATE INDEX IF NOT EXISTS idx_bookings_user ON bookings (user_id);
+"""
+
+# Разделы в порядке зависимостей: сеансы ссылаются на фильмы и залы, брони - на сеансы и пользователей
+_TABLES = (
+    ('users', ('user_id', 'name')),
+    ('halls', ('id', 'name', 'rows', 'seats_per_row', 'total_seats')),
+    ('films', ('film_id', 'title', 'duration', 'genre', 'rating')),
+    ('sessions', ('session_id', 'movie_id', 'hall_id', 'time', 'price')),
+    ('bookings', ('booking_id', 'user_id', 'session_id', 'row', 'seat')),
+)
+_COLUMNS = dict(_TABLES)
+_KEYS = {'users': 'user_id', 'halls': 'id', 'films': 'film_id', 'sessions': 'session_id',
+         'bookings': 'booking_id'}
+
+
+class SQLiteStorage:
+    """Хранилище данных кинотеатра в SQLite (режим WAL).
+
+    Каждая сущность - строка своей таблицы, поэтому изменение записывается
+    одной короткой транзакцией, а не перезаписью всего файла. Уникальный
+    индекс (session_id, row, seat) не дает базе принять две брони одного
+    места. Методы log_* повторяют интерфейс JournalService, поэтому
+    хранилище можно подставить вместо журнала. Если хранилище подключено к
+    кинотеатру (CinemaTheater.storage), пользователи и брони записываются
+    через insert_user/insert_bookings, а отмены - через delete_*, до
+    изменения данных в памяти; ID выдает база. Чтение ленивое: get_* читают
+    одну сущность, iter_items отдает строки по одной.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._lock = threading.RLock()
+        try:
+            self._connection = sqlite3.connect(filename, check_same_thread=False, isolation_level=None)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("PRAGMA foreign_keys=ON")
+            self._connection.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Ошибка открытия базы данных: {str(e)}")
+
+    """Выполнить блок в одной транзакции"""
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    """Пустая ли база"""
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return all(self._connection.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is None
+                       for table, _ in _TABLES)
+
+    """Заменить все данные базы словарем DataSerializer.serialize_cinema_data (одна транзакция)"""
+
+    def import_data(self, data: Dict[str, Any]) -> None:
+        self.import_items(((section, item) for section, _ in _TABLES for item in data.get(section, [])),
+                          next_user_id=data.get('next_user_id'), next_booking_id=data.get('next_booking_id'))
+
+    """Заменить все данные базы потоком пар (раздел, элемент)"""
+
+    def import_items(self, items: Iterable[Tuple[str, Any]], next_user_id: Optional[int] = None,
+                     next_booking_id: Optional[int] = None) -> None:
+        counters = {'next_user_id': next_user_id, 'next_booking_id': next_booking_id}
+        try:
+            with self.transaction() as db:
+                # Ссылки проверяются в конце транзакции: разделы могут идти в любом порядке
+                db.execute("PRAGMA defer_foreign_keys=ON")
+                for table, _ in reversed(_TABLES):
+                    db.execute(f"DELETE FROM {table}")
+                db.execute("DELETE FROM counters")
+
+                for section, item in items:
+                    if section in counters:
+                        counters[section] = item
+                    elif section in _COLUMNS:
+                        self._insert(db, section, item)
+
+                for name, value in counters.items():
+                    if value is not None:
+                        db.execute("INSERT INTO counters (name, value) VALUES (?, ?)", (name, value))
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Ошибка импорта в базу данных: {str(e)}")
+
+    """Импортировать cinema_data.json (файл читается потоково)"""
+
+    def import_json(self, filename: str) -> None:
+        self.import_items(JSONFileService.iter_json_items(filename))
+
+    @staticmethod
+    def _insert(db: sqlite3.Connection, table: str, item: Dict[str, Any]) -> None:
+        columns = _COLUMNS[table]
+        values = [item.get(column) for column in columns]
+        if table == 'halls' and values[4] is None:
+            values[4] = item['rows'] * item['seats_per_row']
+        db.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                   values)
+
+    """Следующий свободный ID таблицы: максимум из сохраненного счетчика и ID в таблице + 1.
+
+    Вызывается внутри транзакции BEGIN IMMEDIATE, поэтому несколько процессов
+    с одной базой не получат одинаковые ID.
+    """
+
+    @staticmethod
+    def _next_id(db: sqlite3.Connection, counter: str, table: str, column: str) -> int:
+        row = db.execute("SELECT value FROM counters WHERE name = ?", (counter,)).fetchone()
+        max_id = db.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}").fetchone()[0]
+        return max(row['value'] if row else 1, max_id + 1)
+
+    """Записать регистрацию пользователя"""
+
+    def log_user_registered(self, user: User) -> None:
+        try:
+            with self.transaction() as db:
+                db.execute("INSERT INTO users (user_id, name) VALUES (?, ?)", (user.user_id, user.name))
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Ошибка записи пользователя: {str(e)}")
+
+    """Записать нового пользователя, вернуть его ID (выдается в той же транзакции)"""
+
+    def insert_user(self, name: str) -> int:
+        try:
+            with self.transaction() as db:
+                user_id = self._next_id(db, 'next_user_id', 'users', 'user_id')
+                db.execute("INSERT INTO users (user_id, name) VALUES (?, ?)", (user_id, name))
+                db.execute("INSERT OR REPLACE INTO counters (name, value) VALUES ('next_user_id', ?)",
+                           (user_id + 1,))
+            return user_id
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Ошибка записи пользователя: {str(e)}")
+
+    """Записать бронь (одна транзакция)"""
+
+    def log_booking_created(self, booking: Booking) -> None:
+        self.log_bookings_created([booking])
+
+    """Записать несколько броней одной транзакцией: все или ни одной"""
+
+    def log_bookings_created(self, bookings: Sequence[Booking]) -> None:
+        try:
+            with self.transaction() as db:
+                db.executemany(
+                    "INSERT INTO bookings (booking_id, user_id, session_id, row, seat) VALUES (?, ?, ?, ?, ?)",
+                    [(b.booking_id, b.user.user_id, b.session.session_id, b.row, b.seat) for b in bookings])
+        except sqlite3.IntegrityError as e:
+            if 'UNIQUE' in str(e) and 'bookings.session_id' in str(e):
+                raise SeatBookedError("Место уже забронировано (отклонено базой данных)")
+            raise BookingError(f"Ошибка записи брони: {str(e)}")
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Ошибка записи брони: {str(e)}")
+
+    """Записать новые брони пользователя на места сеанса одной транзакцией, вернуть их ID.
+
+    ID выдаются в той же транзакции после максимального из сохраненного
+    счетчика и ID броней в базе, поэтому несколько процессов с одной базой
+    не выдадут одинаковые ID. Место, уже забронированное в базе другим
+    процессом, отклоняется уникальным индексом.
+    """
+
+    def insert_bookings(self, user_id: int, session_id: int, seats: Sequence[Tuple[int, int]]) -> List[int]:
+        try:
+            with self.transaction() as db:
+                first_id = self._next_id(db, 'next_booking_id', 'bookings', 'booking_id')
+                booking_ids = list(range(first_id, first_id + len(seats)))
+                db.executemany(
+                    "INSERT INTO bookings (booking_id, user_id, session_id, row, seat) VALUES (?, ?, ?, ?, ?)",
+                    [(booking_id, user_id, session_id, row, seat)
+                     for booking_id, (row, seat) in zip(booking_ids, seats)])
+                db.execute("INSERT OR REPLACE INTO counters (name, value) VALUES ('next_booking_id', ?)",
+                           (first_id + len(seats),))
+            return booking_ids
+        except sqlite3.IntegrityError as e:
+            if 'UNIQUE' in str(e) and 'bookings.session_id' in str(e):
+                raise SeatBookedError("Место уже забронировано (отклонено базой данных)")
+            raise BookingError(f"Ошибка записи брони: {str(e)}")
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Ошибка записи брони: {str(e)}")
+
+    """Удалить бронь пользователя (одна транзакция); BookingService вызывает его до отмены в памяти"""
+
+    def delete_booking(self, user_id: int, booking_id: int) -> None:
+        try:
+            with self.transaction() as db:
+                db.execute("DELETE FROM bookings WHERE booking_id = ? AND user_id = ?", (booking_id, user_id))
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Ошибка записи отмены брони: {str(e)}")
+
+    """Удалить все брони сеанса (одна транзакция)"""
+
+    def delete_session_bookings(self, session_id: int) -> None:
+        try:
+            with self.transaction() as db:
+                db.execute("DELETE FROM bookings WHERE session_id = ?", (session_id,))
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Ошибка записи отмены броней: {str(e)}")
+
+    """Записать отмену брони"""
+
+    def log_booking_cancelled(self, user_id: int, booking_id: int) -> None:
+        self.delete_booking(user_id, booking_id)
+
+    """Записать отмену всех броней сеанса"""
+
+    def log_session_bookings_cancelled(self, session_id: int) -> None:
+        self.delete_session_bookings(session_id)
+
+    def _fetch_one(self, query: str, params: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection.execute(query, params).fetchone()
+        return dict(row) if row is not None else None
+
+    def _fetch_all(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._connection.execute(query, params)]
+
+    """Пользователь по ID (словарь, как в User.to_dict)"""
+
+    def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT user_id, name FROM users WHERE user_id = ?", (user_id,))
+
+    """Зал по ID"""
+
+    def get_hall(self, hall_id: int) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT * FROM halls WHERE id = ?", (hall_id,))
+
+    """Фильм по ID"""
+
+    def get_film(self, film_id: int) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT * FROM films WHERE film_id = ?", (film_id,))
+
+    """Сеанс по ID вместе с забронированными местами"""
+
+    def get_session(self, session_id: int) -> Optional[Dict[str, Any]]:
+        session = self._fetch_one("SELECT * FROM sessions WHERE session_id = ?", (session_id,))
+        if session is not None:
+            session['reserved_seats'] = [
+                [row['row'], row['seat']] for row in
+                self._fetch_all("SELECT row, seat FROM bookings WHERE session_id = ? ORDER BY row, seat",
+                                (session_id,))]
+        return session
+
+    """Все строки раздела (для небольших справочников: залы, фильмы)"""
+
+    def get_all(self, section: str) -> List[Dict[str, Any]]:
+        columns = _COLUMNS[section]
+        return self._fetch_all(f"SELECT {', '.join(columns)} FROM {section} ORDER BY {_KEYS[section]}")
+
+    """Сеансы, начинающиеся не раньше time (строка в формате Session.TIME_FORMAT), с местами"""
+
+    def get_sessions_from(self, time: str) -> List[Dict[str, Any]]:
+        sessions = self._fetch_all("SELECT * FROM sessions WHERE time >= ? ORDER BY time, session_id", (time,))
+        by_id = {session['session_id']: session for session in sessions}
+        for session in sessions:
+            session['reserved_seats'] = []
+        for row in self._fetch_all(
+                "SELECT b.session_id, b.row, b.seat FROM bookings b JOIN sessions s USING (session_id) "
+                "WHERE s.time >= ? ORDER BY b.session_id, b.row, b.seat", (time,)):
+            by_id[row['session_id']]['reserved_seats'].append([row['row'], row['seat']])
+        return sessions
+
+    """Бронь по ID"""
+
+    def get_booking(self, booking_id: int) -> Optional[Dict[str, Any]]:
+        return self._fetch_one("SELECT * FROM bookings WHERE booking_id = ?", (booking_id,))
+
+    """Брони пользователя"""
+
+    def get_user_bookings(self, user_id: int) -> List[Dict[str, Any]]:
+        return self._fetch_all("SELECT * FROM bookings WHERE user_id = ? ORDER BY booking_id", (user_id,))
+
+    """Значение счетчика ID (если не сохранено - следующий после максимального ID)"""
+
+    def get_counter(self, name: str) -> int:
+        row = self._fetch_one("SELECT value FROM counters WHERE name = ?", (name,))
+        table, key = ('users', 'user_id') if name == 'next_user_id' else ('bookings', 'booking_id')
+        max_id = self._fetch_one(f"SELECT COALESCE(MAX({key}), 0) AS max_id FROM {table}", ())['max_id']
+        return max(row['value'] if row else 1, max_id + 1)
+
+    """Потоково выдать все данные парами (раздел, элемент) для DataSerializer.deserialize_cinema_items"""
+
+    def iter_items(self) -> Iterator[Tuple[str, Any]]:
+        for table, columns in _TABLES:
+            cursor = self._connection.cursor()
+            with self._lock:
+                cursor.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY {_KEYS[table]}")
+                rows = cursor.fetchmany(1000)
+            while rows:
+                for row in rows:
+                    # У сеансов нет reserved_seats: места восстанавливаются по броням
+                    yield table, dict(row)
+                with self._lock:
+                    rows = cursor.fetchmany(1000)
+        yield 'next_user_id', self.get_counter('next_user_id')
+        yield 'next_booking_id', self.get_counter('next_booking_id')
+
+    """Сохранить счетчики ID (счетчик не уменьшается: его мог сдвинуть другой процесс)"""
+
+    def save_counters(self, next_user_id: int, next_booking_id: int) -> None:
+        try:
+            with self.transaction() as db:
+                db.executemany("INSERT INTO counters (name, value) VALUES (?, ?) "
+                               "ON CONFLICT (name) DO UPDATE SET value = MAX(value, excluded.value)",
+                               (('next_user_id', next_user_id), ('next_booking_id', next_booking_id)))
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Ошибка записи счетчиков: {str(e)}")
+
+    """Перенести WAL в основной файл базы"""
+
+    def sync(self) -> None:
+        with self._lock:
+            self._connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    """Закрыть соединение"""
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __enter__(self) -> 'SQLiteStorage':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"SQLiteStorage(filename='{self.filename}')"
@@ -0,0 +1,74 @@
+import copy
+import os
+import tempfile
+import unittest
+
+from benchmarks.synthetic import make_cinema_data
+from cinema_system.services import BinaryFileService, CinemaTheater, DataSerializer
+
+# Старый формат: места хранились в залах, у сеансов нет reserved_seats
+LEGACY_DATA = {
+    'users': [{'user_id': 1, 'name': "Олег"}],
+    'halls': [{'id': 1, 'name': "Красный зал", 'rows': 5, 'seats_per_row': 8, 'total_seats': 40,
+               'reserved_seats': [[1, 7]]}],
+    'films': [{'film_id': 1, 'title': "Фильм", 'duration': 90, 'genre': "драма", 'rating': 7.0}],
+    'sessions': [{'session_id': 1, 'movie_id': 1, 'hall_id': 1, 'time': "2030-01-01 18:00", 'price': 300}],
+    'bookings': [{'booking_id': 1, 'user_id': 1, 'session_id': 1, 'row': 1, 'seat': 7}],
+    'next_user_id': 2,
+    'next_booking_id': 2,
+}
+
+
+def restore(data) -> CinemaTheater:
+    cinema = CinemaTheater()
+    cinema.restore_state(DataSerializer.deserialize_cinema_data(data))
+    return cinema
+
+
+class BinarySnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, "cinema.bin")
+
+    def round_trip(self, data) -> CinemaTheater:
+        BinaryFileService.save_to_binary(data, self.filename)
+        snapshot = BinaryFileService.load_from_binary(self.filename)
+        self.addCleanup(snapshot.close)
+        return restore(snapshot)
+
+    def test_round_trip_keeps_all_sections(self):
+        cinema = restore(make_cinema_data(users=50, sessions=40, bookings=2000, halls=5))
+        expected = DataSerializer.serialize_cinema_data(cinema)
+
+        loaded = DataSerializer.serialize_cinema_data(self.round_trip(expected))
+
+        for section in ('users', 'halls', 'films', 'sessions', 'bookings', 'next_user_id', 'next_booking_id'):
+            self.assertEqual(loaded[section], expected[section], section)
+
+    def test_records_are_found_by_id(self):
+        data = make_cinema_data(users=10, sessions=10, bookings=100)
+        BinaryFileService.save_to_binary(data, self.filename)
+        with BinaryFileService.load_from_binary(self.filename) as snapshot:
+            self.assertEqual(snapshot['bookings'].find(57), data['bookings'][56])
+            self.assertEqual(snapshot['users'].find(3)['name'], "Пользователь 3")
+            self.assertIsNone(snapshot['sessions'].find(11))
+
+    def test_session_without_seat_map_restores_seats_from_bookings(self):
+        cinema = self.round_trip(copy.deepcopy(LEGACY_DATA))
+
+        session = cinema.get_session(1)
+        self.assertEqual(session.reserved_seats, {(1, 7)})
+
+    def test_empty_seat_map_stays_empty(self):
+        data = copy.deepcopy(LEGACY_DATA)
+        data['sessions'][0]['reserved_seats'] = []
+        data['bookings'] = []
+        BinaryFileService.save_to_binary(data, self.filename)
+        with BinaryFileService.load_from_binary(self.filename) as snapshot:
+            self.assertEqual(snapshot['sessions'][0]['reserved_seats'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
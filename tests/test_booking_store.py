@@ -0,0 +1,45 @@
+import unittest
+from types import SimpleNamespace
+
+from benchmarks.synthetic import make_cinema
+from cinema_system.models import User
+from cinema_system.models.user import INDEXED_BOOKINGS
+
+
+class UserBookingsTest(unittest.TestCase):
+
+    def test_heavy_user_keeps_order_after_switching_to_index(self):
+        user = User(1, "Пользователь")
+        count = INDEXED_BOOKINGS * 3
+        for booking_id in range(count, 0, -1):
+            user.add_booking(SimpleNamespace(booking_id=booking_id))
+
+        self.assertTrue(user.has_booking(1))
+        self.assertTrue(user.remove_booking(1))
+        self.assertFalse(user.remove_booking(1))
+        self.assertFalse(user.has_booking(1))
+        self.assertEqual(user.booking_ids, list(range(count, 1, -1)))
+        self.assertEqual(user.booking_count, count - 1)
+
+
+class CancelSessionBookingsTest(unittest.TestCase):
+
+    def test_bulk_cancel_frees_seats_and_user_bookings(self):
+        cinema = make_cinema(users=2, sessions=2, rows=10, seats_per_row=20)
+        service = cinema.booking_service
+        seats = [(row, seat) for row in range(1, 11) for seat in range(1, 21)]
+        service.create_group_booking(1, 1, seats)
+        kept = service.create_booking(1, 2, 1, 1)
+
+        cancelled = service.cancel_session_bookings(1)
+
+        self.assertEqual(sorted((booking.row, booking.seat) for booking in cancelled), seats)
+        self.assertEqual(cinema.get_session(1).count_available_seats(), 200)
+        self.assertEqual(cinema.get_user(1).booking_ids, [kept.booking_id])
+        self.assertEqual([booking.booking_id for booking in cinema.bookings], [kept.booking_id])
+        self.assertFalse(cinema.bookings.has_session_bookings(1))
+        self.assertEqual(service.cancel_session_bookings(1), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from cinema_system.models import BookingError, CinemaHall, Film, SeatMap, Session
+from cinema_system.services import CinemaTheater
+
+THREADS = 16
+
+
+def make_cinema(sessions: int, users: int = THREADS, rows: int = 10, seats_per_row: int = 10) -> CinemaTheater:
+    cinema = CinemaTheater()
+    film = Film(1, "Фильм", 90, "драма", 7.0)
+    cinema.add_film(film)
+    for hall_id in range(1, sessions + 1):
+        hall = CinemaHall(hall_id, f"Зал {hall_id}", rows, seats_per_row)
+        cinema.add_hall(hall)
+        cinema.add_session(Session(hall_id, film, hall, "2030-01-01 18:00", 300))
+    for user_id in range(1, users + 1):
+        cinema.register_user(f"Пользователь {user_id}")
+    return cinema
+
+
+def book_all(cinema: CinemaTheater, requests) -> list:
+    """Выполнить запросы (user_id, session_id, row, seat) в пуле потоков, вернуть успешные брони"""
+
+    def book(request):
+        try:
+            return cinema.booking_service.create_booking(*request)
+        except BookingError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        return [booking for booking in pool.map(book, requests) if booking is not None]
+
+
+class ConcurrentBookingTest(unittest.TestCase):
+
+    def test_contended_seats_are_booked_once(self):
+        cinema = make_cinema(sessions=1)
+        session = cinema.get_session(1)
+        seats = [(row, seat) for row in range(1, 11) for seat in range(1, 11)]
+        # Каждое место запрашивают все пользователи сразу
+        requests = [(user_id, 1, row, seat) for row, seat in seats for user_id in range(1, THREADS + 1)]
+
+        bookings = book_all(cinema, requests)
+
+        self.assertEqual(len(bookings), len(seats))
+        self.assertEqual(sorted((booking.row, booking.seat) for booking in bookings), seats)
+        self.assertEqual(len({booking.booking_id for booking in bookings}), len(bookings))
+        self.assertEqual(session.count_available_seats(), 0)
+        self.assertEqual(len(cinema.bookings), len(seats))
+        self.assertEqual(sum(user.booking_count for user in cinema.users), len(seats))
+
+    def test_concurrent_cancel_frees_seat_once(self):
+        cinema = make_cinema(sessions=1)
+        booking = cinema.booking_service.create_booking(1, 1, 5, 5)
+        barrier = threading.Barrier(THREADS)
+
+        def cancel(_):
+            barrier.wait()
+            return cinema.booking_service.cancel_booking(1, booking.booking_id)
+
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            results = list(pool.map(cancel, range(THREADS)))
+
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(cinema.get_session(1).count_available_seats(), 100)
+        self.assertEqual(len(cinema.bookings), 0)
+
+    def test_booking_ids_are_unique_across_sessions(self):
+        cinema = make_cinema(sessions=THREADS)
+        requests = [(session_id, session_id, row, seat)
+                    for session_id in range(1, THREADS + 1) for row in range(1, 11) for seat in range(1, 11)]
+
+        bookings = book_all(cinema, requests)
+
+        self.assertEqual(len(bookings), len(requests))
+        self.assertEqual(sorted(booking.booking_id for booking in bookings), list(range(1, len(requests) + 1)))
+        self.assertEqual(cinema.booking_service.next_booking_id, len(requests) + 1)
+
+    def test_locked_session_does_not_block_other_sessions(self):
+        cinema = make_cinema(sessions=2)
+        finished = threading.Event()
+
+        def book_other_session():
+            cinema.booking_service.create_booking(1, 2, 1, 1)
+            finished.set()
+
+        with cinema.get_session(1).lock:
+            thread = threading.Thread(target=book_other_session)
+            thread.start()
+            self.assertTrue(finished.wait(5), "бронирование другого сеанса ждет чужую блокировку")
+        thread.join()
+
+    def test_seat_taken_while_free_runs_are_built_is_not_suggested(self):
+        cinema = make_cinema(sessions=1)
+        building = threading.Event()
+        build_free_runs = SeatMap._build_free_runs
+
+        # Отрезки уже посчитаны, но еще не сохранены: в это время бронируется место из лучшего блока
+        def slow_build_free_runs(seat_map):
+            build_free_runs(seat_map)
+            runs, seat_map._free_runs = seat_map._free_runs, None
+            building.set()
+            time.sleep(0.05)
+            seat_map._free_runs = runs
+
+        def book_center_seat():
+            building.wait(5)
+            cinema.booking_service.create_booking(1, 1, 5, 5)
+
+        thread = threading.Thread(target=book_center_seat)
+        thread.start()
+        with mock.patch.object(SeatMap, '_build_free_runs', slow_build_free_runs):
+            self.assertEqual(cinema.get_session(1).find_best_seats(2), [(5, 5), (5, 6)])
+        thread.join()
+
+        self.assertNotIn((5, 5), cinema.get_session(1).find_best_seats(2))
+
+    def test_throughput_scales_with_distinct_sessions(self):
+        # Резервирование места замедлено имитацией ввода-вывода (sleep отпускает GIL),
+        # так что время определяется тем, сколько критических секций идут параллельно
+        reserve_seat = SeatMap.reserve_seat
+
+        def slow_reserve_seat(seat_map, row, seat):
+            time.sleep(0.002)
+            return reserve_seat(seat_map, row, seat)
+
+        def throughput(sessions: int) -> float:
+            cinema = make_cinema(sessions=sessions)
+            requests = [(index % THREADS + 1, index % sessions + 1, index // sessions // 10 + 1,
+                         index // sessions % 10 + 1) for index in range(96)]
+            started = time.perf_counter()
+            bookings = book_all(cinema, requests)
+            elapsed = time.perf_counter() - started
+            self.assertEqual(len(bookings), len(requests))
+            return len(bookings) / elapsed
+
+        with mock.patch.object(SeatMap, 'reserve_seat', slow_reserve_seat):
+            single = throughput(1)
+            distinct = throughput(THREADS)
+
+        self.assertGreater(distinct, single * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
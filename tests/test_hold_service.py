@@ -0,0 +1,26 @@
+import unittest
+
+from benchmarks.synthetic import make_cinema
+from cinema_system.models import BookingError
+from cinema_system.services import HoldService
+
+
+class HoldOwnershipTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cinema = make_cinema(users=2, sessions=1, rows=2, seats_per_row=2)
+        self.holds = HoldService(self.cinema)
+
+    def test_other_user_cannot_book_held_seats(self):
+        hold = self.holds.hold_seats(1, 1, [(2, 2)])
+
+        with self.assertRaises(BookingError):
+            self.cinema.booking_service.book_held_seats(2, hold)
+        self.assertEqual(self.cinema.get_user(2).booking_count, 0)
+
+        bookings = self.holds.confirm(hold.hold_id)
+        self.assertEqual([(booking.user.user_id, booking.row, booking.seat) for booking in bookings], [(1, 2, 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
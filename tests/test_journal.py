@@ -0,0 +1,50 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from benchmarks.synthetic import make_cinema
+from cinema_system.models import User
+from cinema_system.services import JournalService
+
+
+class JournalTornLineTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, "cinema_journal.jsonl")
+
+    def replay(self) -> int:
+        cinema = make_cinema(users=1, sessions=1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return JournalService.replay(cinema, self.filename)
+
+    def test_records_after_torn_line_are_replayed(self):
+        # Сбой оборвал запись на середине строки
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            f.write('{"op": "user_reg')
+
+        journal = JournalService(self.filename)
+        journal.log_user_registered(User(2, "Алиса"))
+        journal.log_user_registered(User(3, "Боб"))
+        journal.close()
+
+        self.assertEqual(self.replay(), 2)
+
+    def test_undecodable_line_in_the_middle_is_skipped(self):
+        journal = JournalService(self.filename)
+        journal.log_user_registered(User(2, "Алиса"))
+        journal.close()
+        with open(self.filename, 'a', encoding='utf-8') as f:
+            f.write('мусор\n')
+        journal = JournalService(self.filename)
+        journal.log_user_registered(User(3, "Боб"))
+        journal.close()
+
+        self.assertEqual(self.replay(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import time
+import unittest
+
+from benchmarks.synthetic import make_cinema, make_cinema_data
+from cinema_system.services import (BinaryFileService, DataSerializer, LazyCinemaTheater, PeriodicTask,
+                                    SnapshotSource)
+
+PAST_SESSIONS = 10
+
+
+class SnapshotSourceTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, "cinema.bin")
+        self.data = make_cinema_data(users=20, sessions=40, bookings=600, halls=4)
+        # Первые сеансы уже прошли
+        for session in self.data['sessions'][:PAST_SESSIONS]:
+            session['time'] = session['time'].replace("2030", "2020")
+
+    def open_source(self, data) -> SnapshotSource:
+        BinaryFileService.save_to_binary(data, self.filename)
+        snapshot = BinaryFileService.load_from_binary(self.filename)
+        self.addCleanup(snapshot.close)
+        return SnapshotSource(snapshot)
+
+    def test_indexed_queries_match_full_scan(self):
+        source = self.open_source(self.data)
+        self.assertTrue(source.snapshot.has_indexes)
+        time_from = self.data['sessions'][25]['time']
+
+        expected = sorted((session for session in self.data['sessions'] if session['time'] >= time_from),
+                          key=lambda session: (session['time'], session['session_id']))
+        self.assertEqual(source.get_sessions_from(time_from), expected)
+        for user_id in (1, 7, 20, 21):
+            self.assertEqual(source.get_user_bookings(user_id),
+                             [booking for booking in self.data['bookings'] if booking['user_id'] == user_id])
+
+    def test_session_saved_without_seat_map_gets_seats_from_bookings(self):
+        cinema = make_cinema(users=20, sessions=40, bookings=600, halls=4)
+        session = cinema.get_session(3)
+        expected = sorted(session.reserved_seats)
+        session.release_seats()
+
+        source = self.open_source(DataSerializer.serialize_cinema_data(cinema))
+
+        self.assertEqual(sorted(map(tuple, source.get_session(3)['reserved_seats'])), expected)
+
+    def test_scheduled_release_evicts_past_sessions(self):
+        cinema = LazyCinemaTheater(self.open_source(self.data))
+        cinema.load()
+        for session_id in range(1, PAST_SESSIONS + 1):
+            self.assertIsNotNone(cinema.get_session(session_id))
+        loaded = len(cinema.sessions)
+
+        task = PeriodicTask(cinema.release_past_sessions, interval=60)
+        task.start()
+        deadline = time.monotonic() + 5
+        while task.runs_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        task.stop()
+
+        self.assertEqual(len(cinema.sessions), loaded - PAST_SESSIONS)
+        self.assertEqual(cinema.evictions, PAST_SESSIONS)
+
+
+if __name__ == '__main__':
+    unittest.main()
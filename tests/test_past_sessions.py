@@ -0,0 +1,47 @@
+import unittest
+
+from benchmarks.synthetic import make_cinema_data
+from cinema_system.models import BookingError
+from cinema_system.services import CinemaReadCache, CinemaTheater, DataSerializer, HoldService
+
+
+class PastSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        data = make_cinema_data(users=5, sessions=3, bookings=2, halls=3, rows=2, seats_per_row=2)
+        # Сеанс 1 прошел с бронью (карта мест есть), сеанс 3 прошел без броней (карты мест нет)
+        for session in (data['sessions'][0], data['sessions'][2]):
+            session['time'] = session['time'].replace("2030", "2020")
+        self.cinema = CinemaTheater()
+        self.cinema.restore_state(DataSerializer.deserialize_cinema_data(data))
+
+    def test_past_sessions_report_no_seats(self):
+        reads = CinemaReadCache(self.cinema)
+        for session_id in (1, 3):
+            session = self.cinema.get_session(session_id)
+            self.assertEqual(session.count_available_seats(), 0)
+            self.assertEqual(session.get_available_seats(), [])
+            self.assertEqual(reads.count_available_seats(session), 0)
+            self.assertEqual(session.find_best_seats(2), [])
+        self.assertEqual(self.cinema.get_session(2).count_available_seats(), 3)
+
+    def test_past_sessions_refuse_bookings_and_holds(self):
+        holds = HoldService(self.cinema)
+        for session_id in (1, 3):
+            with self.assertRaises(BookingError):
+                self.cinema.booking_service.create_booking(1, session_id, 2, 2)
+            with self.assertRaises(BookingError):
+                self.cinema.booking_service.create_group_booking(1, session_id, [(2, 1), (2, 2)])
+            with self.assertRaises(BookingError):
+                holds.hold_seats(1, session_id, [(2, 2)])
+        self.assertEqual(len(self.cinema.bookings), 2)
+        self.cinema.booking_service.create_booking(1, 2, 2, 2)
+
+    def test_release_covers_sessions_without_seat_map(self):
+        self.assertEqual(self.cinema.release_past_sessions(), 2)
+        self.assertTrue(self.cinema.get_session(3).is_released())
+        self.assertEqual(self.cinema.release_past_sessions(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
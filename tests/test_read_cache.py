@@ -0,0 +1,60 @@
+import unittest
+
+from benchmarks.synthetic import make_cinema, make_cinema_data
+from cinema_system.models import CinemaHall, Film, Session
+from cinema_system.services import CinemaReadCache, DataSerializer
+
+
+class CinemaReadCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cinema = make_cinema(users=5, sessions=2, rows=2, seats_per_row=2)
+        self.reads = CinemaReadCache(self.cinema)
+
+    def test_booking_invalidates_available_seats(self):
+        session = self.cinema.get_session(1)
+        self.assertEqual(len(self.reads.get_available_seats(session)), 4)
+
+        self.cinema.booking_service.create_booking(1, 1, 1, 1)
+
+        self.assertEqual(len(self.reads.get_available_seats(session)), 3)
+        self.assertEqual(self.reads.count_available_seats(session), 3)
+
+    def test_rebuilt_session_is_not_served_from_cache(self):
+        session = self.cinema.get_session(1)
+        self.cinema.booking_service.create_booking(1, 1, 1, 1)
+        self.assertEqual(self.reads.get_available_seats(session), [(1, 2), (2, 1), (2, 2)])
+
+        # Перезагрузка создает новые сеанс и карту мест с тем же ID сеанса и тем же числом изменений
+        data = make_cinema_data(users=5, sessions=2, bookings=0, rows=2, seats_per_row=2)
+        data['sessions'][0]['reserved_seats'] = [[2, 2]]
+        self.cinema.restore_state(DataSerializer.deserialize_cinema_data(data))
+        rebuilt = self.cinema.get_session(1)
+
+        self.assertIsNot(rebuilt, session)
+        self.assertEqual(self.reads.get_available_seats(rebuilt), [(1, 1), (1, 2), (2, 1)])
+
+    def test_released_session_is_not_served_from_cache(self):
+        session = self.cinema.get_session(2)
+        self.assertEqual(self.reads.count_available_seats(session), 4)
+
+        session.release_seats()
+
+        self.assertEqual(self.reads.count_available_seats(session), 0)
+
+    def test_search_is_computed_for_the_cached_query(self):
+        hall = CinemaHall(100, "Зал 100", 2, 2)
+        self.cinema.add_hall(hall)
+        for film_id, title in ((101, "Маша и медведь"), (102, "Принцесса")):
+            film = Film(film_id, title, 90, "мультфильм", 7.0)
+            self.cinema.add_film(film)
+            self.cinema.add_session(Session(film_id, film, hall, f"2031-01-0{film_id - 100} 10:00", 300))
+
+        expected = self.cinema.find_sessions_by_movie('и')
+        self.assertIn(self.cinema.get_session(102), expected)
+        self.assertEqual(self.reads.find_sessions_by_movie('и '), expected)
+        self.assertEqual(self.reads.find_sessions_by_movie('и'), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from benchmarks.synthetic import make_cinema
+from cinema_system.services import DataSerializer
+
+
+def reserved_seats(data, session_id: int):
+    session = next(session for session in data['sessions'] if session['session_id'] == session_id)
+    return session['reserved_seats']
+
+
+class IncrementalSerializationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cinema = make_cinema(users=5, sessions=2, rows=2, seats_per_row=2)
+
+    def test_seats_changed_directly_on_session_are_saved(self):
+        DataSerializer.serialize_cinema_data(self.cinema)
+        session = self.cinema.get_session(1)
+
+        session.reserve_seat(1, 1)
+        self.assertEqual(reserved_seats(DataSerializer.serialize_cinema_data(self.cinema), 1), [[1, 1]])
+
+        session.to_free_seat(1, 1)
+        self.assertEqual(reserved_seats(DataSerializer.serialize_cinema_data(self.cinema), 1), [])
+
+    def test_unchanged_sessions_reuse_cached_fragments(self):
+        first = DataSerializer.serialize_cinema_data(self.cinema)
+        self.cinema.booking_service.create_booking(1, 2, 1, 1)
+        second = DataSerializer.serialize_cinema_data(self.cinema)
+
+        self.assertIs(second['sessions'][0], first['sessions'][0])
+        self.assertIsNot(second['sessions'][1], first['sessions'][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.synthetic import make_cinema_data
+from cinema_system.services import ShardedBookingService
+from cinema_system.services.sharded_service import merge_cinema_data, shard_filename, split_cinema_data
+
+
+class ShardedDataTest(unittest.TestCase):
+
+    def test_split_and_merge_round_trip(self):
+        data = make_cinema_data(users=10, sessions=12, bookings=200)
+        self.assertEqual(merge_cinema_data(split_cinema_data(data, 3)), data)
+
+    def test_merge_drops_repeated_records(self):
+        data = make_cinema_data(users=10, sessions=12, bookings=200)
+        merged = merge_cinema_data(split_cinema_data(data, 3) + split_cinema_data(data, 2))
+        self.assertEqual(merged, data)
+
+
+class ShardedLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.data_file = os.path.join(directory.name, "cinema.json")
+        self.data = make_cinema_data(users=10, sessions=12, bookings=200)
+
+    def test_load_ignores_shard_files_left_by_larger_shard_count(self):
+        with ShardedBookingService(self.data, 4, self.data_file) as service:
+            booking = service.create_booking(1, 7, 20, 30)
+        self.assertTrue(os.path.exists(shard_filename(self.data_file, 3)))
+
+        with ShardedBookingService.load(self.data_file, 2) as service:
+            self.assertTrue(service.cancel_booking(booking['user_id'], booking['booking_id']))
+
+        with ShardedBookingService.load(self.data_file, 3) as service:
+            snapshot = service.snapshot()
+        booking_ids = [item['booking_id'] for item in snapshot['bookings']]
+        self.assertEqual(len(booking_ids), len(set(booking_ids)))
+        self.assertNotIn(booking['booking_id'], booking_ids)
+        self.assertEqual(len(snapshot['bookings']), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
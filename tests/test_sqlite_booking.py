@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks.synthetic import make_cinema_data
+from cinema_system.models import BookingError, FileOperationError
+from cinema_system.services import CinemaTheater, DataSerializer, SQLiteStorage
+
+
+class SQLiteBookingTest(unittest.TestCase):
+    """Два экземпляра приложения с одной базой (как два запуска CinemaApp('sqlite'))"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, "cinema.db")
+        with SQLiteStorage(self.filename) as storage:
+            storage.import_data(make_cinema_data(users=5, sessions=3, bookings=10))
+        self.first, self.second = self.open_cinema(self.filename), self.open_cinema(self.filename)
+
+    def open_cinema(self, filename: str) -> CinemaTheater:
+        storage = SQLiteStorage(filename)
+        self.addCleanup(storage.close)
+        cinema = CinemaTheater()
+        cinema.restore_state(DataSerializer.deserialize_cinema_items(storage.iter_items()))
+        cinema.storage = storage
+        return cinema
+
+    def test_booking_ids_come_from_database(self):
+        first = self.first.booking_service.create_booking(1, 1, 10, 1)
+        second = self.second.booking_service.create_booking(1, 1, 10, 2)
+        group = self.first.booking_service.create_group_booking(2, 2, [(10, 1), (10, 2)])
+
+        booking_ids = [first.booking_id, second.booking_id] + [booking.booking_id for booking in group]
+        self.assertEqual(booking_ids, [11, 12, 13, 14])
+        storage = self.second.booking_service.storage
+        self.assertEqual(storage.get_booking(12)['seat'], 2)
+        self.assertEqual(storage.get_counter('next_booking_id'), 15)
+
+    def test_seat_taken_in_database_is_rolled_back(self):
+        self.first.booking_service.create_booking(1, 1, 10, 1)
+
+        with self.assertRaises(BookingError):
+            self.second.booking_service.create_booking(2, 1, 10, 1)
+
+        session = self.second.get_session(1)
+        self.assertIn((10, 1), session.get_available_seats())
+        self.assertEqual(len(self.second.bookings), 10)
+        self.assertEqual(self.second.get_user(2).booking_count, self.first.get_user(2).booking_count)
+
+    def test_group_booking_is_rolled_back_as_a_whole(self):
+        self.first.booking_service.create_booking(1, 2, 10, 2)
+
+        with self.assertRaises(BookingError):
+            self.second.booking_service.create_group_booking(1, 2, [(10, 1), (10, 2)])
+
+        available = self.second.get_session(2).get_available_seats()
+        self.assertIn((10, 1), available)
+        self.assertIn((10, 2), available)
+        self.assertIsNone(self.second.booking_service.storage.get_booking(12))
+
+    def test_user_ids_come_from_database(self):
+        alice = self.first.register_user("Алиса")
+        bob = self.second.register_user("Боб")
+
+        self.assertEqual((alice.user_id, bob.user_id), (6, 7))
+        storage = self.first.storage
+        self.assertEqual(storage.get_user(6)['name'], "Алиса")
+        self.assertEqual(storage.get_user(7)['name'], "Боб")
+        self.assertEqual(storage.get_counter('next_user_id'), 8)
+
+    def test_cancellation_is_written_before_memory_changes(self):
+        booking = self.first.booking_service.create_booking(1, 1, 10, 1)
+        storage = self.first.storage
+
+        with mock.patch.object(storage, 'delete_booking', side_effect=FileOperationError("диск переполнен")):
+            with self.assertRaises(FileOperationError):
+                self.first.booking_service.cancel_booking(1, booking.booking_id)
+        self.assertTrue(self.first.get_user(1).has_booking(booking.booking_id))
+        self.assertNotIn((10, 1), self.first.get_session(1).get_available_seats())
+
+        self.assertTrue(self.first.booking_service.cancel_booking(1, booking.booking_id))
+        self.assertIsNone(storage.get_booking(booking.booking_id))
+        reloaded = self.open_cinema(self.filename)
+        self.assertIsNone(reloaded.bookings.get(booking.booking_id))
+
+    def test_session_cancellation_is_written_to_database(self):
+        self.first.booking_service.cancel_session_bookings(2)
+
+        reloaded = self.open_cinema(self.filename)
+        self.assertFalse(reloaded.bookings.has_session_bookings(2))
+        self.assertTrue(reloaded.bookings.has_session_bookings(1))
+
+
+if __name__ == '__main__':
+    unittest.main()